@@ -0,0 +1,7 @@
+"""
+Benchmarks for the Sign Business application.
+
+``python -m benchmarks.seed`` fills a database with synthetic signs and
+``python -m benchmarks.run`` times the main paths against it, saving the
+results as JSON so runs can be compared.
+"""
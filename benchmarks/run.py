@@ -0,0 +1,314 @@
+"""
+End-to-end benchmarks for the Sign Business application.
+
+Times the paths users wait on against whatever the configured database
+holds (see benchmarks.seed for a realistic volume) and writes the results
+to JSON. Comparing with an earlier run flags regressions and makes the
+command exit with status 1:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --compare benchmarks/results/20250101_120000.json
+
+The signs list and detail window benchmarks open a hidden Tk window; they
+are skipped when no display is available, or with --skip-ui.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# The list and detail window read MySQL directly, not a mirror left over from another run
+os.environ.setdefault("LOCAL_REPLICA", "0")
+
+from db.connection import DatabaseConnection
+from db.metrics import metrics
+import db.queries as queries
+
+DEFAULT_REPEAT = 5
+DEFAULT_SAMPLES = 20
+DEFAULT_RESULTS_DIR = os.path.join("benchmarks", "results")
+
+# Median slowdown beyond which --compare reports a regression
+DEFAULT_THRESHOLD = 0.20
+
+# Longest wait for the Tk side of a benchmark to finish
+UI_TIMEOUT = 60.0
+
+
+def _round_trips():
+    return sum(s["count"] for s in metrics.snapshot()["statements"])
+
+
+def measure(fn, runs, setup=None):
+    """Call fn once per entry in runs (passing it the entry) and summarize the timings.
+
+    setup(entry), if given, runs before each call and is not timed. Round
+    trips to the database are counted from the query metrics. With no runs
+    (e.g. no sampled component had a job) the timings are None.
+    """
+    timings = []
+    trips = 0
+    for entry in runs:
+        if setup:
+            setup(entry)
+        before = _round_trips()
+        started = time.perf_counter()
+        fn(entry)
+        timings.append((time.perf_counter() - started) * 1000)
+        trips += _round_trips() - before
+    if not timings:
+        return {"runs": 0, "min_ms": None, "median_ms": None, "p95_ms": None, "max_ms": None,
+                "round_trips": None}
+    timings.sort()
+    return {
+        "runs": len(timings),
+        "min_ms": timings[0],
+        "median_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "max_ms": timings[-1],
+        "round_trips": trips / len(timings),
+    }
+
+
+def _dataset(db):
+    """Row counts of the benchmarked tables"""
+    counts = {}
+    for table in ("Signs", "Components", "Jobs"):
+        row = db.execute_query(f"SELECT COUNT(*) AS n FROM {table}", fetchone=True)
+        counts[table] = row['n'] if row else None
+    return counts
+
+
+def _sample_signs(db, count, rng):
+    """SignIDs of signs that have at least one job, so every path does real work"""
+    rows = db.execute_query("""
+    SELECT DISTINCT c.SignID FROM Components c
+    JOIN Jobs j ON j.ComponentID = c.ComponentID
+    """, fetchall=True) or []
+    sign_ids = [row['SignID'] for row in rows]
+    return sorted(rng.sample(sign_ids, min(count, len(sign_ids))))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_queries(results, repeat, sign_ids):
+    """The reads and writes behind the list, the detail window and the job editor"""
+    results["signs_list.get_all_signs"] = measure(lambda _: queries.get_all_signs(), range(repeat))
+    results["signs_list.first_page"] = measure(lambda _: queries.get_signs_page(), range(repeat))
+
+    # Cold: the row cache is emptied first, as when a window is opened for the first time
+    results["sign_detail.get_sign_tree"] = measure(queries.get_sign_tree, sign_ids,
+                                                   setup=queries.invalidate_sign)
+
+    components = []
+    for sign_id in sign_ids:
+        tree = queries.get_sign_tree(sign_id)
+        if tree and tree['Components']:
+            components.append(tree['Components'][0]['ComponentID'])
+
+    created = []
+
+    def create(component_id):
+        created.append(queries.create_job(component_id, "Benchmark", "12.50", "2"))
+
+    results["jobs.create"] = measure(create, components)
+    results["jobs.update"] = measure(lambda job_id: queries.update_job(job_id, "Benchmark editado", "15.75", "3"),
+                                     list(created))
+    results["jobs.delete"] = measure(queries.delete_job, list(created))
+
+
+def bench_invoices(results, sign_ids):
+    """PrintInvoice.generate_invoice, rendering from scratch and then served from the invoice cache"""
+    from utils.print_invoice import PrintInvoice, invoice_snapshot, get_cache
+
+    invoices = {sign_id: PrintInvoice(sign_id) for sign_id in sign_ids}
+
+    def forget_pdf(sign_id):
+        filepath = get_cache().path_for(invoice_snapshot(invoices[sign_id].sign_data))
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+    results["invoice.generate_cold"] = measure(lambda sign_id: invoices[sign_id].generate_invoice(), sign_ids,
+                                               setup=forget_pdf)
+    results["invoice.generate_cached"] = measure(lambda sign_id: invoices[sign_id].generate_invoice(), sign_ids)
+    results["invoice.load_and_generate"] = measure(lambda sign_id: PrintInvoice(sign_id).generate_invoice(),
+                                                   sign_ids, setup=queries.invalidate_sign)
+
+
+def _pump(root, done, what):
+    """Run the Tk event loop until done() is true"""
+    deadline = time.perf_counter() + UI_TIMEOUT
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{what} did not finish within {UI_TIMEOUT:.0f}s")
+        root.update()
+        time.sleep(0.001)
+
+
+def bench_ui(results, repeat, sign_ids):
+    """Populating the signs list and opening the detail window in a hidden application window"""
+    import tkinter as tk
+    from tkinter import ttk
+    from ui.app import SignBusinessApp
+    from ui.sign_views import SignViews
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return f"no display: {e}"
+    root.withdraw()
+    app = SignBusinessApp(root)
+    try:
+        _pump(root, lambda: app.dispatcher._pending == 0, "Opening the signs list")
+
+        rows = queries.get_all_signs() or []
+
+        def populate(signs):
+            tree = ttk.Treeview(root, columns=("ID", "Cartel", "Cliente", "Creado", "Estado", "Costo Total"),
+                                show="headings")
+            for sign in signs:
+                tree.insert("", tk.END, values=SignViews._sign_row_values(sign))
+            root.update_idletasks()
+            tree.destroy()
+
+        results["signs_list.populate"] = dict(measure(lambda _: populate(rows), range(repeat)), rows=len(rows))
+
+        def load_and_populate(_):
+            populate(queries.get_all_signs() or [])
+
+        results["signs_list.get_all_and_populate"] = measure(load_and_populate, range(repeat))
+
+        views = app.sign_views
+        opened = []
+
+        def open_detail(sign_id):
+            opened.append(views._show_sign_detail_window(sign_id))
+            _pump(root, lambda: sign_id in views.detail_states, "Opening the detail window")
+            root.update_idletasks()
+
+        def close_detail(sign_id=None, cold=False):
+            # Closing the previous window is not part of the timing
+            for window in opened:
+                window.destroy()
+            opened.clear()
+            root.update()
+            if cold:
+                queries.invalidate_sign(sign_id)
+
+        results["sign_detail.open_window"] = measure(open_detail, sign_ids,
+                                                     setup=lambda sign_id: close_detail(sign_id, cold=True))
+        results["sign_detail.open_window_cached"] = measure(open_detail, sign_ids, setup=close_detail)
+        close_detail()
+    finally:
+        app.close_application()
+    return None
+
+
+def compare(results, previous, threshold):
+    """Print the median change per benchmark; return the names that slowed down beyond threshold"""
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        if not current["runs"]:
+            print(f"  {name}: no runs")
+            continue
+        before = previous.get("benchmarks", {}).get(name)
+        if not before or not before.get("median_ms"):
+            print(f"  {name}: {current['median_ms']:.1f} ms (new)")
+            continue
+        change = current["median_ms"] / before["median_ms"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name}: {before['median_ms']:.1f} -> {current['median_ms']:.1f} ms ({change:+.0%}){flag}")
+    return regressions
+
+
+def run(repeat=DEFAULT_REPEAT, samples=DEFAULT_SAMPLES, skip_ui=False, seed_value=0):
+    """Run every benchmark and return the results as plain data"""
+    DatabaseConnection.show_error_dialogs = False
+    db = DatabaseConnection.get_instance()
+    sign_ids = _sample_signs(db, samples, random.Random(seed_value))
+    if not sign_ids:
+        raise SystemExit("No signs with jobs to benchmark; seed the database with python -m benchmarks.seed")
+
+    results = {
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": db.backend.label,
+        "dataset": _dataset(db),
+        "sampled_signs": len(sign_ids),
+        "benchmarks": {},
+        "skipped": {},
+    }
+    benchmarks = results["benchmarks"]
+
+    bench_queries(benchmarks, repeat, sign_ids)
+    bench_invoices(benchmarks, sign_ids)
+    if skip_ui:
+        results["skipped"]["ui"] = "--skip-ui"
+    else:
+        reason = bench_ui(benchmarks, repeat, sign_ids)
+        if reason:
+            results["skipped"]["ui"] = reason
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the main paths of the application and save the results.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"runs of the whole-list benchmarks (default: {DEFAULT_REPEAT})")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES,
+                        help=f"signs opened, printed and edited (default: {DEFAULT_SAMPLES})")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for picking signs (default: 0)")
+    parser.add_argument("--skip-ui", action="store_true", help="skip the benchmarks that need a display")
+    parser.add_argument("--out", help=f"results file (default: {DEFAULT_RESULTS_DIR}/<timestamp>.json)")
+    parser.add_argument("--compare", metavar="FILE", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"median slowdown reported as a regression (default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat, args.samples, args.skip_ui, args.seed)
+
+    out = args.out or os.path.join(DEFAULT_RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, default=str)
+
+    for name, stats in results["benchmarks"].items():
+        if not stats["runs"]:
+            print(f"{name}: no runs (nothing to sample)")
+            continue
+        print(f"{name}: median {stats['median_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms, "
+              f"{stats['round_trips']:.1f} queries ({stats['runs']} runs)")
+    for name, reason in results["skipped"].items():
+        print(f"Skipped {name}: {reason}")
+    print(f"Saved to {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"Compared with {args.compare} ({previous.get('at')}, commit {previous.get('commit')}):")
+        regressions = compare(results, previous, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmarks slowed down by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Synthetic dataset generator for the benchmarks.
+
+Fills the configured database with realistic-looking signs, components and
+jobs. The data is generated from a fixed seed, so two runs with the same
+options produce the same rows, and every seeded sign is tagged so it can be
+removed again:
+
+    python -m benchmarks.seed --yes
+    python -m benchmarks.seed --signs 5000 --components 30000 --jobs 200000 --yes
+    python -m benchmarks.seed --clear --yes
+
+Point DB_NAME at a scratch database first, or use DB_BACKEND=sqlite with its
+own SQLITE_PATH: seeding writes millions of rows.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from db.connection import DatabaseConnection
+from db.migrations import migrate
+
+# Stored in Signs.Description so seeded rows can be told apart and cleared
+SEED_MARKER = "benchmark-seed"
+
+DEFAULT_SIGNS = 50000
+DEFAULT_COMPONENTS = 300000
+DEFAULT_JOBS = 2000000
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_SEED = 42
+
+# Signs generated (and committed) together, with their components and jobs
+SIGNS_PER_CHUNK = 1000
+
+# Weighted like the shop floor: most signs are finished, a few are open
+STATUSES = (("Completed", 70), ("Pending", 20), ("In Progress", 10))
+
+SIGN_KINDS = ["Letrero luminoso", "Fachada", "Letras corporeas", "Caja de luz", "Banner", "Rotulo vehicular",
+              "Senaletica", "Totem", "Marquesina", "Vinil para vitrina", "Placa", "Anuncio espectacular"]
+COMPONENT_NAMES = ["Estructura", "Frente", "Letras", "Iluminacion", "Base", "Marco", "Impresion",
+                   "Instalacion", "Laterales", "Soporte", "Acabados", "Electrico"]
+JOB_NAMES = ["Corte de vinil", "Impresion en lona", "Instalacion", "Estructura metalica", "Modulos LED",
+             "Fuente de poder", "Acrilico", "Pintura", "Soldadura", "Diseno", "Transporte", "Andamio",
+             "Laminado", "Router CNC", "Trovicel", "Aluminio compuesto", "Tornilleria", "Mano de obra"]
+FIRST_NAMES = ["Juan", "Maria", "Jose", "Ana", "Luis", "Carmen", "Carlos", "Rosa", "Miguel", "Laura",
+               "Jorge", "Patricia", "Pedro", "Sofia", "Ricardo", "Elena", "Fernando", "Lucia"]
+LAST_NAMES = ["Garcia", "Hernandez", "Lopez", "Martinez", "Gonzalez", "Perez", "Rodriguez", "Sanchez",
+              "Ramirez", "Torres", "Flores", "Rivera", "Gomez", "Diaz", "Cruz", "Morales"]
+BUSINESSES = ["Farmacia", "Taqueria", "Abarrotes", "Ferreteria", "Panaderia", "Consultorio", "Papeleria",
+              "Restaurante", "Gimnasio", "Estetica", "Refaccionaria", "Hotel", "Escuela", "Veterinaria"]
+
+
+def _count(avg, rng):
+    """A child count averaging avg, at least 1, spread up to about twice the average"""
+    return max(1, round(rng.triangular(1, 2 * avg - 1)))
+
+
+def _money(rng, low, high):
+    return Decimal(rng.randint(int(low * 100), int(high * 100))) / 100
+
+
+class Generator:
+    """Deterministic rows for Signs, Components and Jobs with explicit IDs"""
+
+    def __init__(self, components_per_sign, jobs_per_component, seed=DEFAULT_SEED, years=5,
+                 first_sign_id=1, first_component_id=1, first_job_id=1):
+        self.rng = random.Random(seed)
+        self.components_per_sign = components_per_sign
+        self.jobs_per_component = jobs_per_component
+        self.until = datetime.now().replace(microsecond=0)
+        self.span_seconds = int(timedelta(days=365 * years).total_seconds())
+        self.next_sign_id = first_sign_id
+        self.next_component_id = first_component_id
+        self.next_job_id = first_job_id
+        self.customers = self._customers(2000)
+        self.status_names = [name for name, _ in STATUSES]
+        self.status_weights = [weight for _, weight in STATUSES]
+
+    def _customers(self, count):
+        rng = self.rng
+        customers = []
+        for _ in range(count):
+            person = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            if rng.random() < 0.6:
+                customers.append(f"{rng.choice(BUSINESSES)} {rng.choice(LAST_NAMES)} - {person}")
+            else:
+                customers.append(person)
+        return customers
+
+    def chunk(self, count):
+        """Rows for the next count signs: (signs, components, jobs) as lists of tuples"""
+        rng = self.rng
+        signs, components, jobs = [], [], []
+        for _ in range(count):
+            sign_id = self.next_sign_id
+            self.next_sign_id += 1
+            customer = rng.choice(self.customers)
+            created = self.until - timedelta(seconds=rng.randint(0, self.span_seconds))
+            status = rng.choices(self.status_names, self.status_weights)[0]
+            signs.append((sign_id, f"{rng.choice(SIGN_KINDS)} {customer.split(' - ')[0]}", SEED_MARKER,
+                          customer, created, status))
+
+            for _ in range(_count(self.components_per_sign, rng)):
+                component_id = self.next_component_id
+                self.next_component_id += 1
+                components.append((component_id, sign_id, rng.choice(COMPONENT_NAMES)))
+
+                for _ in range(_count(self.jobs_per_component, rng)):
+                    jobs.append((self.next_job_id, component_id, rng.choice(JOB_NAMES),
+                                 _money(rng, 1, 5000), self._quantity()))
+                    self.next_job_id += 1
+        return signs, components, jobs
+
+    def _quantity(self):
+        """Mostly small piece counts, some areas in square metres, one job in ten a flat charge"""
+        roll = self.rng.random()
+        if roll < 0.1:
+            return None
+        if roll < 0.7:
+            return Decimal(self.rng.choice((1, 1, 1, 2, 2, 3, 4, 5, 10)))
+        return _money(self.rng, 0.5, 25)
+
+
+INSERT_SIGNS = """
+INSERT INTO Signs (SignID, SignName, Description, CustomerInfo, CreationDate, Status)
+VALUES (%s, %s, %s, %s, %s, %s)
+"""
+INSERT_COMPONENTS = "INSERT INTO Components (ComponentID, SignID, ComponentName) VALUES (%s, %s, %s)"
+INSERT_JOBS = "INSERT INTO Jobs (JobID, ComponentID, JobName, UnitCost, Quantity) VALUES (%s, %s, %s, %s, %s)"
+
+
+def _next_ids(cursor):
+    """First free ID in each table, so seeded rows never collide with existing ones"""
+    ids = []
+    for table, key in (("Signs", "SignID"), ("Components", "ComponentID"), ("Jobs", "JobID")):
+        cursor.execute(f"SELECT COALESCE(MAX({key}), 0) + 1 FROM {table}")
+        ids.append(cursor.fetchone()[0])
+    return ids
+
+
+def _insert(cursor, query, rows, batch_size):
+    # mysql.connector turns executemany of an INSERT ... VALUES into multi-row INSERTs
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(query, rows[start:start + batch_size])
+
+
+def seed(signs=DEFAULT_SIGNS, components=DEFAULT_COMPONENTS, jobs=DEFAULT_JOBS,
+         batch_size=DEFAULT_BATCH_SIZE, seed_value=DEFAULT_SEED, progress=print):
+    """Insert synthetic signs, components and jobs; return the row counts inserted.
+
+    components and jobs are targets: each sign gets a random number of
+    components and each component a random number of jobs averaging out to
+    them. The aggregate triggers fill in Subtotal and TotalCost as jobs load.
+    """
+    migrate()
+    db = DatabaseConnection.get_instance()
+    inserted = {"signs": 0, "components": 0, "jobs": 0}
+    started = time.perf_counter()
+
+    with db.connection() as connection:
+        cursor = connection.cursor()
+        try:
+            first_sign, first_component, first_job = _next_ids(cursor)
+            generator = Generator(components / signs, jobs / components, seed_value,
+                                  first_sign_id=first_sign, first_component_id=first_component,
+                                  first_job_id=first_job)
+            while inserted["signs"] < signs:
+                sign_rows, component_rows, job_rows = generator.chunk(min(SIGNS_PER_CHUNK,
+                                                                          signs - inserted["signs"]))
+                _insert(cursor, INSERT_SIGNS, sign_rows, batch_size)
+                _insert(cursor, INSERT_COMPONENTS, component_rows, batch_size)
+                _insert(cursor, INSERT_JOBS, job_rows, batch_size)
+                connection.commit()
+
+                inserted["signs"] += len(sign_rows)
+                inserted["components"] += len(component_rows)
+                inserted["jobs"] += len(job_rows)
+                elapsed = time.perf_counter() - started
+                progress(f"{inserted['signs']}/{signs} signs, {inserted['components']} components, "
+                         f"{inserted['jobs']} jobs ({elapsed:.0f}s)")
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+    return inserted
+
+
+def clear(batch_size=DEFAULT_BATCH_SIZE, progress=print):
+    """Delete every seeded sign (components and jobs go with them); return how many"""
+    db = DatabaseConnection.get_instance()
+    rows = db.execute_query("SELECT SignID FROM Signs WHERE Description = %s", (SEED_MARKER,), fetchall=True)
+    sign_ids = [row['SignID'] for row in rows or []]
+    # Smaller batches than seeding: each sign cascades to a few dozen jobs and their triggers
+    step = max(1, batch_size // 50)
+    for start in range(0, len(sign_ids), step):
+        chunk = sign_ids[start:start + step]
+        db.execute_query(f"DELETE FROM Signs WHERE SignID IN ({', '.join(['%s'] * len(chunk))})",
+                         tuple(chunk), commit=True)
+        progress(f"Deleted {min(start + step, len(sign_ids))}/{len(sign_ids)} seeded signs")
+    return len(sign_ids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill the database with synthetic signs for benchmarking.")
+    parser.add_argument("--signs", type=int, default=DEFAULT_SIGNS, help=f"default: {DEFAULT_SIGNS}")
+    parser.add_argument("--components", type=int, default=DEFAULT_COMPONENTS,
+                        help=f"approximate total (default: {DEFAULT_COMPONENTS})")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help=f"approximate total (default: {DEFAULT_JOBS})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"rows per INSERT (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"random seed (default: {DEFAULT_SEED})")
+    parser.add_argument("--clear", action="store_true", help="delete previously seeded signs instead")
+    parser.add_argument("--yes", action="store_true", help="do not ask for confirmation")
+    args = parser.parse_args(argv)
+
+    if args.signs < 1 or args.components < args.signs or args.jobs < args.components:
+        parser.error("need at least one component per sign and one job per component")
+
+    DatabaseConnection.show_error_dialogs = False
+
+    # Never write to a database by accident
+    target = DatabaseConnection.get_instance().backend.label
+    if not args.yes:
+        action = "Delete seeded signs from" if args.clear else f"Insert about {args.jobs} jobs into"
+        if input(f"{action} {target}? [y/N] ").strip().lower() != "y":
+            return 1
+
+    started = time.perf_counter()
+    if args.clear:
+        deleted = clear(args.batch_size)
+        print(f"Deleted {deleted} seeded signs in {time.perf_counter() - started:.0f}s")
+        return 0
+
+    inserted = seed(args.signs, args.components, args.jobs, args.batch_size, args.seed)
+    seconds = time.perf_counter() - started
+    print(f"Seeded {inserted['signs']} signs, {inserted['components']} components and {inserted['jobs']} jobs "
+          f"in {seconds:.0f}s ({inserted['jobs'] / seconds:.0f} jobs/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
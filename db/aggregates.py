@@ -0,0 +1,67 @@
+"""
+Drift check for the stored Subtotal and TotalCost aggregates.
+
+Triggers keep Components.Subtotal and Signs.TotalCost up to date by adding
+and subtracting deltas, so a write made with the triggers disabled (a bulk
+load, a restore, a manual fix) can leave them out of step with Jobs. Run
+``python -m db.aggregates`` to list drifted rows, or add ``--rebuild`` to
+recompute every aggregate from Jobs.
+"""
+import sys
+from .connection import DatabaseConnection
+from .migrations import REBUILD_SUBTOTALS, REBUILD_TOTALS
+from . import queries
+
+# Expected is rounded to cents: SQLite sums money as floating point
+COMPONENT_DRIFT = """
+SELECT c.ComponentID, c.SignID, c.Subtotal, ROUND(COALESCE(SUM(j.Amount), 0), 2) AS Expected
+FROM Components c
+LEFT JOIN Jobs j ON j.ComponentID = c.ComponentID
+GROUP BY c.ComponentID, c.SignID, c.Subtotal
+HAVING c.Subtotal <> Expected
+ORDER BY c.ComponentID
+"""
+
+# Compared against the jobs themselves so a drifted Subtotal cannot hide a drifted total
+SIGN_DRIFT = """
+SELECT s.SignID, s.TotalCost, ROUND(COALESCE(SUM(j.Amount), 0), 2) AS Expected
+FROM Signs s
+LEFT JOIN Components c ON c.SignID = s.SignID
+LEFT JOIN Jobs j ON j.ComponentID = c.ComponentID
+GROUP BY s.SignID, s.TotalCost
+HAVING s.TotalCost <> Expected
+ORDER BY s.SignID
+"""
+
+
+def find_drift():
+    """Return (components, signs) whose stored aggregate differs from the sum of their jobs"""
+    db = DatabaseConnection.get_instance()
+    components = db.execute_query(COMPONENT_DRIFT, fetchall=True) or []
+    signs = db.execute_query(SIGN_DRIFT, fetchall=True) or []
+    return components, signs
+
+
+def rebuild():
+    """Recompute every Subtotal and TotalCost from Jobs in one transaction"""
+    db = DatabaseConnection.get_instance()
+    with db.transaction():
+        db.execute_query(REBUILD_SUBTOTALS)
+        db.execute_query(REBUILD_TOTALS)
+    queries.cache.clear()
+
+
+if __name__ == "__main__":
+    components, signs = find_drift()
+    for row in components:
+        print(f"Component {row['ComponentID']} (sign {row['SignID']}): "
+              f"Subtotal {row['Subtotal']} != {row['Expected']}")
+    for row in signs:
+        print(f"Sign {row['SignID']}: TotalCost {row['TotalCost']} != {row['Expected']}")
+    print(f"{len(components)} components and {len(signs)} signs drifted")
+
+    if "--rebuild" in sys.argv[1:] and (components or signs):
+        rebuild()
+        components, signs = find_drift()
+        print(f"Rebuilt; {len(components) + len(signs)} rows still drifted")
+    sys.exit(1 if components or signs else 0)
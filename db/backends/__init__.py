@@ -0,0 +1,33 @@
+"""
+Storage backends for DatabaseConnection.
+
+DB_BACKEND picks the engine: "mysql" (the default) connects to the server
+named by DB_HOST / DB_NAME; "sqlite" keeps the whole database in one local
+file (SQLITE_PATH, default pricer.sqlite3) for single-seat installs and
+benchmarks. Queries are written once, in MySQL's dialect with %s
+placeholders; each backend translates what its engine needs.
+"""
+import importlib
+import os
+
+DEFAULT_BACKEND = "mysql"
+
+# DB_BACKEND value -> (module, class); modules are imported only when chosen
+BACKENDS = {
+    "mysql": (".mysql_backend", "MySQLBackend"),
+    "sqlite": (".sqlite_backend", "SQLiteBackend"),
+}
+
+
+def configured_name():
+    """The backend named by DB_BACKEND"""
+    return os.getenv("DB_BACKEND", DEFAULT_BACKEND).strip().lower()
+
+
+def get_backend(name=None):
+    """Create the backend named name (default: the configured one)"""
+    name = name or configured_name()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown DB_BACKEND {name!r}; expected one of {', '.join(BACKENDS)}")
+    module, cls = BACKENDS[name]
+    return getattr(importlib.import_module(module, __name__), cls)()
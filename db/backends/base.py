@@ -0,0 +1,23 @@
+"""
+Interface shared by the storage backends.
+"""
+
+
+class Backend:
+    """What DatabaseConnection needs from a storage engine.
+
+    connect() returns a connection with the parts of the mysql.connector
+    API the pool relies on: cursor(dictionary=, prepared=), is_connected(),
+    reconnect(), start_transaction(), in_transaction, commit(), rollback(),
+    cmd_reset_connection() and close(). Its cursors accept MySQL-dialect SQL
+    with %s placeholders and return the same Python types (Decimal money,
+    datetime timestamps).
+    """
+    name = None
+    label = "database"   # How error messages refer to the database
+    Error = Exception    # Base class of the errors the driver raises
+    schema = None        # Statements creating the latest schema, for engines that skip migrations
+
+    def connect(self):
+        """Open a new connection"""
+        raise NotImplementedError
@@ -0,0 +1,28 @@
+"""
+MySQL storage backend.
+"""
+import os
+import mysql.connector
+from .base import Backend
+
+
+class MySQLBackend(Backend):
+    name = "mysql"
+    label = "MySQL database"
+    Error = mysql.connector.Error
+
+    def __init__(self):
+        self.label = f"MySQL database {os.getenv('DB_NAME')} on {os.getenv('DB_HOST')}"
+
+    def connect(self):
+        """Open a new raw connection to the MySQL database"""
+        return mysql.connector.connect(
+            host=os.getenv("DB_HOST"),
+            user=os.getenv("DB_USER"),
+            password=os.getenv("DB_PASSWORD"),
+            database=os.getenv("DB_NAME"),
+            consume_results=True,  # Auto-consume unread results
+            # Connections stay pinned to a thread: without autocommit a plain read would open a
+            # transaction that keeps its first snapshot and hides later commits from other sessions
+            autocommit=True
+        )
@@ -0,0 +1,372 @@
+"""
+Embedded SQLite storage backend.
+
+The database lives in one file (SQLITE_PATH, default pricer.sqlite3) and is
+created at the latest schema version the first time it is opened. Cursors
+take the same MySQL-dialect SQL as the MySQL backend; translate() rewrites
+the constructs db.queries and its neighbours use. Jobs.Amount is a
+generated column and triggers keep Subtotal, TotalCost, UpdatedAt and the
+DeletedRows tombstones up to date, as the MySQL migrations do.
+"""
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from .base import Backend
+
+DEFAULT_SQLITE_PATH = "pricer.sqlite3"
+
+# Seconds a writer waits for another connection's write to finish
+BUSY_TIMEOUT = 30.0
+
+CENT = Decimal("0.01")
+
+# Money columns have NUMERIC affinity so comparisons and arithmetic are numeric; values are
+# rounded to cents where they are computed and read back as Decimal like MySQL's DECIMAL(12, 2).
+# Timestamps are stored as fixed-width ISO text (the format db.replica uses too), so comparing
+# them as text orders them in time.
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" ", timespec="microseconds"))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter("DECIMAL", lambda value: Decimal(value.decode()).quantize(CENT, ROUND_HALF_UP))
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
+
+# Same text format as the datetime adapter above
+_NOW = "(strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime') || '000')"
+
+# (table, primary key) of the tables with UpdatedAt and delete tombstones
+_TABLES = (("Signs", "SignID"), ("Components", "ComponentID"), ("Jobs", "JobID"))
+
+SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS Signs (
+        SignID INTEGER PRIMARY KEY AUTOINCREMENT,
+        SignName VARCHAR(255) NOT NULL,
+        Description TEXT,
+        CustomerInfo VARCHAR(255),
+        CreationDate DATETIME NOT NULL DEFAULT {_NOW},
+        Status VARCHAR(32) NOT NULL DEFAULT 'Pending',
+        TotalCost DECIMAL(12, 2) NOT NULL DEFAULT 0,
+        UpdatedAt DATETIME NOT NULL DEFAULT {_NOW}
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS Components (
+        ComponentID INTEGER PRIMARY KEY AUTOINCREMENT,
+        SignID INTEGER NOT NULL REFERENCES Signs (SignID) ON DELETE CASCADE,
+        ComponentName VARCHAR(255) NOT NULL,
+        Subtotal DECIMAL(12, 2) NOT NULL DEFAULT 0,
+        UpdatedAt DATETIME NOT NULL DEFAULT {_NOW}
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS Jobs (
+        JobID INTEGER PRIMARY KEY AUTOINCREMENT,
+        ComponentID INTEGER NOT NULL REFERENCES Components (ComponentID) ON DELETE CASCADE,
+        JobName VARCHAR(255) NOT NULL,
+        UnitCost DECIMAL(12, 2) NOT NULL,
+        Quantity DECIMAL(12, 2) NULL,
+        -- NULL when the job has no quantity; the UI shows it as '-'
+        Amount DECIMAL(14, 2) GENERATED ALWAYS AS (ROUND(UnitCost * Quantity, 2)) STORED,
+        UpdatedAt DATETIME NOT NULL DEFAULT {_NOW}
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS DeletedRows (
+        DeletionID INTEGER PRIMARY KEY AUTOINCREMENT,
+        TableName VARCHAR(16) NOT NULL,
+        RowID INTEGER NOT NULL,
+        DeletedAt DATETIME NOT NULL DEFAULT {_NOW}
+    )
+    """,
+    # The indexes of MySQL migrations 2, 3 and 6 (FULLTEXT is served by BOOLEAN_MATCH instead)
+    "CREATE INDEX IF NOT EXISTS idx_components_sign ON Components (SignID, ComponentID)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_component ON Jobs (ComponentID, JobID)",
+    "CREATE INDEX IF NOT EXISTS idx_signs_created ON Signs (CreationDate, SignID)",
+    "CREATE INDEX IF NOT EXISTS idx_signs_status_created ON Signs (Status, CreationDate, SignID)",
+    "CREATE INDEX IF NOT EXISTS idx_signs_name ON Signs (SignName)",
+    "CREATE INDEX IF NOT EXISTS idx_signs_customer ON Signs (CustomerInfo)",
+    "CREATE INDEX IF NOT EXISTS idx_signs_updated ON Signs (UpdatedAt, SignID)",
+    "CREATE INDEX IF NOT EXISTS idx_components_updated ON Components (UpdatedAt, ComponentID)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_updated ON Jobs (UpdatedAt, JobID)",
+    "CREATE INDEX IF NOT EXISTS idx_deleted_rows_at ON DeletedRows (DeletedAt, DeletionID)",
+    # Jobs move their Amount into the component's Subtotal ...
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_jobs_after_insert AFTER INSERT ON Jobs BEGIN
+        UPDATE Components SET Subtotal = ROUND(Subtotal + COALESCE(NEW.Amount, 0), 2)
+        WHERE ComponentID = NEW.ComponentID;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_jobs_after_update AFTER UPDATE OF ComponentID, UnitCost, Quantity ON Jobs
+    WHEN OLD.ComponentID <> NEW.ComponentID OR OLD.Amount IS NOT NEW.Amount BEGIN
+        UPDATE Components SET Subtotal = ROUND(Subtotal - COALESCE(OLD.Amount, 0), 2)
+        WHERE ComponentID = OLD.ComponentID;
+        UPDATE Components SET Subtotal = ROUND(Subtotal + COALESCE(NEW.Amount, 0), 2)
+        WHERE ComponentID = NEW.ComponentID;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_jobs_after_delete AFTER DELETE ON Jobs BEGIN
+        UPDATE Components SET Subtotal = ROUND(Subtotal - COALESCE(OLD.Amount, 0), 2)
+        WHERE ComponentID = OLD.ComponentID;
+    END
+    """,
+    # ... and components pass Subtotal changes on to the sign's TotalCost. Unlike MySQL,
+    # cascaded deletes fire triggers here, but the parent row is already gone by then.
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_components_after_insert AFTER INSERT ON Components BEGIN
+        UPDATE Signs SET TotalCost = ROUND(TotalCost + NEW.Subtotal, 2) WHERE SignID = NEW.SignID;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_components_after_update AFTER UPDATE OF SignID, Subtotal ON Components
+    WHEN OLD.SignID <> NEW.SignID OR OLD.Subtotal <> NEW.Subtotal BEGIN
+        UPDATE Signs SET TotalCost = ROUND(TotalCost - OLD.Subtotal, 2) WHERE SignID = OLD.SignID;
+        UPDATE Signs SET TotalCost = ROUND(TotalCost + NEW.Subtotal, 2) WHERE SignID = NEW.SignID;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_components_after_delete AFTER DELETE ON Components BEGIN
+        UPDATE Signs SET TotalCost = ROUND(TotalCost - OLD.Subtotal, 2) WHERE SignID = OLD.SignID;
+    END
+    """,
+    # MySQL's ON UPDATE CURRENT_TIMESTAMP(6), unless the statement set UpdatedAt itself
+    *[f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_touch AFTER UPDATE ON {table}
+    WHEN NEW.UpdatedAt IS OLD.UpdatedAt BEGIN
+        UPDATE {table} SET UpdatedAt = {_NOW} WHERE {key} = NEW.{key};
+    END
+    """ for table, key in _TABLES],
+    # Cascaded deletes leave tombstones for the children too; readers treat them as no-ops
+    *[f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table.lower()}_log_delete AFTER DELETE ON {table} BEGIN
+        INSERT INTO DeletedRows (TableName, RowID) VALUES ('{table}', OLD.{key});
+    END
+    """ for table, key in _TABLES],
+]
+
+
+def _now(precision=0):
+    """NOW() / NOW(6)"""
+    value = datetime.now()
+    if not precision:
+        value = value.replace(microsecond=0)
+    return value.isoformat(" ", timespec="microseconds")
+
+
+def _boolean_match(expression, *texts):
+    """MATCH (...) AGAINST (expression IN BOOLEAN MODE) for the +word / -word / word* operators"""
+    words = set()
+    for text in texts:
+        if text:
+            words.update(re.findall(r"\w+", text.lower()))
+
+    def found(term):
+        if term.endswith("*"):
+            prefix = term[:-1]
+            return any(word.startswith(prefix) for word in words)
+        return term in words
+
+    required = False
+    optional = []
+    for term in (expression or "").lower().split():
+        operator, term = (term[0], term[1:]) if term[0] in "+-" else ("", term)
+        if not term.strip("*"):
+            continue
+        if operator == "+":
+            if not found(term):
+                return 0
+            required = True
+        elif operator == "-":
+            if found(term):
+                return 0
+        else:
+            optional.append(term)
+    # As in MySQL: with required words the others only rank; without, one of them must match
+    return int(required or any(found(term) for term in optional))
+
+
+_UPDATE_JOIN = re.compile(
+    r"^\s*UPDATE\s+(\w+)\s+(\w+)\s+JOIN\s+(\w+)\s+(\w+)\s+ON\s+(.+?)\s+SET\s+(.+?)(?:\s+WHERE\s+(.+?))?\s*$",
+    re.IGNORECASE | re.DOTALL)
+
+# UPDATE t a LEFT JOIN (SELECT key, AGG(...) AS x FROM src GROUP BY key) b ON b.key = a.col SET ...
+_UPDATE_LEFT_JOIN_GROUPED = re.compile(
+    r"^\s*UPDATE\s+(\w+)\s+(\w+)\s+LEFT\s+JOIN\s+\(\s*SELECT\s+(\w+)\s*,\s*(.+?)\s+AS\s+(\w+)\s+FROM\s+(\w+)"
+    r"\s+GROUP\s+BY\s+\3\s*\)\s*(\w+)\s+ON\s+\7\.\3\s*=\s*\2\.(\w+)\s+SET\s+(.+?)\s*$",
+    re.IGNORECASE | re.DOTALL)
+
+
+def _strip_alias(assignments, alias):
+    """SQLite's SET takes bare column names"""
+    return re.sub(rf"(^|,\s*){alias}\.", r"\1", assignments.strip())
+
+
+def _rewrite_update(query):
+    """MySQL multi-table UPDATEs in SQLite's terms, or None for any other statement"""
+    match = _UPDATE_JOIN.match(query)
+    if match:
+        table, alias, source, source_alias, on, assignments, where = match.groups()
+        condition = f"{on} AND ({where})" if where else on
+        return (f"UPDATE {table} AS {alias} SET {_strip_alias(assignments, alias)} "
+                f"FROM {source} AS {source_alias} WHERE {condition}")
+
+    match = _UPDATE_LEFT_JOIN_GROUPED.match(query)
+    if match:
+        # The grouped value becomes a correlated aggregate, which walks the source's index per
+        # row; unmatched rows see NULL, as through the LEFT JOIN. Sums of money are floating
+        # point here, so they are rounded to cents as a DECIMAL(12, 2) column would store them.
+        table, alias, key, aggregate, name, source, source_alias, column, assignments = match.groups()
+        value = f"(SELECT ROUND({aggregate}, 2) FROM {source} WHERE {source}.{key} = {alias}.{column})"
+        assignments = re.sub(rf"\b{source_alias}\.{name}\b", value, _strip_alias(assignments, alias))
+        return f"UPDATE {table} AS {alias} SET {assignments}"
+    return None
+
+
+# (pattern, replacement) applied in order; %s placeholders are translated last
+_REWRITES = [
+    (re.compile(r"MATCH\s*\(([^)]*)\)\s*AGAINST\s*\(\s*%s\s+IN\s+BOOLEAN\s+MODE\s*\)", re.IGNORECASE),
+     r"BOOLEAN_MATCH(%s, \1)"),
+    (re.compile(r"(%s|[\w.]+)\s*\+\s*INTERVAL\s+(\d+)\s+DAY\b", re.IGNORECASE), r"datetime(\1, '+\2 days')"),
+    # Typed alias so the value comes back as a datetime
+    (re.compile(r"\b(NOW\(\d*\))\s+AS\s+(\w+)", re.IGNORECASE), r'\1 AS "\2 [DATETIME]"'),
+    # MySQL escapes LIKE wildcards with a backslash by default
+    (re.compile(r"\bLIKE\s+%s", re.IGNORECASE), r"LIKE %s ESCAPE '\\'"),
+    (re.compile(r"\bDROP\s+TEMPORARY\s+TABLE\b", re.IGNORECASE), "DROP TABLE"),
+    (re.compile(r"\bCREATE\s+TEMPORARY\s+TABLE\b", re.IGNORECASE), "CREATE TEMP TABLE"),
+    (re.compile(r"\s*ENGINE\s*=\s*\w+", re.IGNORECASE), ""),
+    (re.compile(r"<=>"), " IS "),
+]
+
+
+@lru_cache(maxsize=512)
+def translate(query):
+    """Rewrite a MySQL-dialect statement for SQLite"""
+    query = _rewrite_update(query) or query
+    for pattern, replacement in _REWRITES:
+        query = pattern.sub(replacement, query)
+    return query.replace("%s", "?")
+
+
+class SQLiteCursor:
+    """sqlite3 cursor taking MySQL-dialect SQL and returning dicts when asked to"""
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def execute(self, query, params=None):
+        self._cursor.execute(translate(query), tuple(params or ()))
+
+    def executemany(self, query, seq_params):
+        self._cursor.executemany(translate(query), [tuple(params) for params in seq_params])
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def nextset(self):
+        return None  # sqlite3 runs one statement per call
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """sqlite3 connection with the mysql.connector methods DatabaseConnection calls"""
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._connection = None
+        self.reconnect()
+
+    def reconnect(self, attempts=1, delay=0):
+        self._connection = self._backend.open()
+
+    def is_connected(self):
+        return self._connection is not None
+
+    @property
+    def in_transaction(self):
+        return self._connection.in_transaction
+
+    def start_transaction(self):
+        # Take the write lock up front: upgrading a read transaction later can fail outright
+        self._connection.execute("BEGIN IMMEDIATE")
+
+    def cursor(self, dictionary=False, prepared=False):
+        # sqlite3 keeps compiled statements per connection, so prepared needs nothing extra
+        return SQLiteCursor(self._connection.cursor(), dictionary)
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def cmd_reset_connection(self):
+        if self._connection.in_transaction:
+            self._connection.rollback()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class SQLiteBackend(Backend):
+    name = "sqlite"
+    label = "SQLite database"
+    Error = sqlite3.Error
+    schema = SCHEMA
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("SQLITE_PATH", DEFAULT_SQLITE_PATH)
+        self.label = f"SQLite database {self.path}"
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connect(self):
+        return SQLiteConnection(self)
+
+    def open(self):
+        """Open a raw sqlite3 connection, creating the schema on first use"""
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                     detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                                     check_same_thread=False)  # The pool hands connections between threads
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.create_function("NOW", -1, _now)
+        connection.create_function("BOOLEAN_MATCH", -1, _boolean_match, deterministic=True)
+
+        with self._schema_lock:
+            if not self._schema_ready:
+                connection.execute("PRAGMA journal_mode = WAL")  # Readers do not block the writer
+                connection.execute("BEGIN IMMEDIATE")
+                for statement in SCHEMA:
+                    connection.execute(statement)
+                connection.execute("COMMIT")
+                self._schema_ready = True
+        return connection
@@ -1,91 +1,401 @@
 """
 Database connection management for the Sign Business application.
+
+The storage engine comes from DB_BACKEND (see db.backends): MySQL by
+default, or an embedded SQLite file.
 """
-import mysql.connector
-from mysql.connector import Error
 import tkinter.messagebox as messagebox
 import os
 from dotenv import load_dotenv
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from .metrics import metrics
+from .backends import get_backend
 
 
 load_dotenv()
 
-# Singleton pattern for database connection
+DEFAULT_POOL_SIZE = 5
+DEFAULT_POOL_TIMEOUT = 30.0
+
+
+def _report_error(title, message):
+    """Print an error and show it in a dialog, or hand it to the UI when off the main thread"""
+    print(message)
+    if not DatabaseConnection.show_error_dialogs:
+        return
+    if threading.current_thread() is threading.main_thread():
+        messagebox.showerror(title, message)
+    elif DatabaseConnection.background_error_handler is not None:
+        DatabaseConnection.background_error_handler(title, message)
+
+
+class _RecordingCursor:
+    """Stand-in cursor for run_in_transaction while statements are being recorded"""
+    lastrowid = 0
+    rowcount = 0
+
+    def __init__(self, db):
+        self._db = db
+
+    def execute(self, query, params=None):
+        self._db._intercept(query, params)
+
+    def executemany(self, query, seq_params):
+        seq_params = list(seq_params)
+        self._db._intercept(query, seq_params[0] if seq_params else None)
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class _TimedCursor:
+    """Cursor wrapper reporting each statement run by run_in_transaction's work to metrics"""
+
+    def __init__(self, cursor, error):
+        self._cursor = cursor
+        self._error = error
+
+    def _timed(self, method, query, params):
+        started = time.perf_counter()
+        try:
+            result = method(query, params)
+        except self._error:
+            metrics.record(query, time.perf_counter() - started, 0, params, failed=True)
+            raise
+        metrics.record(query, time.perf_counter() - started, max(self._cursor.rowcount, 0), params)
+        return result
+
+    def execute(self, query, params=None):
+        return self._timed(self._cursor.execute, query, params or ())
+
+    def executemany(self, query, seq_params):
+        return self._timed(self._cursor.executemany, query, seq_params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+# Singleton pattern for the database connection pool
 class DatabaseConnection:
     _instance = None
-    
+    _instance_lock = threading.Lock()
+    background_error_handler = None  # Called as handler(title, message) for worker-thread errors
+    show_error_dialogs = True        # False for command-line tools: errors are only printed
+
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls._instance = DatabaseConnection()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = DatabaseConnection()
         return cls._instance
-    
+
     def __init__(self):
         if DatabaseConnection._instance is not None:
             raise Exception("This class is a singleton. Use get_instance() instead.")
-        
-        self.connection = None
-        self.connect()
-    
+
+        self.backend = get_backend()
+        self.Error = self.backend.Error  # What the driver raises; callers catch db.Error
+
+        self.pool_size = max(1, int(os.getenv("DB_POOL_SIZE", DEFAULT_POOL_SIZE)))
+        self.pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", DEFAULT_POOL_TIMEOUT))
+
+        self._pool_lock = threading.Condition()
+        self._idle = []          # Connections ready to be checked out
+        self._in_use = {}        # id(connection) -> (connection, owner thread)
+        self._opening = 0        # Connections being opened outside the lock
+        self._waiting = 0
+        self._checkouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._local = threading.local()
+
+        # Server-side prepared statements: id(connection) -> {key: (cursor, sql)}
+        self._statement_caches = {}
+        self._statement_stats = {}  # key -> {"prepares": n, "executions": n}
+        self._statement_lock = threading.Lock()
+        # No connection is opened here: the first query opens one, so importing db.queries stays cheap
+
+    def _open_connection(self):
+        """Open a new raw connection through the configured backend"""
+        return self.backend.connect()
+
     def connect(self):
-        """Establish a connection to the MySQL database"""
+        """Open a connection ahead of first use and add it to the pool"""
         try:
-            self.connection = mysql.connector.connect(
-                host=os.getenv("DB_HOST"),
-                user=os.getenv("DB_USER"),  
-                password=os.getenv("DB_PASSWORD"),  
-                database=os.getenv("DB_NAME"),
-                consume_results=True  # Auto-consume unread results
-            )
-            if self.connection.is_connected():
-                print("Connected to MySQL database")
+            connection = self._open_connection()
+            if connection.is_connected():
+                with self._pool_lock:
+                    self._idle.append(connection)
+                    self._pool_lock.notify()
+                print(f"Connected to {self.backend.label}")
                 return True
-        except Error as e:
-            messagebox.showerror("Database Error", f"Error connecting to MySQL database: {e}")
-            print(f"Error connecting to database: {e}")
+        except self.Error as e:
+            _report_error("Database Error", f"Error connecting to {self.backend.label}: {e}")
             return False
-    
+
+    def _total_connections(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _reclaim_dead_owners(self):
+        """Return connections held by threads that have exited. Caller holds the lock."""
+        for key, (connection, owner) in list(self._in_use.items()):
+            if not owner.is_alive():
+                del self._in_use[key]
+                self._idle.append(connection)
+
+    def checkout(self, timeout=None):
+        """Check a connection out of the pool, waiting up to timeout seconds for one to free up"""
+        timeout = self.pool_timeout if timeout is None else timeout
+        started = time.perf_counter()
+        deadline = started + timeout
+        connection = None
+
+        with self._pool_lock:
+            while True:
+                if not self._idle:
+                    self._reclaim_dead_owners()
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                if self._total_connections() < self.pool_size:
+                    self._opening += 1
+                    break
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    _report_error("Database Error",
+                                  f"Timed out after {timeout:.0f}s waiting for a database connection")
+                    return None
+                self._waiting += 1
+                try:
+                    self._pool_lock.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        if connection is None:
+            # Open the new connection outside the lock so other threads are not blocked
+            try:
+                connection = self._open_connection()
+            except self.Error as e:
+                with self._pool_lock:
+                    self._opening -= 1
+                    self._pool_lock.notify()
+                _report_error("Database Error", f"Error connecting to {self.backend.label}: {e}")
+                return None
+            with self._pool_lock:
+                self._opening -= 1
+
+        waited = time.perf_counter() - started
+        with self._pool_lock:
+            self._in_use[id(connection)] = (connection, threading.current_thread())
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return connection
+
+    def release(self, connection):
+        """Return a checked-out connection to the pool"""
+        if connection is None:
+            return
+        try:
+            # Drop any transaction state left behind so the next user starts clean
+            if connection.is_connected() and connection.in_transaction:
+                connection.rollback()
+        except self.Error:
+            pass
+        with self._pool_lock:
+            if self._in_use.pop(id(connection), None) is not None:
+                self._idle.append(connection)
+                self._pool_lock.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a connection for the duration of a block.
+
+        Reuses the calling thread's connection when it already holds one.
+        """
+        held = getattr(self._local, "connection", None)
+        if held is not None:
+            yield self.get_connection()
+            return
+
+        connection = self.checkout()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
     def get_connection(self):
-        """Get the database connection, reconnecting if necessary"""
+        """Get the calling thread's database connection, reconnecting if necessary"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self.checkout()
+            if connection is None:
+                return None
+            self._local.connection = connection
+
         try:
-            if self.connection is None or not self.connection.is_connected():
-                self.connect()
-            return self.connection
-        except Error as e:
-            messagebox.showerror("Database Error", f"Error reconnecting to database: {e}")
+            if not connection.is_connected():
+                # Prepared statements do not survive a reconnect
+                self._drop_statement_cache(connection)
+                connection.reconnect(attempts=2, delay=0)
+            return connection
+        except self.Error as e:
+            _report_error("Database Error", f"Error reconnecting to database: {e}")
             return None
-    
+
+    def release_connection(self):
+        """Return the calling thread's connection to the pool"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            self._local.connection = None
+            self.release(connection)
+
+    def in_transaction(self):
+        """True while the calling thread is inside a transaction() block"""
+        return getattr(self._local, "transaction_depth", 0) > 0
+
+    @contextmanager
+    def transaction(self):
+        """Unit of work: group every query run on this thread in the block into one commit.
+
+        While the block runs, execute_query(..., commit=True), execute_insert
+        and run_in_transaction skip their own commits, and database errors
+        are raised instead of returning None so the block aborts. Leaving the
+        block normally commits once; any exception rolls everything back and
+        propagates. Nested blocks join the outermost transaction.
+        """
+        if self.in_transaction():
+            self._local.transaction_depth += 1
+            try:
+                yield self.get_connection()
+            finally:
+                self._local.transaction_depth -= 1
+            return
+
+        connection = self.get_connection()
+        if connection is None:
+            raise self.Error("No database connection available")
+
+        self._local.transaction_depth = 1
+        self._local.after_commit = []
+        try:
+            self._begin(connection)
+            yield connection
+            connection.commit()
+        except BaseException:
+            try:
+                connection.rollback()
+            except self.Error as e:
+                print(f"Error rolling back transaction: {e}")
+            raise
+        finally:
+            self._local.transaction_depth = 0
+            callbacks, self._local.after_commit = self._local.after_commit, []
+            # Run on rollback too: callbacks only drop cached state, which is always safe
+            for callback in callbacks:
+                callback()
+
+    def _begin(self, connection):
+        """Start an explicit transaction, ending any implicit one a driver left open"""
+        if connection.in_transaction:
+            connection.rollback()
+        connection.start_transaction()
+
+    def after_commit(self, callback):
+        """Run callback once the current transaction ends, or right away outside one"""
+        if self.in_transaction():
+            self._local.after_commit.append(callback)
+        else:
+            callback()
+
+    @contextmanager
+    def record_queries(self):
+        """Record every statement the calling thread issues inside the block.
+
+        Yields a list that fills with (query, params) tuples. SELECTs still run
+        so callers get real rows back; anything else is recorded but not sent.
+        """
+        recorded = []
+        self._local.recorder = recorded
+        try:
+            yield recorded
+        finally:
+            self._local.recorder = None
+
+    def _intercept(self, query, params):
+        """Record a statement while recording; True means it must not be executed"""
+        recorder = getattr(self._local, "recorder", None)
+        if recorder is None:
+            return False
+        recorder.append((query, params))
+        return not query.lstrip().upper().startswith("SELECT")
+
+    def pool_stats(self):
+        """Return a snapshot of pool usage and checkout wait times"""
+        with self._pool_lock:
+            return {
+                "size": self.pool_size,
+                "open": len(self._idle) + len(self._in_use),
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "total_wait_time": self._total_wait,
+                "avg_wait_time": self._total_wait / self._checkouts if self._checkouts else 0.0,
+                "max_wait_time": self._max_wait,
+            }
+
     def execute_query(self, query, params=None, fetchone=False, fetchall=False, commit=False):
         """Execute a query with optional parameters and return results"""
+        if self._intercept(query, params):
+            return [] if fetchall else (None if fetchone else 0)
+
         connection = self.get_connection()
         if not connection:
             return None
-        
+
         cursor = None
+        started = time.perf_counter()
         try:
             cursor = connection.cursor(dictionary=True)
             cursor.execute(query, params or ())
-            
+
             result = None
             if fetchone:
                 result = cursor.fetchone()
+                rows = 1 if result else 0
             elif fetchall:
                 result = cursor.fetchall()
+                rows = len(result)
             else:
                 # Consume results explicitly
                 while cursor.nextset():
                     pass  # Exhaust all result sets
-            
-            if commit:
+                # Report the affected row count so callers can tell success from an error (None)
+                result = rows = cursor.rowcount
+
+            if commit and not self.in_transaction():
                 connection.commit()
-                
+
+            metrics.record(query, time.perf_counter() - started, rows, params)
             return result
-        except Error as e:
+        except self.Error as e:
+            metrics.record(query, time.perf_counter() - started, 0, params, failed=True)
+            if self.in_transaction():
+                raise  # Abort the unit of work; transaction() rolls back
             if commit:
                 connection.rollback()
-            messagebox.showerror("Database Error", f"Error executing query: {e}")
-            print(f"Error executing query: {e}")
+            _report_error("Database Error", f"Error executing query: {e}")
             return None
         finally:
             if cursor:
@@ -96,19 +406,195 @@ class DatabaseConnection:
                 except:
                     pass  # Ignore any errors during cleanup
                 cursor.close()
-    
-    def close(self):
-        """Close the database connection"""
+
+    def _prepared_cursor(self, connection, key, query):
+        """Return the cached prepared cursor for key on this connection, preparing it if needed.
+
+        mysql.connector only re-uses a prepared statement when it is handed the
+        very same string object again, so the cached SQL string is returned too.
+        """
+        with self._statement_lock:
+            statements = self._statement_caches.setdefault(id(connection), {})
+            stats = self._statement_stats.setdefault(key, {"prepares": 0, "executions": 0})
+            stats["executions"] += 1
+            entry = statements.get(key)
+            if entry is not None and entry[1] == query:
+                return entry
+            stats["prepares"] += 1
+
+        if entry is not None:
+            entry[0].close()
+        entry = (connection.cursor(prepared=True, dictionary=True), query)
+        with self._statement_lock:
+            self._statement_caches.setdefault(id(connection), {})[key] = entry
+        return entry
+
+    def _drop_statement_cache(self, connection, key=None):
+        """Close cached prepared cursors for a connection (or just one key)"""
+        with self._statement_lock:
+            statements = self._statement_caches.get(id(connection), {})
+            if key is None:
+                entries = list(statements.values())
+                self._statement_caches.pop(id(connection), None)
+            else:
+                entries = [statements.pop(key)] if key in statements else []
+        for cursor, _ in entries:
+            try:
+                cursor.close()
+            except Exception:
+                pass  # Statement already gone with the old session
+
+    def execute_prepared(self, key, query, params=None, fetchone=False, fetchall=False,
+                         commit=False, insert=False):
+        """Execute a hot statement through a server-side prepared statement cached per connection.
+
+        key names the statement in the cache and in statement_stats(). Results
+        follow execute_query; with insert=True the generated ID is returned.
+        """
+        if self._intercept(query, params):
+            return [] if fetchall else (None if fetchone else 0)
+
+        connection = self.get_connection()
+        if not connection:
+            return None
+
+        started = time.perf_counter()
+        try:
+            cursor, sql = self._prepared_cursor(connection, key, query)
+            cursor.execute(sql, params or ())
+
+            result = None
+            if fetchone or fetchall:
+                rows = cursor.fetchall()  # Always drain so the statement can be re-executed
+                result = rows if fetchall else (rows[0] if rows else None)
+                count = len(rows)
+            elif insert:
+                result = cursor.lastrowid
+                count = cursor.rowcount
+            else:
+                result = count = cursor.rowcount
+
+            if commit and not self.in_transaction():
+                connection.commit()
+
+            metrics.record(query, time.perf_counter() - started, count, params)
+            return result
+        except self.Error as e:
+            metrics.record(query, time.perf_counter() - started, 0, params, failed=True)
+            # The statement may be invalid now (schema change, lost session); prepare afresh next time
+            self._drop_statement_cache(connection, key)
+            if self.in_transaction():
+                raise  # Abort the unit of work; transaction() rolls back
+            if commit:
+                connection.rollback()
+            _report_error("Database Error", f"Error executing query: {e}")
+            return None
+
+    def statement_stats(self):
+        """Return prepare/execution counts per cached statement and overall reuse"""
+        with self._statement_lock:
+            per_statement = {key: dict(stats) for key, stats in self._statement_stats.items()}
+            cached = sum(len(statements) for statements in self._statement_caches.values())
+        executions = sum(stats["executions"] for stats in per_statement.values())
+        prepares = sum(stats["prepares"] for stats in per_statement.values())
+        return {
+            "cached_statements": cached,
+            "executions": executions,
+            "prepares": prepares,
+            "reuses": executions - prepares,
+            "reuse_rate": (executions - prepares) / executions if executions else 0.0,
+            "statements": per_statement,
+        }
+
+    def execute_insert(self, query, params=None, commit=True):
+        """Execute an INSERT and return the generated ID from the cursor that ran it"""
+        if self._intercept(query, params):
+            return 0
+
+        connection = self.get_connection()
+        if not connection:
+            return None
+
+        cursor = None
+        started = time.perf_counter()
         try:
-            if self.connection:
+            cursor = connection.cursor()
+            cursor.execute(query, params or ())
+            last_id = cursor.lastrowid
+            if commit and not self.in_transaction():
+                connection.commit()
+            metrics.record(query, time.perf_counter() - started, cursor.rowcount, params)
+            return last_id
+        except self.Error as e:
+            metrics.record(query, time.perf_counter() - started, 0, params, failed=True)
+            if self.in_transaction():
+                raise  # Abort the unit of work; transaction() rolls back
+            if commit:
+                connection.rollback()
+            _report_error("Database Error", f"Error executing query: {e}")
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+
+    def run_in_transaction(self, work):
+        """Run work(cursor) inside a single transaction and commit once.
+
+        Any database error rolls back everything work did; the error is
+        reported and None is returned. Otherwise work's return value is returned.
+        """
+        if getattr(self._local, "recorder", None) is not None:
+            return work(_RecordingCursor(self))
+
+        if self.in_transaction():
+            # Already inside a unit of work: join it and let it commit
+            with self.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    return work(_TimedCursor(cursor, self.Error))
+                finally:
+                    cursor.close()
+
+        connection = self.get_connection()
+        if not connection:
+            return None
+
+        cursor = None
+        try:
+            self._begin(connection)
+            cursor = connection.cursor()
+            result = work(_TimedCursor(cursor, self.Error))
+            connection.commit()
+            return result
+        except self.Error as e:
+            connection.rollback()
+            _report_error("Database Error", f"Error executing transaction: {e}")
+            return None
+        finally:
+            if cursor:
+                cursor.close()
+
+    def close(self):
+        """Close every pooled database connection"""
+        with self._pool_lock:
+            connections = self._idle + [connection for connection, _ in self._in_use.values()]
+            self._idle = []
+            self._in_use = {}
+        self._local = threading.local()
+
+        for connection in connections:
+            self._drop_statement_cache(connection)
+        for connection in connections:
+            try:
                 # Make sure we catch any connection errors during close
                 try:
-                    if self.connection.is_connected():
+                    if connection.is_connected():
                         # Ensure all cursors are closed and results consumed
-                        self.connection.cmd_reset_connection()
-                        self.connection.close()
-                        print("Database connection closed")
-                except Error as e:
+                        connection.cmd_reset_connection()
+                        connection.close()
+                except self.Error as e:
                     print(f"Error while closing connection: {e}")
-        except Exception as e:
-            print(f"Error closing database connection: {e}")
\ No newline at end of file
+            except Exception as e:
+                print(f"Error closing database connection: {e}")
+        if connections:
+            print("Database connections closed")
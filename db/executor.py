@@ -0,0 +1,39 @@
+"""
+Background query execution for the Sign Business application.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from .connection import DatabaseConnection
+
+
+# Singleton pattern for the query worker pool
+class QueryExecutor:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = QueryExecutor()
+        return cls._instance
+
+    def __init__(self, max_workers=None):
+        if QueryExecutor._instance is not None:
+            raise Exception("This class is a singleton. Use get_instance() instead.")
+
+        db = DatabaseConnection.get_instance()
+        # Each worker keeps its own pooled connection; leave one for the Tk main thread
+        self.max_workers = max_workers or max(1, db.pool_size - 1)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="db-query")
+
+    def submit(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on a worker thread and return its Future"""
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait=False):
+        """Stop the workers, dropping any queries that have not started yet"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        QueryExecutor._instance = None
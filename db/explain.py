@@ -0,0 +1,137 @@
+"""
+EXPLAIN checker for the queries in db.queries.
+
+Run ``python -m db.explain`` to call every query function against the
+connected database, capture the SQL it issues and EXPLAIN each statement.
+Writes are recorded, never executed. Statements that scan a whole table are
+flagged and make the command exit with status 1.
+"""
+import inspect
+import sys
+from datetime import datetime, timedelta
+from .connection import DatabaseConnection
+from . import queries
+
+# Functions that issue no SQL of their own
+SKIP_FUNCTIONS = {"sign_page_key", "invalidate_sign"}
+
+# Tables smaller than this are not worth flagging: a scan is as cheap as an index lookup
+MIN_FLAGGED_ROWS = 100
+
+
+def _sample_ids(db):
+    """Pick real IDs so every branch of the query functions gets exercised"""
+    row = db.execute_query("""
+    SELECT s.SignID, c.ComponentID, j.JobID
+    FROM Signs s
+    LEFT JOIN Components c ON c.SignID = s.SignID
+    LEFT JOIN Jobs j ON j.ComponentID = c.ComponentID
+    ORDER BY j.JobID IS NULL, c.ComponentID IS NULL, s.SignID DESC
+    LIMIT 1
+    """, fetchone=True) or {}
+    return {
+        "sign_id": row.get("SignID") or 1,
+        "component_id": row.get("ComponentID") or 1,
+        "job_id": row.get("JobID") or 1,
+    }
+
+
+def _sample_calls(ids):
+    """Keyword arguments to call each query function with, by function name"""
+    first_page = queries.get_signs_page(limit=1) or []
+    after = queries.sign_page_key(first_page[0]) if first_page else None
+    values = dict(ids,
+                  name="EXPLAIN check", component_name="EXPLAIN check", job_name="EXPLAIN check",
+                  description="", customer_info="", status="Pending",
+                  unit_cost=1.0, quantity=1.0, components=["EXPLAIN check"], sign_ids=[ids["sign_id"]],
+                  watermark=datetime.now() - timedelta(hours=1),
+                  changes=[("update", (ids["job_id"], "EXPLAIN check", 1.0, 1.0))])
+    overrides = {
+        "get_signs_page": [{}, {"after": after}],
+        "search_signs": [{"text": "cartel"}, {"text": "ab"}, {"status": "Pending", "after": after},
+                         {"date_from": "2024-01-01", "date_to": "2024-12-31"}, {"customer": "Juan"}],
+    }
+
+    calls = {}
+    for name, function in inspect.getmembers(queries, inspect.isfunction):
+        if name.startswith("_") or name in SKIP_FUNCTIONS or function.__module__ != queries.__name__:
+            continue
+        if name in overrides:
+            calls[name] = (function, overrides[name])
+            continue
+        parameters = inspect.signature(function).parameters
+        kwargs = {p: values[p] for p in parameters if p in values}
+        missing = [p for p, spec in parameters.items()
+                   if p not in kwargs and spec.default is inspect.Parameter.empty]
+        calls[name] = (function, [kwargs]) if not missing else (function, None)
+    return calls
+
+
+def _explain(cursor, query, params):
+    """Return EXPLAIN rows for a statement, or None for statements EXPLAIN cannot help with"""
+    verb = query.lstrip().split(None, 1)[0].upper()
+    if verb not in ("SELECT", "UPDATE", "DELETE"):
+        return None  # INSERT ... VALUES never scans
+    cursor.execute("EXPLAIN " + query, params or ())
+    return cursor.fetchall()
+
+
+def _check_transaction_after_read(db):
+    """A read followed by a unit of work on the same thread must not trip over an open transaction"""
+    db.execute_query("SELECT 1 AS ok", fetchone=True)
+    try:
+        with db.transaction():
+            db.execute_query("SELECT 1 AS ok", fetchone=True)
+    except db.Error as e:
+        raise SystemExit(f"transaction() failed after a read on the same connection: {e}")
+
+
+def check():
+    """EXPLAIN every statement issued by db.queries; return a list of findings"""
+    db = DatabaseConnection.get_instance()
+    if db.backend.name != "mysql":
+        raise SystemExit("db.explain reads MySQL's EXPLAIN output; run it with DB_BACKEND=mysql")
+    _check_transaction_after_read(db)
+    queries.cache.clear()  # Cached reads would hide their SQL
+    calls = _sample_calls(_sample_ids(db))
+
+    findings = []
+    with db.connection() as connection:
+        cursor = connection.cursor(dictionary=True)
+        try:
+            for name, (function, variants) in sorted(calls.items()):
+                if variants is None:
+                    print(f"{name}: skipped (no sample arguments)")
+                    continue
+                for kwargs in variants:
+                    queries.cache.clear()
+                    with db.record_queries() as recorded:
+                        function(**kwargs)
+                    for query, params in recorded:
+                        for row in _explain(cursor, query, params) or []:
+                            scanned = row.get("rows") or 0
+                            full_scan = row.get("type") == "ALL" and scanned >= MIN_FLAGGED_ROWS
+                            findings.append({
+                                "function": name,
+                                "table": row.get("table"),
+                                "type": row.get("type"),
+                                "key": row.get("key"),
+                                "rows": scanned,
+                                "extra": row.get("Extra"),
+                                "full_scan": full_scan,
+                                "query": " ".join(query.split()),
+                            })
+        finally:
+            cursor.close()
+    return findings
+
+
+if __name__ == "__main__":
+    findings = check()
+    for f in findings:
+        flag = "FULL SCAN" if f["full_scan"] else "ok"
+        print(f"{flag:9} {f['function']:28} {f['table'] or '-':12} type={f['type']} "
+              f"key={f['key']} rows={f['rows']} {f['extra'] or ''}")
+    scans = [f for f in findings if f["full_scan"]]
+    print(f"\n{len(findings)} plan rows checked, {len(scans)} full table scans")
+    sys.exit(1 if scans else 0)
@@ -0,0 +1,195 @@
+"""
+Query timing instrumentation for the Sign Business application.
+
+DatabaseConnection reports every statement it runs to `metrics`, which
+keeps a latency histogram and row counts per statement and the number of
+round trips per UI action. Statements slower than DB_SLOW_QUERY_MS
+(default 250) are appended to DB_SLOW_QUERY_LOG (default slow_queries.log;
+set it to an empty string to disable the log).
+"""
+import contextvars
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_SLOW_QUERY_MS = 250
+DEFAULT_SLOW_QUERY_LOG = "slow_queries.log"
+
+# Histogram bucket upper bounds in milliseconds; the last bucket holds everything slower
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+UNTAGGED = "(untagged)"
+
+_action = contextvars.ContextVar("db_action", default=None)
+
+_IN_LIST = re.compile(r"IN \((?:%s|\?)(?:\s*,\s*(?:%s|\?))*\)", re.IGNORECASE)
+
+
+def normalize(query):
+    """Statement text used as the metrics key: one line, variable IN lists folded"""
+    return _IN_LIST.sub("IN (...)", " ".join(query.split()))
+
+
+def caller_action(skip_modules=()):
+    """Name the view method that called into the current function, e.g. 'SignViews.show_signs_list'"""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_globals.get("__name__") in skip_modules:
+        frame = frame.f_back
+    if frame is None:
+        return UNTAGGED
+    code = frame.f_code
+    # co_qualname (with the class name) is only there on Python 3.11+
+    return getattr(code, "co_qualname", code.co_name).split(".<locals>")[0]
+
+
+def current_action():
+    return _action.get() or UNTAGGED
+
+
+@contextmanager
+def action(name):
+    """Attribute the statements run inside the block to a UI action"""
+    metrics.action_started(name)
+    token = _action.set(name)
+    try:
+        yield
+    finally:
+        _action.reset(token)
+
+
+def run_as(name, fn, *args, **kwargs):
+    """Call fn inside action(name); handed to executors so worker threads carry the tag"""
+    with action(name):
+        return fn(*args, **kwargs)
+
+
+class QueryMetrics:
+    """Thread-safe per-statement latency histograms and per-action round trip counts"""
+
+    def __init__(self):
+        self.slow_query_ms = float(os.getenv("DB_SLOW_QUERY_MS", DEFAULT_SLOW_QUERY_MS))
+        self.slow_query_log = os.getenv("DB_SLOW_QUERY_LOG", DEFAULT_SLOW_QUERY_LOG)
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._statements = {}  # normalized SQL -> stats
+            self._actions = {}     # action name -> stats
+            self.started = time.time()
+
+    def action_started(self, name):
+        with self._lock:
+            self._action_stats(name)["calls"] += 1
+
+    def record(self, query, seconds, rows=None, params=None, failed=False):
+        """Record one round trip to the database"""
+        ms = seconds * 1000
+        key = normalize(query)
+        name = current_action()
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                stats = self._statements[key] = {
+                    "count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                    "histogram": [0] * (len(BUCKETS_MS) + 1), "actions": set(),
+                }
+            stats["count"] += 1
+            stats["errors"] += failed
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["rows"] += rows or 0
+            stats["histogram"][self._bucket(ms)] += 1
+            stats["actions"].add(name)
+
+            action_stats = self._action_stats(name)
+            action_stats["round_trips"] += 1
+            action_stats["total_ms"] += ms
+
+        if ms >= self.slow_query_ms and self.slow_query_log:
+            self._log_slow(key, ms, rows, params, name)
+
+    def _action_stats(self, name):
+        """Stats entry for an action. Caller holds the lock."""
+        stats = self._actions.get(name)
+        if stats is None:
+            stats = self._actions[name] = {"calls": 0, "round_trips": 0, "total_ms": 0.0}
+        return stats
+
+    @staticmethod
+    def _bucket(ms):
+        for index, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                return index
+        return len(BUCKETS_MS)
+
+    @staticmethod
+    def _percentile(histogram, fraction):
+        """Upper bound of the bucket holding the given fraction of calls; None past the last bucket"""
+        total = sum(histogram)
+        if not total:
+            return 0.0
+        seen = 0
+        for index, count in enumerate(histogram):
+            seen += count
+            if seen >= fraction * total:
+                return float(BUCKETS_MS[index]) if index < len(BUCKETS_MS) else None
+        return None
+
+    def _log_slow(self, key, ms, rows, params, name):
+        line = (f"{datetime.now().isoformat(timespec='seconds')} {ms:.1f} ms rows={rows} "
+                f"action={name} {key} params={params!r:.200}\n")
+        try:
+            with self._log_lock, open(self.slow_query_log, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            print(f"Could not write slow query log: {e}")
+
+    def snapshot(self):
+        """Statements (slowest total first) and actions (most round trips first) as plain data"""
+        with self._lock:
+            statements = [
+                {
+                    "statement": key,
+                    "count": s["count"],
+                    "errors": s["errors"],
+                    "total_ms": s["total_ms"],
+                    "avg_ms": s["total_ms"] / s["count"],
+                    "p50_ms": self._percentile(s["histogram"], 0.5),
+                    "p95_ms": self._percentile(s["histogram"], 0.95),
+                    "max_ms": s["max_ms"],
+                    "rows": s["rows"],
+                    "histogram": dict(zip([f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"],
+                                          s["histogram"])),
+                    "actions": sorted(s["actions"]),
+                }
+                for key, s in self._statements.items()
+            ]
+            actions = [
+                dict(a, action=name,
+                     round_trips_per_call=a["round_trips"] / a["calls"] if a["calls"] else float(a["round_trips"]))
+                for name, a in self._actions.items()
+            ]
+            started = self.started
+        statements.sort(key=lambda s: s["total_ms"], reverse=True)
+        actions.sort(key=lambda a: a["round_trips"], reverse=True)
+        return {"since": datetime.fromtimestamp(started).isoformat(timespec="seconds"),
+                "statements": statements, "actions": actions}
+
+    def dump(self, path, extra=None):
+        """Write the snapshot (plus any extra sections) to a JSON file"""
+        data = self.snapshot()
+        data.update(extra or {})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, default=str)
+        return path
+
+
+metrics = QueryMetrics()
@@ -0,0 +1,353 @@
+"""
+Versioned schema migrations for the Sign Business database.
+
+Run ``python -m db.migrations`` to bring the connected database up to the
+latest version. Applied versions are recorded in SchemaMigrations; each
+migration runs once, in order. Steps are written to be safe on databases
+that were created by hand before migrations existed.
+
+The steps are MySQL's. A backend with its own schema (SQLite) creates it
+whole at the latest version, and migrate() only records the versions.
+"""
+from .connection import DatabaseConnection
+
+
+def ensure_index(table, name, columns, kind=""):
+    """Migration step creating an index unless one with that name already exists"""
+    def step(cursor):
+        cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """, (table, name))
+        if cursor.fetchone()[0]:
+            return
+        prefix = f"{kind} " if kind else ""
+        cursor.execute(f"CREATE {prefix}INDEX {name} ON {table} {columns}")
+    step.__doc__ = f"index {name} on {table}"
+    return step
+
+
+def ensure_column(table, name, definition, valid=None):
+    """Migration step adding a column unless the table already has it.
+
+    valid(data_type, extra), if given, checks an existing column against
+    information_schema; one that does not pass is redefined with definition.
+    """
+    def step(cursor):
+        cursor.execute("""
+        SELECT DATA_TYPE, EXTRA FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """, (table, name))
+        row = cursor.fetchone()
+        if row is None:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+        elif valid is not None and not valid(row[0].lower(), (row[1] or "").lower()):
+            # Tables made by hand before migrations existed: later steps rely on this definition
+            print(f"Redefining {table}.{name} as {definition}")
+            cursor.execute(f"ALTER TABLE {table} MODIFY COLUMN {name} {definition}")
+    step.__doc__ = f"column {name} on {table}"
+    return step
+
+
+def _stored_generated(data_type, extra):
+    return "stored generated" in extra
+
+
+def _plain_decimal(data_type, extra):
+    # The triggers write Subtotal and TotalCost, so they must not be generated
+    return data_type == "decimal" and "generated" not in extra.replace("default_generated", "")
+
+
+def _auto_updated(data_type, extra):
+    return data_type == "datetime" and "on update current_timestamp" in extra
+
+
+def replace_trigger(name, definition):
+    """Migration steps (re)creating a trigger"""
+    return [f"DROP TRIGGER IF EXISTS {name}", f"CREATE TRIGGER {name} {definition}"]
+
+
+# Recomputes a component's Subtotal from its jobs
+_RECOMPUTE_SUBTOTAL = """
+UPDATE Components
+SET Subtotal = (SELECT COALESCE(SUM(Amount), 0) FROM Jobs WHERE ComponentID = {component})
+WHERE ComponentID = {component};
+"""
+
+# Recomputes a sign's TotalCost from its components
+_RECOMPUTE_TOTAL = """
+UPDATE Signs
+SET TotalCost = (SELECT COALESCE(SUM(Subtotal), 0) FROM Components WHERE SignID = {sign})
+WHERE SignID = {sign};
+"""
+
+# Delta maintenance: shift a component's Subtotal / a sign's TotalCost by an amount
+_ADD_TO_SUBTOTAL = """
+UPDATE Components SET Subtotal = Subtotal + {delta} WHERE ComponentID = {component};
+"""
+
+_ADD_TO_TOTAL = """
+UPDATE Signs SET TotalCost = TotalCost + {delta} WHERE SignID = {sign};
+"""
+
+# Recompute every aggregate from scratch (also used by db.aggregates)
+REBUILD_SUBTOTALS = """
+UPDATE Components c
+LEFT JOIN (SELECT ComponentID, SUM(Amount) AS Total FROM Jobs GROUP BY ComponentID) j
+    ON j.ComponentID = c.ComponentID
+SET c.Subtotal = COALESCE(j.Total, 0)
+"""
+
+REBUILD_TOTALS = """
+UPDATE Signs s
+LEFT JOIN (SELECT SignID, SUM(Subtotal) AS Total FROM Components GROUP BY SignID) c
+    ON c.SignID = s.SignID
+SET s.TotalCost = COALESCE(c.Total, 0)
+"""
+
+# (version, description, steps); a step is an SQL string or a callable taking a cursor
+MIGRATIONS = [
+    (1, "Base tables", [
+        """
+        CREATE TABLE IF NOT EXISTS Signs (
+            SignID INT AUTO_INCREMENT PRIMARY KEY,
+            SignName VARCHAR(255) NOT NULL,
+            Description TEXT,
+            CustomerInfo VARCHAR(255),
+            CreationDate DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            Status VARCHAR(32) NOT NULL DEFAULT 'Pending',
+            TotalCost DECIMAL(12, 2) NOT NULL DEFAULT 0
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Components (
+            ComponentID INT AUTO_INCREMENT PRIMARY KEY,
+            SignID INT NOT NULL,
+            ComponentName VARCHAR(255) NOT NULL,
+            Subtotal DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            CONSTRAINT fk_components_sign FOREIGN KEY (SignID)
+                REFERENCES Signs (SignID) ON DELETE CASCADE
+        ) ENGINE=InnoDB
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS Jobs (
+            JobID INT AUTO_INCREMENT PRIMARY KEY,
+            ComponentID INT NOT NULL,
+            JobName VARCHAR(255) NOT NULL,
+            UnitCost DECIMAL(12, 2) NOT NULL,
+            Quantity DECIMAL(12, 2) NULL,
+            -- NULL when the job has no quantity; the UI shows it as '-'
+            Amount DECIMAL(14, 2) AS (UnitCost * Quantity) STORED,
+            CONSTRAINT fk_jobs_component FOREIGN KEY (ComponentID)
+                REFERENCES Components (ComponentID) ON DELETE CASCADE
+        ) ENGINE=InnoDB
+        """,
+        # CREATE TABLE IF NOT EXISTS leaves existing tables alone: check the columns later
+        # migrations build on and bring them in line
+        ensure_column("Jobs", "Amount", "DECIMAL(14, 2) AS (UnitCost * Quantity) STORED", _stored_generated),
+        ensure_column("Components", "Subtotal", "DECIMAL(12, 2) NOT NULL DEFAULT 0", _plain_decimal),
+        ensure_column("Signs", "TotalCost", "DECIMAL(12, 2) NOT NULL DEFAULT 0", _plain_decimal),
+    ]),
+    (2, "Foreign key indexes for the detail window and invoices", [
+        # get_components_by_sign_id / get_sign_tree: WHERE SignID = ? ORDER BY ComponentID
+        ensure_index("Components", "idx_components_sign", "(SignID, ComponentID)"),
+        # get_jobs_by_component_id / tree joins: WHERE ComponentID = ? ORDER BY JobID
+        ensure_index("Jobs", "idx_jobs_component", "(ComponentID, JobID)"),
+    ]),
+    (3, "Signs list, pagination and search indexes", [
+        # Keyset pagination of the signs list: ORDER BY CreationDate DESC, SignID DESC
+        ensure_index("Signs", "idx_signs_created", "(CreationDate, SignID)"),
+        # search_signs: status filter walked in list order
+        ensure_index("Signs", "idx_signs_status_created", "(Status, CreationDate, SignID)"),
+        # search_signs: word search on names and customers
+        ensure_index("Signs", "ft_signs_name_customer", "(SignName, CustomerInfo)", "FULLTEXT"),
+        # search_signs: short prefix searches that FULLTEXT ignores
+        ensure_index("Signs", "idx_signs_name", "(SignName)"),
+        ensure_index("Signs", "idx_signs_customer", "(CustomerInfo(64))"),
+    ]),
+    (4, "Keep Subtotal and TotalCost in step with Jobs", [
+        *replace_trigger("trg_jobs_after_insert", "AFTER INSERT ON Jobs FOR EACH ROW BEGIN"
+                         + _RECOMPUTE_SUBTOTAL.format(component="NEW.ComponentID") + "END"),
+        *replace_trigger("trg_jobs_after_update", "AFTER UPDATE ON Jobs FOR EACH ROW BEGIN"
+                         + _RECOMPUTE_SUBTOTAL.format(component="NEW.ComponentID")
+                         + "IF OLD.ComponentID <> NEW.ComponentID THEN"
+                         + _RECOMPUTE_SUBTOTAL.format(component="OLD.ComponentID") + "END IF; END"),
+        *replace_trigger("trg_jobs_after_delete", "AFTER DELETE ON Jobs FOR EACH ROW BEGIN"
+                         + _RECOMPUTE_SUBTOTAL.format(component="OLD.ComponentID") + "END"),
+        *replace_trigger("trg_components_after_update", "AFTER UPDATE ON Components FOR EACH ROW BEGIN"
+                         + _RECOMPUTE_TOTAL.format(sign="NEW.SignID")
+                         + "IF OLD.SignID <> NEW.SignID THEN"
+                         + _RECOMPUTE_TOTAL.format(sign="OLD.SignID") + "END IF; END"),
+        *replace_trigger("trg_components_after_delete", "AFTER DELETE ON Components FOR EACH ROW BEGIN"
+                         + _RECOMPUTE_TOTAL.format(sign="OLD.SignID") + "END"),
+    ]),
+    (5, "Maintain Subtotal and TotalCost by deltas instead of re-summing", [
+        # Jobs move their Amount into the component's Subtotal ...
+        *replace_trigger("trg_jobs_after_insert", "AFTER INSERT ON Jobs FOR EACH ROW BEGIN"
+                         + _ADD_TO_SUBTOTAL.format(delta="COALESCE(NEW.Amount, 0)", component="NEW.ComponentID")
+                         + "END"),
+        *replace_trigger("trg_jobs_after_update", "AFTER UPDATE ON Jobs FOR EACH ROW BEGIN "
+                         + "IF OLD.ComponentID = NEW.ComponentID THEN "
+                         + "IF NOT (OLD.Amount <=> NEW.Amount) THEN"
+                         + _ADD_TO_SUBTOTAL.format(delta="COALESCE(NEW.Amount, 0) - COALESCE(OLD.Amount, 0)",
+                                                   component="NEW.ComponentID")
+                         + "END IF; ELSE"
+                         + _ADD_TO_SUBTOTAL.format(delta="-COALESCE(OLD.Amount, 0)", component="OLD.ComponentID")
+                         + _ADD_TO_SUBTOTAL.format(delta="COALESCE(NEW.Amount, 0)", component="NEW.ComponentID")
+                         + "END IF; END"),
+        *replace_trigger("trg_jobs_after_delete", "AFTER DELETE ON Jobs FOR EACH ROW BEGIN"
+                         + _ADD_TO_SUBTOTAL.format(delta="-COALESCE(OLD.Amount, 0)", component="OLD.ComponentID")
+                         + "END"),
+        # ... and components pass Subtotal changes on to the sign's TotalCost
+        *replace_trigger("trg_components_after_insert", "AFTER INSERT ON Components FOR EACH ROW BEGIN"
+                         + _ADD_TO_TOTAL.format(delta="NEW.Subtotal", sign="NEW.SignID") + "END"),
+        *replace_trigger("trg_components_after_update", "AFTER UPDATE ON Components FOR EACH ROW BEGIN "
+                         + "IF OLD.SignID = NEW.SignID THEN "
+                         + "IF OLD.Subtotal <> NEW.Subtotal THEN"
+                         + _ADD_TO_TOTAL.format(delta="NEW.Subtotal - OLD.Subtotal", sign="NEW.SignID")
+                         + "END IF; ELSE"
+                         + _ADD_TO_TOTAL.format(delta="-OLD.Subtotal", sign="OLD.SignID")
+                         + _ADD_TO_TOTAL.format(delta="NEW.Subtotal", sign="NEW.SignID")
+                         + "END IF; END"),
+        # Jobs removed by ON DELETE CASCADE fire no triggers; the component's Subtotal covers them
+        *replace_trigger("trg_components_after_delete", "AFTER DELETE ON Components FOR EACH ROW BEGIN"
+                         + _ADD_TO_TOTAL.format(delta="-OLD.Subtotal", sign="OLD.SignID") + "END"),
+        # Start the deltas from exact values
+        REBUILD_SUBTOTALS,
+        REBUILD_TOTALS,
+    ]),
+    (6, "Last-modified timestamps and delete tombstones for incremental sync", [
+        # Bumped by every write, including the aggregate updates made by the triggers
+        *[ensure_column(table, "UpdatedAt", "DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) "
+                                            "ON UPDATE CURRENT_TIMESTAMP(6)", _auto_updated)
+          for table in ("Signs", "Components", "Jobs")],
+        # Changed-since reads walk these in (UpdatedAt, id) order
+        ensure_index("Signs", "idx_signs_updated", "(UpdatedAt, SignID)"),
+        ensure_index("Components", "idx_components_updated", "(UpdatedAt, ComponentID)"),
+        ensure_index("Jobs", "idx_jobs_updated", "(UpdatedAt, JobID)"),
+        """
+        CREATE TABLE IF NOT EXISTS DeletedRows (
+            DeletionID BIGINT AUTO_INCREMENT PRIMARY KEY,
+            TableName VARCHAR(16) NOT NULL,
+            RowID INT NOT NULL,
+            DeletedAt DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+            INDEX idx_deleted_rows_at (DeletedAt, DeletionID)
+        ) ENGINE=InnoDB
+        """,
+        # ON DELETE CASCADE fires no triggers, so only the row deleted directly leaves a
+        # tombstone; readers remove its children themselves
+        *[step for table, key in (("Signs", "SignID"), ("Components", "ComponentID"), ("Jobs", "JobID"))
+          for step in replace_trigger(f"trg_{table.lower()}_log_delete",
+                                      f"AFTER DELETE ON {table} FOR EACH ROW "
+                                      f"INSERT INTO DeletedRows (TableName, RowID) VALUES ('{table}', OLD.{key})")],
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# UpdatedAt columns and DeletedRows, read by the signs list change feed and the local mirror
+CHANGE_FEED_VERSION = 6
+
+_known_version = None  # Last version read or migrated to by this process
+
+
+def _ensure_version_table(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS SchemaMigrations (
+        Version INT PRIMARY KEY,
+        Description VARCHAR(255) NOT NULL,
+        AppliedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB
+    """)
+
+
+def get_current_version():
+    """Return the highest applied migration version (0 for a fresh database)"""
+    db = DatabaseConnection.get_instance()
+    with db.connection() as connection:
+        cursor = connection.cursor()
+        try:
+            _ensure_version_table(cursor)
+            cursor.execute("SELECT COALESCE(MAX(Version), 0) FROM SchemaMigrations")
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+
+def schema_version():
+    """Return the applied schema version, read once per process without changing the database.
+
+    A database with no SchemaMigrations table is at version 0. Raises
+    db.Error if the database cannot be reached.
+    """
+    global _known_version
+    if _known_version is not None:
+        return _known_version
+    db = DatabaseConnection.get_instance()
+    if db.backend.schema is not None:
+        _known_version = LATEST_VERSION  # Created whole at the latest version
+        return _known_version
+    with db.connection() as connection:
+        if connection is None:
+            raise db.Error("No database connection available")
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'SchemaMigrations'
+            """)
+            version = 0
+            if cursor.fetchone()[0]:
+                cursor.execute("SELECT COALESCE(MAX(Version), 0) FROM SchemaMigrations")
+                version = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+    _known_version = version
+    return version
+
+
+def migrate(target=None):
+    """Apply every pending migration up to target (default: latest).
+
+    Returns the list of versions applied. MySQL commits DDL implicitly, so a
+    failing migration stops the run and is retried in full next time; steps
+    are idempotent for that reason.
+    """
+    global _known_version
+    target = LATEST_VERSION if target is None else target
+    current = get_current_version()
+    applied = []
+
+    db = DatabaseConnection.get_instance()
+    with db.connection() as connection:
+        cursor = connection.cursor()
+        try:
+            for version, description, steps in MIGRATIONS:
+                if version <= current or version > target:
+                    continue
+                if db.backend.schema is not None:
+                    steps = []  # Already in the backend's schema, created when the database was opened
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+                cursor.execute("INSERT INTO SchemaMigrations (Version, Description) VALUES (%s, %s)",
+                               (version, description))
+                connection.commit()
+                applied.append(version)
+                print(f"Applied migration {version}: {description}")
+        except db.Error as e:
+            connection.rollback()
+            print(f"Migration {version} failed: {e}")
+            raise
+        finally:
+            cursor.close()
+            _known_version = None  # Read again next time it is needed
+    return applied
+
+
+if __name__ == "__main__":
+    applied = migrate()
+    if not applied:
+        print(f"Database already at version {LATEST_VERSION}")
@@ -1,11 +1,65 @@
 """
 SQL queries and database operations for the Sign Business application.
 """
+from datetime import timedelta
 from .connection import DatabaseConnection
+from .cache import EntityCache
 
 # Get the database connection instance
 db = DatabaseConnection.get_instance()
 
+# Row cache shared by the read functions below; writes invalidate by sign
+cache = EntityCache()
+
+def _sign_tag(sign_id):
+    """Cache tag shared by a sign and everything under it"""
+    return ('sign', int(sign_id))
+
+def _cached(key, sign_id, load):
+    """Return the cached value for key, loading and caching it on a miss.
+
+    sign_id may be a callable that derives the owning sign from the loaded value.
+    """
+    found, value = cache.get(key)
+    if found:
+        return value
+    value = load()
+    if value is not None and not db.in_transaction():  # Never cache errors, misses or uncommitted rows
+        owner = sign_id(value) if callable(sign_id) else sign_id
+        if owner is not None:
+            cache.set(key, value, tags=[_sign_tag(owner)])
+    return value
+
+def _remember_owner(kind, entity_id, sign_id):
+    """Record which sign a component or job belongs to, for later invalidation"""
+    if not db.in_transaction():
+        cache.set(('owner', kind, int(entity_id)), int(sign_id), tags=[_sign_tag(sign_id)])
+
+def _sign_id_for_component(component_id):
+    """Find the sign owning a component, from the cache when possible"""
+    found, sign_id = cache.get(('owner', 'component', int(component_id)))
+    if found:
+        return sign_id
+    component = get_component_by_id(component_id)
+    return component['SignID'] if component else None
+
+def _sign_id_for_job(job_id):
+    """Find the sign owning a job, from the cache when possible"""
+    found, sign_id = cache.get(('owner', 'job', int(job_id)))
+    if found:
+        return sign_id
+    job = get_job_by_id(job_id)
+    return _sign_id_for_component(job['ComponentID']) if job else None
+
+def invalidate_sign(sign_id):
+    """Drop every cached row for a sign, its components and their jobs.
+
+    Inside db.transaction() this is deferred until the transaction ends.
+    """
+    if sign_id is not None:
+        tag = _sign_tag(sign_id)
+        db.after_commit(lambda: cache.invalidate_tag(tag))
+
 # Signs CRUD operations
 def get_all_signs():
     """Get all signs ordered by creation date"""
@@ -16,10 +70,159 @@ def get_all_signs():
     """
     return db.execute_query(query, fetchall=True)
 
+SIGNS_PAGE_SIZE = 100
+
+def get_signs_page(after=None, limit=SIGNS_PAGE_SIZE):
+    """Get one page of signs, newest first, using keyset pagination.
+
+    after is the (CreationDate, SignID) key of the last row of the previous
+    page, or None for the first page. Served by idx_signs_created.
+    """
+    query = """
+    SELECT SignID, SignName, CustomerInfo, CreationDate, Status, TotalCost 
+    FROM Signs 
+    {where}
+    ORDER BY CreationDate DESC, SignID DESC
+    LIMIT %s
+    """
+    if after is None:
+        return db.execute_query(query.format(where=""), (limit,), fetchall=True)
+
+    created, sign_id = after
+    where = "WHERE CreationDate < %s OR (CreationDate = %s AND SignID < %s)"
+    return db.execute_query(query.format(where=where), (created, created, sign_id, limit), fetchall=True)
+
+# Minimum word length indexed by InnoDB FULLTEXT (innodb_ft_min_token_size)
+FULLTEXT_MIN_TOKEN = 3
+
+def search_signs(text=None, status=None, date_from=None, date_to=None,
+                 after=None, limit=SIGNS_PAGE_SIZE, customer=None):
+    """Search signs by name/customer text, status, creation date range and customer.
+
+    Returns one page in the same order and with the same keyset `after`
+    semantics as get_signs_page. Words of FULLTEXT_MIN_TOKEN characters or
+    more are matched as prefixes against ft_signs_name_customer, and any
+    shorter words must also start a word of the name or customer. Input with
+    only short words falls back to a prefix LIKE on the indexed name and
+    customer. date_to is inclusive of the whole day. customer matches the
+    start of CustomerInfo.
+    """
+    conditions = []
+    params = []
+
+    words = _search_words(text)
+    if words:
+        long_words = [w for w in words if len(w) >= FULLTEXT_MIN_TOKEN]
+        if long_words:
+            conditions.append("MATCH(SignName, CustomerInfo) AGAINST (%s IN BOOLEAN MODE)")
+            params.append(" ".join(f"+{w}*" for w in long_words))
+            # FULLTEXT ignores short words; check them on the rows it already narrowed down
+            for word in words:
+                if len(word) < FULLTEXT_MIN_TOKEN:
+                    start, inner = _like_escape(word) + "%", "% " + _like_escape(word) + "%"
+                    conditions.append("(SignName LIKE %s OR SignName LIKE %s "
+                                      "OR CustomerInfo LIKE %s OR CustomerInfo LIKE %s)")
+                    params.extend([start, inner, start, inner])
+        else:
+            prefix = _like_escape(" ".join(words)) + "%"
+            conditions.append("(SignName LIKE %s OR CustomerInfo LIKE %s)")
+            params.extend([prefix, prefix])
+
+    if customer:
+        conditions.append("CustomerInfo LIKE %s")
+        params.append(_like_escape(customer.strip()) + "%")
+    if status:
+        conditions.append("Status = %s")
+        params.append(status)
+    if date_from:
+        conditions.append("CreationDate >= %s")
+        params.append(date_from)
+    if date_to:
+        conditions.append("CreationDate < %s + INTERVAL 1 DAY")
+        params.append(date_to)
+    if after is not None:
+        created, sign_id = after
+        conditions.append("(CreationDate < %s OR (CreationDate = %s AND SignID < %s))")
+        params.extend([created, created, sign_id])
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+    SELECT SignID, SignName, CustomerInfo, CreationDate, Status, TotalCost 
+    FROM Signs 
+    {where}
+    ORDER BY CreationDate DESC, SignID DESC
+    LIMIT %s
+    """
+    params.append(limit)
+    return db.execute_query(query, tuple(params), fetchall=True)
+
+def _search_words(text):
+    """Split search text into words, dropping FULLTEXT boolean operators"""
+    if not text:
+        return []
+    cleaned = "".join(" " if c in '+-<>()~*"@' else c for c in text)
+    return cleaned.split()
+
+def _like_escape(text):
+    """Escape LIKE wildcards so user text matches literally (backslash is the escape character)"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def sign_page_key(sign):
+    """Keyset pagination key for a row returned by get_signs_page or search_signs"""
+    return (sign['CreationDate'], sign['SignID'])
+
+# Changed-since reads look this far behind the watermark: a transaction that started
+# earlier may commit rows stamped before the watermark was taken
+CHANGE_FEED_OVERLAP = timedelta(seconds=5)
+
+def get_signs_changed_since(watermark):
+    """Get the signs list rows changed after watermark and the IDs of signs deleted since.
+
+    Returns {'signs': [...], 'deleted': [...], 'watermark': w}; pass w to the
+    next call. The rows have the same columns as get_signs_page. With
+    watermark None only a starting watermark is returned (None while there
+    is nothing to start from). Rows near the watermark can be returned
+    twice, so apply them idempotently.
+    Served by idx_signs_updated and idx_deleted_rows_at.
+    """
+    # The watermark is the newest change actually read, never the clock: a row committed
+    # after a read but stamped before the clock reading would otherwise be skipped for good
+    if watermark is None:
+        latest = db.execute_query("""
+        SELECT UpdatedAt FROM Signs ORDER BY UpdatedAt DESC, SignID DESC LIMIT 1
+        """, fetchone=True)
+        latest_deleted = db.execute_query("""
+        SELECT DeletedAt FROM DeletedRows WHERE TableName = 'Signs' 
+        ORDER BY DeletedAt DESC, DeletionID DESC LIMIT 1
+        """, fetchone=True)
+        stamps = ([latest['UpdatedAt']] if latest else []) + \
+                 ([latest_deleted['DeletedAt']] if latest_deleted else [])
+        return {'signs': [], 'deleted': [], 'watermark': max(stamps) if stamps else None}
+
+    since = watermark - CHANGE_FEED_OVERLAP
+    signs = db.execute_query("""
+    SELECT SignID, SignName, CustomerInfo, CreationDate, Status, TotalCost, UpdatedAt 
+    FROM Signs 
+    WHERE UpdatedAt >= %s 
+    ORDER BY UpdatedAt, SignID
+    """, (since,), fetchall=True)
+    deleted = db.execute_query("""
+    SELECT RowID, DeletedAt FROM DeletedRows 
+    WHERE DeletedAt >= %s AND TableName = 'Signs'
+    """, (since,), fetchall=True)
+    if signs is None or deleted is None:
+        return None
+
+    newest = max([watermark] + [sign['UpdatedAt'] for sign in signs] + [row['DeletedAt'] for row in deleted])
+    for sign in signs:
+        invalidate_sign(sign['SignID'])  # Changed by someone else: cached rows are stale
+    return {'signs': signs, 'deleted': [row['RowID'] for row in deleted], 'watermark': newest}
+
 def get_sign_by_id(sign_id):
     """Get a sign by its ID"""
     query = "SELECT * FROM Signs WHERE SignID = %s"
-    return db.execute_query(query, (sign_id,), fetchone=True)
+    return _cached(('sign', int(sign_id)), sign_id,
+                   lambda: db.execute_prepared('sign_by_id', query, (sign_id,), fetchone=True))
 
 def create_sign(name, description, customer_info, status):
     """Create a new sign"""
@@ -27,10 +230,62 @@ def create_sign(name, description, customer_info, status):
     INSERT INTO Signs (SignName, Description, CustomerInfo, Status) 
     VALUES (%s, %s, %s, %s)
     """
-    result = db.execute_query(query, (name, description, customer_info, status), commit=True)
-    if result is not None:  # None indicates error
-        return db.get_connection().cursor().lastrowid
-    return None
+    return db.execute_insert(query, (name, description, customer_info, status))
+
+def create_sign_with_components(name, description, customer_info, status, components):
+    """Create a sign with its components and their jobs in one transaction.
+
+    components is a list of component names, or of dicts with a 'name' and
+    an optional 'jobs' list of (job_name, unit_cost, quantity) tuples.
+    Components and jobs are each inserted with a single executemany.
+    Returns {'SignID': id, 'ComponentIDs': [...], 'JobIDs': [[...], ...]}
+    with IDs in input order, or None if anything failed (nothing is kept).
+    """
+    components = [c if isinstance(c, dict) else {'name': c} for c in components]
+
+    def work(cursor):
+        cursor.execute("""
+        INSERT INTO Signs (SignName, Description, CustomerInfo, Status) 
+        VALUES (%s, %s, %s, %s)
+        """, (name, description, customer_info, status))
+        sign_id = cursor.lastrowid
+
+        component_ids = []
+        if components:
+            cursor.executemany("""
+            INSERT INTO Components (SignID, ComponentName) 
+            VALUES (%s, %s)
+            """, [(sign_id, c['name']) for c in components])
+            # The sign is new, so its components in ID order are exactly the rows just inserted
+            cursor.execute("SELECT ComponentID FROM Components WHERE SignID = %s ORDER BY ComponentID",
+                           (sign_id,))
+            component_ids = [row[0] for row in cursor.fetchall()]
+
+        job_rows = [(component_id, job_name, unit_cost, quantity)
+                    for component_id, c in zip(component_ids, components)
+                    for job_name, unit_cost, quantity in c.get('jobs', ())]
+        job_ids = {component_id: [] for component_id in component_ids}
+        if job_rows:
+            cursor.executemany("""
+            INSERT INTO Jobs (ComponentID, JobName, UnitCost, Quantity) 
+            VALUES (%s, %s, %s, %s)
+            """, job_rows)
+            placeholders = ", ".join(["%s"] * len(component_ids))
+            cursor.execute(f"""
+            SELECT JobID, ComponentID FROM Jobs 
+            WHERE ComponentID IN ({placeholders}) 
+            ORDER BY JobID
+            """, tuple(component_ids))
+            for job_id, component_id in cursor.fetchall():
+                job_ids[component_id].append(job_id)
+
+        return {
+            'SignID': sign_id,
+            'ComponentIDs': component_ids,
+            'JobIDs': [job_ids[component_id] for component_id in component_ids],
+        }
+
+    return db.run_in_transaction(work)
 
 def update_sign(sign_id, name, description, customer_info, status):
     """Update a sign"""
@@ -39,12 +294,109 @@ def update_sign(sign_id, name, description, customer_info, status):
     SET SignName = %s, Description = %s, CustomerInfo = %s, Status = %s 
     WHERE SignID = %s
     """
-    return db.execute_query(query, (name, description, customer_info, status, sign_id), commit=True)
+    result = db.execute_query(query, (name, description, customer_info, status, sign_id), commit=True)
+    invalidate_sign(sign_id)
+    return result
 
 def delete_sign(sign_id):
     """Delete a sign"""
     query = "DELETE FROM Signs WHERE SignID = %s"
-    return db.execute_query(query, (sign_id,), commit=True)
+    result = db.execute_query(query, (sign_id,), commit=True)
+    invalidate_sign(sign_id)
+    return result
+
+# Sign tree: the sign with its components and their jobs
+SIGN_TREE_JOB_COLUMNS = ("JobID", "JobName", "UnitCost", "Quantity", "Amount")
+
+def get_sign_tree(sign_id):
+    """Get a sign with its components and their jobs in two round trips.
+
+    Returns the sign row with a 'Components' list; each component carries a
+    'Jobs' list ordered by JobID. Returns None if the sign does not exist.
+    """
+    return _cached(('tree', int(sign_id)), sign_id, lambda: _load_sign_tree(sign_id))
+
+def _load_sign_tree(sign_id):
+    sign = get_sign_by_id(sign_id)
+    if not sign:
+        return None
+
+    components = _get_components_with_jobs('components_with_jobs_by_sign', "c.SignID = %s", (sign_id,))
+    if components is None:
+        return None
+
+    sign['Components'] = components
+    return sign
+
+def get_sign_trees(sign_ids):
+    """Get the trees of several signs in two queries, for batch work such as invoice exports.
+
+    Returns trees in the order of sign_ids, skipping signs that no longer
+    exist, or None on a database error. Bypasses the row cache.
+    """
+    sign_ids = [int(sign_id) for sign_id in sign_ids]
+    if not sign_ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(sign_ids))
+    signs = db.execute_query(f"SELECT * FROM Signs WHERE SignID IN ({placeholders})",
+                             tuple(sign_ids), fetchall=True)
+    components = _get_components_with_jobs(None, f"c.SignID IN ({placeholders})", tuple(sign_ids))
+    if signs is None or components is None:
+        return None
+
+    trees = {sign['SignID']: dict(sign, Components=[]) for sign in signs}
+    for component in components:
+        trees[component['SignID']]['Components'].append(component)
+    return [trees[sign_id] for sign_id in sign_ids if sign_id in trees]
+
+def get_component_tree(component_id):
+    """Get a component with its 'Jobs' list in one query, or None if it does not exist"""
+    def load():
+        components = _get_components_with_jobs('component_with_jobs_by_id', "c.ComponentID = %s",
+                                               (component_id,))
+        return components[0] if components else None
+    return _cached(('component_tree', int(component_id)), lambda c: c['SignID'], load)
+
+def _get_components_with_jobs(statement_key, where, params):
+    """Fetch components matching where together with their jobs in a single LEFT JOIN.
+
+    statement_key names the prepared statement; pass None for one-off SQL.
+    """
+    job_columns = ", ".join(f"j.{col} AS Job_{col}" for col in SIGN_TREE_JOB_COLUMNS)
+    query = f"""
+    SELECT c.*, {job_columns}
+    FROM Components c
+    LEFT JOIN Jobs j ON j.ComponentID = c.ComponentID
+    WHERE {where}
+    ORDER BY c.ComponentID, j.JobID
+    """
+    if statement_key is None:
+        rows = db.execute_query(query, params, fetchall=True)
+    else:
+        rows = db.execute_prepared(statement_key, query, params, fetchall=True)
+    if rows is None:
+        return None
+    components = _group_component_rows(rows)
+    for component in components:
+        _remember_owner('component', component['ComponentID'], component['SignID'])
+        for job in component['Jobs']:
+            _remember_owner('job', job['JobID'], component['SignID'])
+    return components
+
+def _group_component_rows(rows):
+    """Fold joined component/job rows into components with nested 'Jobs' lists"""
+    components = []
+    current = None
+    for row in rows:
+        job = {col: row.pop(f"Job_{col}") for col in SIGN_TREE_JOB_COLUMNS}
+        if current is None or current['ComponentID'] != row['ComponentID']:
+            current = row
+            current['Jobs'] = []
+            components.append(current)
+        if job['JobID'] is not None:
+            job['ComponentID'] = current['ComponentID']
+            current['Jobs'].append(job)
+    return components
 
 # Components CRUD operations
 def get_components_by_sign_id(sign_id):
@@ -54,7 +406,14 @@ def get_components_by_sign_id(sign_id):
     WHERE SignID = %s 
     ORDER BY ComponentID
     """
-    return db.execute_query(query, (sign_id,), fetchall=True)
+    return _cached(('components', int(sign_id)), sign_id,
+                   lambda: db.execute_prepared('components_by_sign', query, (sign_id,), fetchall=True))
+
+def get_component_by_id(component_id):
+    """Get a component by its ID"""
+    query = "SELECT * FROM Components WHERE ComponentID = %s"
+    return _cached(('component', int(component_id)), lambda c: c['SignID'],
+                   lambda: db.execute_query(query, (component_id,), fetchone=True))
 
 def create_component(sign_id, component_name):
     """Create a new component"""
@@ -62,10 +421,9 @@ def create_component(sign_id, component_name):
     INSERT INTO Components (SignID, ComponentName) 
     VALUES (%s, %s)
     """
-    result = db.execute_query(query, (sign_id, component_name), commit=True)
-    if result is not None:  # None indicates error
-        return db.get_connection().cursor().lastrowid
-    return None
+    component_id = db.execute_insert(query, (sign_id, component_name))
+    invalidate_sign(sign_id)
+    return component_id
 
 def update_component(component_id, component_name):
     """Update a component"""
@@ -74,12 +432,18 @@ def update_component(component_id, component_name):
     SET ComponentName = %s 
     WHERE ComponentID = %s
     """
-    return db.execute_query(query, (component_name, component_id), commit=True)
+    sign_id = _sign_id_for_component(component_id)
+    result = db.execute_query(query, (component_name, component_id), commit=True)
+    invalidate_sign(sign_id)
+    return result
 
 def delete_component(component_id):
     """Delete a component"""
     query = "DELETE FROM Components WHERE ComponentID = %s"
-    return db.execute_query(query, (component_id,), commit=True)
+    sign_id = _sign_id_for_component(component_id)
+    result = db.execute_query(query, (component_id,), commit=True)
+    invalidate_sign(sign_id)
+    return result
 
 # Jobs CRUD operations
 def get_jobs_by_component_id(component_id):
@@ -89,17 +453,14 @@ def get_jobs_by_component_id(component_id):
     WHERE ComponentID = %s 
     ORDER BY JobID
     """
-    return db.execute_query(query, (component_id,), fetchall=True)
+    return _cached(('jobs', int(component_id)), lambda jobs: _sign_id_for_component(component_id),
+                   lambda: db.execute_prepared('jobs_by_component', query, (component_id,), fetchall=True))
 
 def get_job_by_id(job_id):
     """Get a job by its ID"""
     query = "SELECT * FROM Jobs WHERE JobID = %s"
-    return db.execute_query(query, (job_id,), fetchone=True)
-
-def get_job_by_details(job_name, unit_cost):
-    """Get a job by its name and unit cost"""
-    query = "SELECT * FROM Jobs WHERE JobName = %s AND UnitCost = %s"
-    return db.execute_query(query, (job_name, unit_cost), fetchall=True)[0] if db.execute_query(query, (job_name, unit_cost), fetchall=True) else None
+    return _cached(('job', int(job_id)), lambda job: _sign_id_for_component(job['ComponentID']),
+                   lambda: db.execute_query(query, (job_id,), fetchone=True))
 
 def create_job(component_id, job_name, unit_cost, quantity):
     """Create a new job"""
@@ -107,10 +468,11 @@ def create_job(component_id, job_name, unit_cost, quantity):
     INSERT INTO Jobs (ComponentID, JobName, UnitCost, Quantity) 
     VALUES (%s, %s, %s, %s)
     """
-    result = db.execute_query(query, (component_id, job_name, unit_cost, quantity), commit=True)
-    if result is not None:  # None indicates error
-        return db.get_connection().cursor().lastrowid
-    return None
+    sign_id = _sign_id_for_component(component_id)
+    job_id = db.execute_prepared('insert_job', query, (component_id, job_name, unit_cost, quantity),
+                                 commit=True, insert=True)
+    invalidate_sign(sign_id)
+    return job_id
 
 def update_job(job_id, job_name, unit_cost, quantity):
     """Update a job"""
@@ -119,9 +481,29 @@ def update_job(job_id, job_name, unit_cost, quantity):
     SET JobName = %s, UnitCost = %s, Quantity = %s 
     WHERE JobID = %s
     """
-    return db.execute_query(query, (job_name, unit_cost, quantity, job_id), commit=True)
+    sign_id = _sign_id_for_job(job_id)
+    result = db.execute_prepared('update_job', query, (job_name, unit_cost, quantity, job_id), commit=True)
+    invalidate_sign(sign_id)
+    return result
 
 def delete_job(job_id):
     """Delete a job"""
     query = "DELETE FROM Jobs WHERE JobID = %s"
-    return db.execute_query(query, (job_id,), commit=True)
\ No newline at end of file
+    sign_id = _sign_id_for_job(job_id)
+    result = db.execute_query(query, (job_id,), commit=True)
+    invalidate_sign(sign_id)
+    return result
+
+# Unit of work
+def apply_job_changes(changes):
+    """Apply a batch of job edits in one transaction and commit once.
+
+    changes is a list of ('create', (component_id, job_name, unit_cost, quantity)),
+    ('update', (job_id, job_name, unit_cost, quantity)) or ('delete', (job_id,))
+    tuples, applied in order. Any failure rolls the whole batch back and raises.
+    """
+    operations = {'create': create_job, 'update': update_job, 'delete': delete_job}
+    with db.transaction():
+        for kind, args in changes:
+            operations[kind](*args)
+    return len(changes)
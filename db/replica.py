@@ -0,0 +1,253 @@
+"""
+Local SQLite mirror of the Signs table.
+
+The signs list reads from the mirror so it appears instantly on launch,
+even over a slow link to MySQL. sync() pulls rows changed since the last
+watermark (UpdatedAt) and the tombstones in DeletedRows, and applies them
+locally. Only the signs list reads from the mirror, so only Signs is
+mirrored; the detail window reads components and jobs from MySQL. Set
+LOCAL_REPLICA=0 to read straight from MySQL; the mirror is not used with
+the SQLite backend.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+from .connection import DatabaseConnection
+from . import backends, migrations, queries
+
+DEFAULT_REPLICA_PATH = "replica.sqlite3"
+
+# Rows fetched from MySQL per round trip while syncing
+SYNC_BATCH_SIZE = 5000
+
+# Re-read this far behind the watermark: a transaction that started earlier may commit
+# rows stamped before rows we have already seen
+SYNC_OVERLAP = timedelta(seconds=5)
+
+# Signs columns mirrored
+COLUMNS = ("SignID", "SignName", "Description", "CustomerInfo", "CreationDate", "Status", "TotalCost",
+           "UpdatedAt")
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS Signs (
+        SignID INTEGER PRIMARY KEY,
+        SignName TEXT NOT NULL,
+        Description TEXT,
+        CustomerInfo TEXT,
+        CreationDate TIMESTAMP NOT NULL,
+        Status TEXT NOT NULL,
+        TotalCost DECTEXT NOT NULL,
+        UpdatedAt TIMESTAMP NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_signs_created ON Signs (CreationDate, SignID)",
+    # Mirrors made by earlier versions also copied these; nothing reads them
+    "DROP TABLE IF EXISTS Jobs",
+    "DROP TABLE IF EXISTS Components",
+    """
+    CREATE TABLE IF NOT EXISTS SyncState (
+        Name TEXT PRIMARY KEY,
+        Watermark TIMESTAMP NOT NULL
+    )
+    """,
+]
+
+# Values round-trip exactly: datetimes as fixed-width ISO text, decimals as text. The
+# DECTEXT type name gives those columns TEXT affinity; DECIMAL would store them as floats.
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" ", timespec="microseconds"))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter("DECTEXT", lambda value: Decimal(value.decode()))
+
+
+def _latest(current, values):
+    """The newest of a watermark and some timestamps"""
+    values = list(values)
+    if current is not None:
+        values.append(current)
+    return max(values) if values else None
+
+
+def _dict_factory(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+# Singleton pattern for the local mirror
+class LocalReplica:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = LocalReplica()
+        return cls._instance
+
+    @classmethod
+    def enabled(cls):
+        # With the SQLite backend the database is already a local file
+        if os.getenv("LOCAL_REPLICA", "1") == "0" or backends.configured_name() != "mysql":
+            return False
+        # Syncing reads UpdatedAt and DeletedRows, which older schemas do not have
+        try:
+            return migrations.schema_version() >= migrations.CHANGE_FEED_VERSION
+        except DatabaseConnection.get_instance().Error:
+            return False
+
+    def __init__(self, path=None):
+        if LocalReplica._instance is not None:
+            raise Exception("This class is a singleton. Use get_instance() instead.")
+
+        self.path = path or os.getenv("REPLICA_PATH", DEFAULT_REPLICA_PATH)
+        self._connection = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES,
+                                           check_same_thread=False)
+        self._connection.row_factory = _dict_factory
+        self._lock = threading.Lock()        # One statement at a time on the shared connection
+        self._sync_lock = threading.Lock()   # One sync at a time
+
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+
+    def watermark(self):
+        """Time of the last change pulled from MySQL, or None if never synced"""
+        with self._lock:
+            row = self._connection.execute("SELECT Watermark FROM SyncState WHERE Name = 'mysql'").fetchone()
+        return row['Watermark'] if row else None
+
+    def is_ready(self):
+        """True once a first sync has completed"""
+        return self.watermark() is not None
+
+    def get_signs_page(self, after=None, limit=queries.SIGNS_PAGE_SIZE):
+        """Same rows and keyset semantics as queries.get_signs_page, read from the mirror"""
+        condition = ""
+        params = []
+        if after is not None:
+            created, sign_id = after
+            condition = "WHERE CreationDate < ? OR (CreationDate = ? AND SignID < ?)"
+            params = [created, created, sign_id]
+        query = f"""
+        SELECT SignID, SignName, CustomerInfo, CreationDate, Status, TotalCost
+        FROM Signs
+        {condition}
+        ORDER BY CreationDate DESC, SignID DESC
+        LIMIT ?
+        """
+        with self._lock:
+            return self._connection.execute(query, params + [limit]).fetchall()
+
+    def sync(self):
+        """Pull changes from MySQL since the watermark and apply them locally.
+
+        Returns {'signs': [...], 'deleted_signs': [...]}: the list rows of signs
+        that changed and the IDs of signs that were deleted, for updating an
+        open list in place. Returns None if MySQL could not be read.
+        """
+        with self._sync_lock:
+            db = DatabaseConnection.get_instance()
+            since = self.watermark()
+            read_from = since - SYNC_OVERLAP if since else None
+            newest = since
+            changed_signs = []
+
+            # Each batch is read on its own: re-reading behind the watermark makes the
+            # sync idempotent, so no long-running transaction is needed
+            for batch in self._changed_signs(db, read_from):
+                if batch is None:
+                    return None
+                self._upsert(batch)
+                newest = _latest(newest, (row['UpdatedAt'] for row in batch))
+                changed_signs.extend(row['SignID'] for row in batch)
+
+            deleted = self._deleted_rows(db, read_from)
+            if deleted is None:
+                return None
+            deleted_signs = self._apply_deletions(deleted)
+            newest = _latest(newest, (row['DeletedAt'] for row in deleted))
+
+            if newest is not None and newest != since:
+                with self._lock, self._connection:
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO SyncState (Name, Watermark) VALUES ('mysql', ?)", (newest,))
+
+            return {'signs': self._sign_rows(changed_signs), 'deleted_signs': deleted_signs}
+
+    def _changed_signs(self, db, since):
+        """Yield batches of MySQL Signs rows changed since a time, in (UpdatedAt, SignID) order"""
+        after = None
+        while True:
+            conditions = []
+            params = []
+            if since is not None:
+                conditions.append("UpdatedAt >= %s")
+                params.append(since)
+            if after is not None:
+                conditions.append("(UpdatedAt > %s OR (UpdatedAt = %s AND SignID > %s))")
+                params.extend([after[0], after[0], after[1]])
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            rows = db.execute_query(f"""
+            SELECT {', '.join(COLUMNS)} FROM Signs
+            {where}
+            ORDER BY UpdatedAt, SignID
+            LIMIT %s
+            """, tuple(params + [SYNC_BATCH_SIZE]), fetchall=True)
+            if rows is None:
+                yield None
+                return
+            if rows:
+                yield rows
+            if len(rows) < SYNC_BATCH_SIZE:
+                return
+            after = (rows[-1]['UpdatedAt'], rows[-1]['SignID'])
+
+    def _deleted_rows(self, db, since):
+        if since is None:
+            return []  # A first sync copies only live rows, so there is nothing to remove
+        return db.execute_query("""
+        SELECT TableName, RowID, DeletedAt FROM DeletedRows
+        WHERE DeletedAt >= %s AND TableName = 'Signs'
+        ORDER BY DeletedAt, DeletionID
+        """, (since,), fetchall=True)
+
+    def _upsert(self, rows):
+        placeholders = ", ".join("?" * len(COLUMNS))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in COLUMNS[1:])
+        with self._lock, self._connection:
+            # Update existing rows in place; INSERT OR REPLACE would delete and re-insert them
+            self._connection.executemany(
+                f"INSERT INTO Signs ({', '.join(COLUMNS)}) VALUES ({placeholders}) "
+                f"ON CONFLICT (SignID) DO UPDATE SET {updates}",
+                [tuple(row[c] for c in COLUMNS) for row in rows])
+
+    def _apply_deletions(self, deleted):
+        """Delete tombstoned signs; return their SignIDs"""
+        sign_ids = sorted({row['RowID'] for row in deleted})
+        with self._lock, self._connection:
+            self._connection.executemany("DELETE FROM Signs WHERE SignID = ?", [(i,) for i in sign_ids])
+        return sign_ids
+
+    def _sign_rows(self, sign_ids):
+        """List rows for signs that still exist locally"""
+        sign_ids = sorted(set(sign_ids))
+        rows = []
+        with self._lock:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(sign_ids), 500):
+                chunk = sign_ids[start:start + 500]
+                rows.extend(self._connection.execute(f"""
+                SELECT SignID, SignName, CustomerInfo, CreationDate, Status, TotalCost
+                FROM Signs WHERE SignID IN ({', '.join('?' * len(chunk))})
+                """, chunk).fetchall())
+        return rows
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+        LocalReplica._instance = None
@@ -0,0 +1,193 @@
+"""
+Bulk repricing of jobs for the Sign Business application.
+
+A repricing is a list of rules, each a percentage or absolute change to
+UnitCost restricted to jobs whose name matches a pattern and/or whose sign
+has a given status or creation date range. preview() computes the new
+prices without touching the database; apply_repricing() writes a preview
+back with one set-based UPDATE in a single transaction.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from .connection import DatabaseConnection
+from . import queries
+
+db = DatabaseConnection.get_instance()
+
+PERCENT = "percent"
+ABSOLUTE = "absolute"
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+
+class StaleRepricingError(Exception):
+    """Some previewed jobs were changed or deleted before the repricing was applied"""
+
+
+class RepriceRule:
+    """One price change and the jobs it applies to"""
+
+    def __init__(self, kind, value, name_pattern=None, status=None, date_from=None, date_to=None):
+        if kind not in (PERCENT, ABSOLUTE):
+            raise ValueError(f"Unknown repricing kind: {kind}")
+        self.kind = kind
+        self.value = Decimal(str(value))
+        self.name_pattern = (name_pattern or "").strip() or None
+        self.status = status or None
+        self.date_from = date_from or None
+        self.date_to = date_to or None
+
+    def describe(self):
+        """Short human-readable summary for lists and confirmations"""
+        change = f"{self.value:+}%" if self.kind == PERCENT else f"{self.value:+} $"
+        filters = [f"trabajo ~ {self.name_pattern}" if self.name_pattern else None,
+                   f"estado = {self.status}" if self.status else None,
+                   f"desde {self.date_from}" if self.date_from else None,
+                   f"hasta {self.date_to}" if self.date_to else None]
+        return " ".join([change] + [f for f in filters if f]) if any(filters) else f"{change} (todos)"
+
+    def apply(self, costs, positions):
+        """Reprice costs[i] for every i in positions, in place, rounding to cents"""
+        if self.kind == PERCENT:
+            factor = 1 + self.value / 100
+            for i in positions:
+                costs[i] = max(ZERO, (costs[i] * factor).quantize(CENT, ROUND_HALF_UP))
+        else:
+            delta = self.value.quantize(CENT, ROUND_HALF_UP)
+            for i in positions:
+                costs[i] = max(ZERO, costs[i] + delta)
+
+
+def _like_pattern(pattern):
+    """Turn a * / ? wildcard pattern into a LIKE pattern; plain text matches anywhere in the name"""
+    escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    if "*" not in pattern and "?" not in pattern:
+        return f"%{escaped}%"
+    return escaped.replace("*", "%").replace("?", "_")
+
+
+def find_jobs(rule):
+    """Get the jobs a rule applies to, with their component and sign for display"""
+    conditions = []
+    params = []
+    if rule.name_pattern:
+        conditions.append("j.JobName LIKE %s")
+        params.append(_like_pattern(rule.name_pattern))
+    if rule.status:
+        conditions.append("s.Status = %s")
+        params.append(rule.status)
+    if rule.date_from:
+        conditions.append("s.CreationDate >= %s")
+        params.append(rule.date_from)
+    if rule.date_to:
+        conditions.append("s.CreationDate < %s + INTERVAL 1 DAY")
+        params.append(rule.date_to)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"""
+    SELECT j.JobID, j.JobName, j.UnitCost, j.Quantity, j.Amount,
+           c.ComponentID, c.ComponentName, s.SignID, s.SignName
+    FROM Jobs j
+    JOIN Components c ON c.ComponentID = j.ComponentID
+    JOIN Signs s ON s.SignID = c.SignID
+    {where}
+    ORDER BY j.JobID
+    """
+    return db.execute_query(query, tuple(params), fetchall=True)
+
+
+def preview(rules):
+    """Compute the effect of applying rules in order.
+
+    Each rule is applied in one pass over the cost column of the jobs it
+    matches, so a job matched by several rules gets them compounded.
+    Returns {'changes': [...], 'matched': n, 'amount_delta': Decimal}, where
+    each change holds the job's identifying fields plus OldUnitCost,
+    NewUnitCost, OldAmount and NewAmount. Jobs whose price would not
+    change are left out.
+    """
+    rows = {}
+    matches = []
+    for rule in rules:
+        found = find_jobs(rule)
+        if found is None:
+            return None  # Database error already reported
+        for row in found:
+            rows.setdefault(row['JobID'], row)
+        matches.append([row['JobID'] for row in found])
+
+    job_ids = sorted(rows)
+    position = {job_id: i for i, job_id in enumerate(job_ids)}
+    costs = [Decimal(rows[job_id]['UnitCost']) for job_id in job_ids]
+    for rule, matched in zip(rules, matches):
+        rule.apply(costs, [position[job_id] for job_id in matched])
+
+    changes = []
+    amount_delta = ZERO
+    for job_id, new_cost in zip(job_ids, costs):
+        row = rows[job_id]
+        old_cost = Decimal(row['UnitCost'])
+        if new_cost == old_cost:
+            continue
+        quantity = row['Quantity']
+        new_amount = None if quantity is None else (new_cost * Decimal(quantity)).quantize(CENT, ROUND_HALF_UP)
+        old_amount = row['Amount']
+        amount_delta += (new_amount or ZERO) - Decimal(old_amount or ZERO)
+        changes.append({
+            'JobID': job_id,
+            'JobName': row['JobName'],
+            'ComponentID': row['ComponentID'],
+            'ComponentName': row['ComponentName'],
+            'SignID': row['SignID'],
+            'SignName': row['SignName'],
+            'Quantity': quantity,
+            'OldUnitCost': old_cost,
+            'NewUnitCost': new_cost,
+            'OldAmount': old_amount,
+            'NewAmount': new_amount,
+        })
+    return {'changes': changes, 'matched': len(job_ids), 'amount_delta': amount_delta}
+
+
+def apply_repricing(changes):
+    """Write previewed price changes with one UPDATE in a single transaction.
+
+    The new prices are loaded into a temporary table and joined onto Jobs.
+    A job only changes if its UnitCost is still the one previewed; if any
+    job was edited or deleted in the meantime nothing is written and
+    StaleRepricingError is raised. Returns the number of jobs repriced.
+    """
+    if not changes:
+        return 0
+
+    def work(cursor):
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS RepriceBatch")
+        cursor.execute("""
+        CREATE TEMPORARY TABLE RepriceBatch (
+            JobID INT PRIMARY KEY,
+            OldUnitCost DECIMAL(12, 2) NOT NULL,
+            NewUnitCost DECIMAL(12, 2) NOT NULL
+        ) ENGINE=InnoDB
+        """)
+        cursor.executemany("""
+        INSERT INTO RepriceBatch (JobID, OldUnitCost, NewUnitCost)
+        VALUES (%s, %s, %s)
+        """, [(c['JobID'], c['OldUnitCost'], c['NewUnitCost']) for c in changes])
+        cursor.execute("""
+        UPDATE Jobs j
+        JOIN RepriceBatch r ON r.JobID = j.JobID
+        SET j.UnitCost = r.NewUnitCost
+        WHERE j.UnitCost = r.OldUnitCost
+        """)
+        updated = cursor.rowcount
+        cursor.execute("DROP TEMPORARY TABLE RepriceBatch")
+        if updated != len(changes):
+            raise StaleRepricingError(
+                f"{len(changes) - updated} of {len(changes)} jobs changed since the preview")
+        return updated
+
+    with db.transaction():
+        updated = db.run_in_transaction(work)
+        for sign_id in {c['SignID'] for c in changes}:
+            queries.invalidate_sign(sign_id)
+    return updated
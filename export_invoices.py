@@ -0,0 +1,146 @@
+"""
+Headless batch invoice exporter for the Sign Business application.
+
+Renders the invoices of every sign matching the filters, in parallel
+across CPU cores, without opening any window:
+
+    python export_invoices.py --status Completed --from 2024-05-01 --to 2024-05-31
+    python export_invoices.py --customer "Farmacia" --merge invoices/mayo.pdf
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from utils.print_invoice import INVOICES_DIR, invoice_snapshot, get_cache, get_template
+
+DEFAULT_BATCH_SIZE = 50
+
+
+def _render(snapshot, out_dir):
+    """Worker entry point: render one snapshot and report whether it came from the cache"""
+    started = time.perf_counter()
+    # One cache lookup per sign: render_invoice would look the snapshot up again and count the hit twice
+    cache = get_cache(out_dir)
+    filepath = cache.get(snapshot)
+    cached = filepath is not None
+    if not cached:
+        filepath = cache.put(snapshot, lambda path: get_template().render(snapshot, path))
+    return snapshot['SignID'], filepath, cached, time.perf_counter() - started
+
+
+def iter_sign_trees(filters, batch_size=DEFAULT_BATCH_SIZE):
+    """Yield the trees of all matching signs, newest first, fetching batch_size signs at a time"""
+    # Imported here so worker processes, which import this module, never connect to the database
+    from db.connection import DatabaseConnection
+    DatabaseConnection.show_error_dialogs = False
+    import db.queries as queries
+
+    after = None
+    while True:
+        page = queries.search_signs(after=after, limit=batch_size, **filters)
+        if page is None:
+            raise RuntimeError("Could not load signs")
+        if not page:
+            return
+        trees = queries.get_sign_trees([sign['SignID'] for sign in page])
+        if trees is None:
+            raise RuntimeError("Could not load sign data")
+        yield from trees
+        if len(page) < batch_size:
+            return
+        after = queries.sign_page_key(page[-1])
+
+
+def merge_invoices(filepaths, target):
+    """Concatenate PDFs into one document; needs the optional pypdf package"""
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        raise SystemExit("Merging requires pypdf: pip install pypdf")
+
+    writer = PdfWriter()
+    for filepath in filepaths:
+        writer.append(filepath)
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    with open(target, "wb") as f:
+        writer.write(f)
+    writer.close()
+
+
+def export(filters, out_dir=INVOICES_DIR, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Render invoices for every matching sign; return their paths in list order and run stats"""
+    workers = workers or os.cpu_count() or 1
+    stats = {"signs": 0, "rendered": 0, "cached": 0, "render_seconds": 0.0}
+    results = {}
+    order = []
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+
+        def collect(done):
+            for future in done:
+                sign_id, filepath, cached, seconds = future.result()
+                results[sign_id] = filepath
+                stats["cached" if cached else "rendered"] += 1
+                stats["render_seconds"] += seconds
+
+        for tree in iter_sign_trees(filters, batch_size):
+            order.append(tree['SignID'])
+            pending.add(pool.submit(_render, invoice_snapshot(tree), out_dir))
+            # Keep the queue short so memory stays flat however many signs match
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        done, _ = wait(pending)
+        collect(done)
+
+    stats["signs"] = len(order)
+    stats["seconds"] = time.perf_counter() - started
+    stats["workers"] = workers
+    return [results[sign_id] for sign_id in order], stats
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+
+
+def main(argv=None):
+    """Parse the command line, export the invoices and print throughput stats"""
+    parser = argparse.ArgumentParser(description="Export invoice PDFs for many signs at once.")
+    parser.add_argument("--status", help="only signs with this status (Pending, In Progress, Completed)")
+    parser.add_argument("--from", dest="date_from", type=_parse_date, help="created on or after YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", type=_parse_date, help="created on or before YYYY-MM-DD")
+    parser.add_argument("--customer", help="customer name starts with this text")
+    parser.add_argument("--out", default=INVOICES_DIR, help=f"output folder (default: {INVOICES_DIR})")
+    parser.add_argument("--workers", type=int, help="render processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"signs fetched per database round trip (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--merge", metavar="FILE", help="also combine all invoices into this PDF")
+    args = parser.parse_args(argv)
+
+    filters = {"status": args.status, "date_from": args.date_from, "date_to": args.date_to,
+               "customer": args.customer}
+    filepaths, stats = export(filters, args.out, args.workers, args.batch_size)
+    if not filepaths:
+        print("No signs match the filters.")
+        return 1
+
+    if args.merge:
+        merge_invoices(filepaths, args.merge)
+        print(f"Merged into {args.merge}")
+
+    rate = stats["signs"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"{stats['signs']} invoices in {stats['seconds']:.2f}s ({rate:.1f}/s) with {stats['workers']} workers: "
+          f"{stats['rendered']} rendered, {stats['cached']} from cache, "
+          f"{stats['render_seconds']:.2f}s of render time")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,18 @@
 """
 Main entry point for the Sign Business Management application.
 """
+import utils.startup as startup  # First, so the startup clock covers every other import
 import tkinter as tk
 from ui.app import SignBusinessApp
 
 def main():
     """Initialize and run the application"""
+    startup.mark("imports")
     root = tk.Tk()
     app = SignBusinessApp(root)
     root.protocol("WM_DELETE_WINDOW", app.close_application)  # Handle window close
+    startup.mark("window_built")
+    root.after_idle(startup.mark, "first_paint")
     root.mainloop()
 
 if __name__ == "__main__":
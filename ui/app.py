@@ -1,10 +1,18 @@
 """
 Main application window and navigation for the Sign Business application.
 """
+import os
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 from db.connection import DatabaseConnection
+from db import migrations
+from db.metrics import metrics
+from db.replica import LocalReplica
+from .dispatcher import TkDispatcher
 from .sign_views import SignViews
+from .repricing_views import RepricingViews
+from .diagnostics_views import DiagnosticsViews
+from utils.invoice_renderer import InvoiceRenderer
 
 class SignBusinessApp:
     def __init__(self, root):
@@ -16,6 +24,9 @@ class SignBusinessApp:
         # Database connection
         self.db_connection = DatabaseConnection.get_instance()
         
+        # Runs queries off the Tk thread and delivers results back through root.after
+        self.dispatcher = TkDispatcher(root)
+        
         # Main frame
         self.main_frame = ttk.Frame(root)
         self.main_frame.pack(fill=tk.BOTH, expand=True)
@@ -29,9 +40,36 @@ class SignBusinessApp:
         
         # Initialize sign view manager
         self.sign_views = SignViews(self.content_frame, self)
+        self.repricing_views = RepricingViews(self.content_frame, self)
+        self.diagnostics_views = DiagnosticsViews(self.content_frame, self)
+        
+        # Initialize with signs view once the schema is known to be current
+        self.dispatcher.run(migrations.schema_version, on_success=self._check_schema,
+                            on_error=self._on_schema_error)
+    
+    def _check_schema(self, version):
+        """Open the signs list, or offer to migrate a database older than this version of the app"""
+        if version >= migrations.LATEST_VERSION:
+            self.show_signs()
+            return
+        if not messagebox.askyesno(
+                "Actualizar base de datos",
+                f"La base de datos esta en la version {version} y esta aplicacion necesita la "
+                f"{migrations.LATEST_VERSION}.\n\nActualizarla ahora? (python -m db.migrations)"):
+            messagebox.showerror("Base de datos desactualizada",
+                                 "La aplicacion no puede abrirse sin actualizar la base de datos.")
+            self.close_application()
+            return
         
-        # Initialize with signs view
-        self.show_signs()
+        def on_migrated(applied):
+            self.dispatcher.run(migrations.schema_version, on_success=self._check_schema,
+                                on_error=self._on_schema_error)
+        
+        self.dispatcher.run(migrations.migrate, on_success=on_migrated, on_error=self._on_schema_error)
+    
+    def _on_schema_error(self, e):
+        messagebox.showerror("Database Error", f"Could not check the database schema: {e}")
+        self.close_application()
     
     def create_navigation_panel(self):
         """Create the navigation panel with buttons"""
@@ -43,8 +81,10 @@ class SignBusinessApp:
         # Navigation buttons
         ttk.Button(nav_frame, text="Ver carteles", command=self.show_signs, width=20).pack(pady=5)
         ttk.Button(nav_frame, text="Agregar nuevo cartel", command=self.add_new_sign, width=20).pack(pady=5)
+        ttk.Button(nav_frame, text="Ajustar precios", command=self.show_repricing, width=20).pack(pady=5)
+        ttk.Button(nav_frame, text="Diagnostico", command=self.show_diagnostics, width=20).pack(pady=5)
         ttk.Separator(nav_frame, orient='horizontal').pack(fill='x', pady=10)
-        ttk.Button(nav_frame, text="Salir", command=self.root.destroy, width=20).pack(pady=5)
+        ttk.Button(nav_frame, text="Salir", command=self.close_application, width=20).pack(pady=5)
     
     def clear_content_frame(self):
         """Clear all widgets from the content frame"""
@@ -52,17 +92,38 @@ class SignBusinessApp:
             widget.destroy()
     
     def show_signs(self):
-        """Display list of all signs"""
-        self.clear_content_frame()
-        self.sign_views.show_signs_list()
+        """Display the list of signs, updating it in place if it is already showing"""
+        self.sign_views.refresh_signs_list()
     
     def add_new_sign(self):
         """Add a new sign to the database"""
         self.clear_content_frame()
         self.sign_views.show_add_sign_form()
     
+    def show_repricing(self):
+        """Display the bulk repricing form"""
+        self.clear_content_frame()
+        self.repricing_views.show_repricing_form()
+    
+    def show_diagnostics(self):
+        """Display query timings and round trips per action"""
+        self.clear_content_frame()
+        self.diagnostics_views.show_diagnostics()
+    
     def close_application(self):
         """Close the application and database connection"""
+        self.dispatcher.shutdown()
+        # Keep this session's query timings for comparison with later runs
+        dump_path = os.getenv("DB_METRICS_DUMP")
+        if dump_path:
+            try:
+                data = self.diagnostics_views.collect()
+                metrics.dump(dump_path, {key: data[key] for key in ("pool", "prepared_statements", "cache")})
+            except OSError as e:
+                print(f"Could not write query metrics: {e}")
+        InvoiceRenderer.get_instance().shutdown()
+        if LocalReplica._instance is not None:
+            LocalReplica.get_instance().close()
         if self.db_connection:
             self.db_connection.close()
         self.root.destroy()
\ No newline at end of file
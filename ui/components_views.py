@@ -20,20 +20,80 @@ class ComponentViews:
         if not component_name or not component_name.strip():
             return
         
-        component_id = queries.create_component(sign_id, component_name.strip())
+        def on_created(component_id):
+            if component_id is not None:
+                messagebox.showinfo("Success", "Component added successfully!")
+                refresh_callback(sign_id, parent_window)
         
-        if component_id is not None:
-            messagebox.showinfo("Success", "Component added successfully!")
-            refresh_callback(sign_id, parent_window)
+        self.app.dispatcher.run(queries.create_component, sign_id, component_name.strip(),
+                                on_success=on_created, owner=parent_window)
+    
+    @staticmethod
+    def tab_title(component):
+        """Notebook tab text for a component: its name and subtotal"""
+        return f"{component['ComponentName']} (${component['Subtotal']:.2f})"
+    
+    @staticmethod
+    def job_row_values(job):
+        """Format a job row for a component's job treeview"""
+        quantity = job['Quantity'] if job['Quantity'] is not None else "-"
+        amount = f"${job['Amount']:.2f}" if job['Amount'] is not None else "-"
+        return (
+            job['JobName'],
+            f"${job['UnitCost']:.2f}", 
+            quantity,
+            amount
+        )
+    
+    def update_job_rows(self, job_tree, jobs):
+        """Patch the job treeview to match jobs, touching only rows that changed.
+        
+        Rows use the JobID as their item id, so edits and deletes can go straight
+        to the database by primary key.
+        """
+        if job_tree.exists("loading"):
+            job_tree.delete("loading")
+        
+        jobs = jobs or []
+        wanted = [str(job['JobID']) for job in jobs]
+        
+        # Drop rows for jobs that no longer exist, keeping rows with staged edits
+        stale = {iid for iid in job_tree.get_children()
+                 if iid not in wanted and "staged" not in job_tree.item(iid, "tags")}
+        if stale:
+            job_tree.delete(*stale)
+        
+        for index, (iid, job) in enumerate(zip(wanted, jobs)):
+            values = self.job_row_values(job)
+            if not job_tree.exists(iid):
+                job_tree.insert("", index, iid=iid, values=values)
+                continue
+            if "staged" in job_tree.item(iid, "tags"):
+                continue  # Keep showing the unsaved edit
+            # Treeview hands values back as Tcl strings/numbers, so compare as text
+            current = tuple(str(v) for v in job_tree.item(iid, "values"))
+            if current != tuple(str(v) for v in values):
+                job_tree.item(iid, values=values)
+            if job_tree.index(iid) != index:
+                job_tree.move(iid, "", index)
     
     def add_component_tab(self, notebook, component, sign_id, parent_window):
-        """Add a tab for a component to the notebook"""
-        # Create a tab for the component
-        component_tab = ttk.Frame(notebook)
-        notebook.add(component_tab, text=f"{component['ComponentName']} (${component['Subtotal']:.2f})")
+        """Add an empty placeholder tab for a component to the notebook.
         
-        # Get jobs for this component
-        jobs = queries.get_jobs_by_component_id(component['ComponentID'])
+        The job list and buttons are only built by build_component_tab, when the
+        tab is first shown. Returns the tab state the detail window patches later;
+        job_tree and batch stay None until the tab is built.
+        """
+        component_tab = ttk.Frame(notebook)
+        notebook.add(component_tab, text=self.tab_title(component))
+        return {"frame": component_tab, "component": component, "job_tree": None, "batch": None}
+    
+    def build_component_tab(self, tab, sign_id, parent_window):
+        """Fill a placeholder tab with its job treeview and action buttons, once"""
+        if tab["job_tree"] is not None:
+            return
+        component_tab = tab["frame"]
+        component = tab["component"]
         
         # Create a treeview for jobs
         job_columns = ("Job Name", "Unit Cost", "Quantity", "Amount")
@@ -51,60 +111,53 @@ class ComponentViews:
         job_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Populate job data
-        if jobs:
-            for job in jobs:
-                quantity = job['Quantity'] if job['Quantity'] is not None else "-"
-                amount = f"${job['Amount']:.2f}" if job['Amount'] is not None else "-"
-                
-                job_tree.insert("", tk.END, values=(
-                    job['JobName'],
-                    f"${job['UnitCost']:.2f}", 
-                    quantity,
-                    amount
-                ))
+        if 'Jobs' in component:
+            # Jobs already came with the sign tree
+            self.update_job_rows(job_tree, component['Jobs'])
+        else:
+            # Show a placeholder row while the jobs load in the background
+            job_tree.insert("", tk.END, iid="loading", values=("Cargando...", "", "", ""))
+            self.app.dispatcher.run(queries.get_jobs_by_component_id, component['ComponentID'],
+                                    on_success=lambda jobs: self.update_job_rows(job_tree, jobs),
+                                    owner=job_tree)
         
         # Button frame for component actions
         component_buttons = ttk.Frame(component_tab)
         component_buttons.pack(pady=10)
         
-        # Create a callback for refreshing just this tab
-        def refresh_component_tab():
-            # Clear the treeview
-            for item in job_tree.get_children():
-                job_tree.delete(item)
-                
-            # Get updated jobs
-            updated_jobs = queries.get_jobs_by_component_id(component['ComponentID'])
-            
-            # Re-populate the treeview
-            if updated_jobs:
-                for job in updated_jobs:
-                    quantity = job['Quantity'] if job['Quantity'] is not None else "-"
-                    amount = f"${job['Amount']:.2f}" if job['Amount'] is not None else "-"
-                    
-                    job_tree.insert("", tk.END, values=(
-                        job['JobName'],
-                        f"${job['UnitCost']:.2f}", 
-                        quantity,
-                        amount
-                    ))
-            
-            # Update the tab text with new subtotal
-            updated_component = queries.get_component_by_id(component['ComponentID'])
-            if updated_component:
-                tab_id = notebook.select()
-                tab_index = notebook.index(tab_id)
-                notebook.tab(tab_index, text=f"{updated_component['ComponentName']} (${updated_component['Subtotal']:.2f})")
-        
-        # We'll still use the full refresh for now since we need to update the total cost as well
+        # Staged edits: with batching on, job changes are collected and saved in one commit
+        from .job_views import JobChangeBatch
+        batch_buttons = ttk.Frame(component_tab)
+        batch_buttons.pack(pady=(0, 10))
+        
+        def on_batch_change(batch):
+            save_batch_button.configure(text=f"Save Changes ({len(batch)})")
+            state = ["!disabled"] if len(batch) else ["disabled"]
+            save_batch_button.state(state)
+            discard_batch_button.state(state)
+        
+        batch = JobChangeBatch(job_tree, component['ComponentID'], on_change=on_batch_change)
+        
         ttk.Button(component_buttons, text="Add Job", 
                   command=lambda c_id=component['ComponentID']: 
-                  self.job_views.add_job(c_id, parent_window, sign_id)).pack(side=tk.LEFT, padx=5)
+                  self.job_views.add_job(c_id, parent_window, sign_id, batch)).pack(side=tk.LEFT, padx=5)
         
         ttk.Button(component_buttons, text="Edit Selected Job", 
                   command=lambda tree=job_tree, c_id=component['ComponentID']: 
-                  self.job_views.edit_job(tree, parent_window, sign_id)).pack(side=tk.LEFT, padx=5)
+                  self.job_views.edit_job(tree, c_id, parent_window, sign_id, batch)).pack(side=tk.LEFT, padx=5)
         
         ttk.Button(component_buttons, text="Delete Selected Job", 
                   command=lambda tree=job_tree, c_id=component['ComponentID']: 
-                  self.job_views.delete_job(tree, parent_window, sign_id)).pack(side=tk.LEFT, padx=5)
\ No newline at end of file
+                  self.job_views.delete_job(tree, c_id, parent_window, sign_id, batch)).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Checkbutton(batch_buttons, text="Batch edits", variable=batch.enabled_var).pack(side=tk.LEFT, padx=5)
+        save_batch_button = ttk.Button(batch_buttons, text="Save Changes (0)", 
+                  command=lambda: self.job_views.save_batch(batch, parent_window, sign_id))
+        save_batch_button.pack(side=tk.LEFT, padx=5)
+        discard_batch_button = ttk.Button(batch_buttons, text="Discard", 
+                  command=lambda: self.job_views.discard_batch(batch, parent_window, sign_id))
+        discard_batch_button.pack(side=tk.LEFT, padx=5)
+        on_batch_change(batch)
+        
+        tab["job_tree"] = job_tree
+        tab["batch"] = batch
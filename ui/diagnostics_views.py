@@ -0,0 +1,100 @@
+"""
+Diagnostics view for the Sign Business application.
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import datetime
+from db.metrics import metrics
+import db.queries as queries
+
+
+class DiagnosticsViews:
+    def __init__(self, parent_frame, app):
+        self.parent_frame = parent_frame
+        self.app = app
+
+    def collect(self):
+        """Everything the panel shows, as one plain dict (also what gets saved to JSON)"""
+        db = self.app.db_connection
+        data = metrics.snapshot()
+        data["pool"] = db.pool_stats()
+        data["prepared_statements"] = db.statement_stats()
+        data["cache"] = queries.cache.stats()
+        return data
+
+    def show_diagnostics(self):
+        """Display query timings per statement and round trips per screen action"""
+        ttk.Label(self.parent_frame, text="Diagnostico", font=("Arial", 14, "bold")).pack(pady=10)
+
+        summary_var = tk.StringVar()
+        ttk.Label(self.parent_frame, textvariable=summary_var, justify=tk.LEFT).pack(anchor=tk.W, pady=5)
+
+        # Round trips per action
+        ttk.Label(self.parent_frame, text="Acciones", font=("Arial", 12, "bold")).pack(anchor=tk.W)
+        action_columns = ("Accion", "Llamadas", "Consultas", "Consultas/llamada", "Tiempo total (ms)")
+        action_tree = ttk.Treeview(self.parent_frame, columns=action_columns, show="headings", height=8)
+        for col in action_columns:
+            action_tree.heading(col, text=col)
+            action_tree.column(col, width=300 if col == "Accion" else 120)
+        action_tree.pack(fill=tk.X, pady=5)
+
+        # Timing per statement
+        ttk.Label(self.parent_frame, text="Consultas", font=("Arial", 12, "bold")).pack(anchor=tk.W)
+        statement_columns = ("Consulta", "Veces", "Prom (ms)", "p95 (ms)", "Max (ms)", "Total (ms)", "Filas",
+                             "Errores")
+        statement_frame = ttk.Frame(self.parent_frame)
+        statement_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        statement_tree = ttk.Treeview(statement_frame, columns=statement_columns, show="headings", height=12)
+        for col in statement_columns:
+            statement_tree.heading(col, text=col)
+            statement_tree.column(col, width=420 if col == "Consulta" else 80)
+        scrollbar = ttk.Scrollbar(statement_frame, orient=tk.VERTICAL, command=statement_tree.yview)
+        statement_tree.configure(yscroll=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        statement_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        def refresh():
+            data = self.collect()
+            pool, cache, prepared = data["pool"], data["cache"], data["prepared_statements"]
+            summary_var.set(
+                f"Desde {data['since']}  |  Conexiones: {pool['open']}/{pool['size']} abiertas, "
+                f"espera prom. {pool['avg_wait_time'] * 1000:.1f} ms  |  "
+                f"Cache: {cache['entries']} filas, {cache['hit_rate']:.0%} aciertos  |  "
+                f"Sentencias preparadas: {prepared['reuse_rate']:.0%} reutilizadas\n"
+                f"Consultas lentas (>= {metrics.slow_query_ms:.0f} ms) en: {metrics.slow_query_log or '(desactivado)'}"
+            )
+
+            action_tree.delete(*action_tree.get_children())
+            for a in data["actions"]:
+                action_tree.insert("", tk.END, values=(
+                    a["action"], a["calls"], a["round_trips"], f"{a['round_trips_per_call']:.1f}",
+                    f"{a['total_ms']:.0f}"))
+
+            statement_tree.delete(*statement_tree.get_children())
+            for s in data["statements"]:
+                p95 = f"{s['p95_ms']:.0f}" if s["p95_ms"] is not None else "lento"
+                statement_tree.insert("", tk.END, values=(
+                    s["statement"], s["count"], f"{s['avg_ms']:.1f}", p95, f"{s['max_ms']:.1f}",
+                    f"{s['total_ms']:.0f}", s["rows"], s["errors"]))
+
+        def reset():
+            metrics.reset()
+            refresh()
+
+        def save():
+            path = f"diagnostics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            data = self.collect()
+            try:
+                metrics.dump(path, {key: data[key] for key in ("pool", "prepared_statements", "cache")})
+            except OSError as e:
+                messagebox.showerror("Diagnostico", f"No se pudo guardar {path}: {e}")
+                return
+            messagebox.showinfo("Diagnostico", f"Guardado en {path}")
+
+        button_frame = ttk.Frame(self.parent_frame)
+        button_frame.pack(pady=10)
+        ttk.Button(button_frame, text="Actualizar", command=refresh).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Reiniciar contadores", command=reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Guardar JSON", command=save).pack(side=tk.LEFT, padx=5)
+
+        refresh()
@@ -0,0 +1,121 @@
+"""
+Delivery of background query results to the Tk main loop.
+"""
+import queue
+from tkinter import messagebox
+from concurrent.futures import CancelledError
+from db.connection import DatabaseConnection
+from db.executor import QueryExecutor
+from db.metrics import caller_action, run_as
+
+
+class TkDispatcher:
+    """Runs work on the query executor and hands results back through root.after.
+
+    Tk is not thread-safe, so worker threads never touch widgets: finished futures
+    are queued and drained by a poll loop that only runs while work is pending.
+    """
+    POLL_INTERVAL_MS = 20
+
+    def __init__(self, root, executor=None):
+        self.root = root
+        self.executor = executor or QueryExecutor.get_instance()
+        self._done = queue.SimpleQueue()
+        self._errors = queue.SimpleQueue()
+        self._pending = 0
+        self._after_id = None
+        self._owned = {}  # owner widget path -> futures to cancel on destroy
+
+        # Database errors raised on worker threads are shown once they reach the main loop
+        DatabaseConnection.background_error_handler = self._queue_error
+
+    def run(self, fn, *args, on_success=None, on_error=None, owner=None, action=None, **kwargs):
+        """Run fn on a worker thread and call on_success(result) on the Tk thread.
+
+        If owner is given and destroyed before the result arrives, the task is
+        cancelled and no callback is made. The queries fn runs are counted under
+        action in the query metrics, by default the view method calling run.
+        """
+        action = action or caller_action()
+        future = self.executor.submit(run_as, action, fn, *args, **kwargs)
+        return self.watch(future, on_success=on_success, on_error=on_error, owner=owner)
+
+    def watch(self, future, on_success=None, on_error=None, owner=None):
+        """Deliver the outcome of an existing future to the Tk thread"""
+        if owner is not None:
+            self._bind_owner(owner, future)
+
+        self._pending += 1
+        future.add_done_callback(lambda f: self._done.put((f, on_success, on_error, owner)))
+        self._schedule()
+        return future
+
+    def _bind_owner(self, owner, future):
+        key = str(owner)
+        if key not in self._owned:
+            self._owned[key] = []
+            owner.bind("<Destroy>", lambda event, w=owner: self._on_owner_destroyed(event, w), add="+")
+        self._owned[key].append(future)
+
+    def _on_owner_destroyed(self, event, owner):
+        # <Destroy> also fires for every child of a Toplevel; only react to the owner itself
+        if event.widget is not owner:
+            return
+        for future in self._owned.pop(str(owner), []):
+            future.cancel()
+
+    def _queue_error(self, title, message):
+        self._errors.put((title, message))
+
+    def _schedule(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        self._after_id = None
+
+        while True:
+            try:
+                title, message = self._errors.get_nowait()
+            except queue.Empty:
+                break
+            messagebox.showerror(title, message)
+
+        while True:
+            try:
+                future, on_success, on_error, owner = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            self._deliver(future, on_success, on_error, owner)
+
+        if self._pending > 0:
+            self._schedule()
+
+    def _deliver(self, future, on_success, on_error, owner):
+        if owner is not None:
+            owned = self._owned.get(str(owner))
+            if owned is not None and future in owned:
+                owned.remove(future)
+            if not owner.winfo_exists():
+                return
+        try:
+            result = future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            else:
+                messagebox.showerror("Error", f"Background task failed: {e}")
+            return
+        if on_success:
+            on_success(result)
+
+    def shutdown(self):
+        """Stop polling and shut down the worker pool"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        DatabaseConnection.background_error_handler = None
+        self.executor.shutdown(wait=False)
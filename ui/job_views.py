@@ -5,6 +5,98 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import db.queries as queries
 
+
+class JobChangeBatch:
+    """Job edits staged in one component tab and saved together in a single transaction"""
+    NEW_PREFIX = "new-"  # Item id prefix for staged jobs that do not exist in the database yet
+    
+    def __init__(self, job_tree, component_id, on_change=None):
+        self.job_tree = job_tree
+        self.component_id = component_id
+        self.on_change = on_change
+        self.enabled_var = tk.BooleanVar(value=False)
+        self._changes = []  # [kind, item id, args] in the order they were made
+        self._new_count = 0
+        
+        self.job_tree.tag_configure("staged", foreground="#1f5fbf")
+    
+    @property
+    def enabled(self):
+        return self.enabled_var.get()
+    
+    @classmethod
+    def is_new(cls, iid):
+        return str(iid).startswith(cls.NEW_PREFIX)
+    
+    def __len__(self):
+        return len(self._changes)
+    
+    def pending(self):
+        """Changes in the (kind, args) form taken by queries.apply_job_changes"""
+        return [(kind, args) for kind, _, args in self._changes]
+    
+    def stage_create(self, name, cost, quantity):
+        self._new_count += 1
+        iid = f"{self.NEW_PREFIX}{self._new_count}"
+        self._changes.append(['create', iid, (self.component_id, name, cost, quantity)])
+        self.job_tree.insert("", tk.END, iid=iid, values=self._row_values(name, cost, quantity), tags=("staged",))
+        self._notify()
+    
+    def stage_update(self, job_id, name, cost, quantity):
+        iid = str(job_id)
+        if self.is_new(iid):
+            # Still unsaved: fold the edit into its pending insert
+            self._find(iid)[2] = (self.component_id, name, cost, quantity)
+        else:
+            change = self._find(iid, kind='update')
+            if change:
+                change[2] = (job_id, name, cost, quantity)
+            else:
+                self._changes.append(['update', iid, (job_id, name, cost, quantity)])
+        self.job_tree.item(iid, values=self._row_values(name, cost, quantity), tags=("staged",))
+        self._notify()
+    
+    def stage_delete(self, job_id):
+        iid = str(job_id)
+        if self.is_new(iid):
+            self._changes.remove(self._find(iid))
+        else:
+            self._changes = [c for c in self._changes if c[1] != iid]
+            self._changes.append(['delete', iid, (job_id,)])
+        self.job_tree.delete(iid)
+        self._notify()
+    
+    def clear(self):
+        """Forget staged changes and drop their markers; the caller refreshes the rows"""
+        for kind, iid, _ in self._changes:
+            if self.job_tree.exists(iid):
+                if kind == 'create':
+                    self.job_tree.delete(iid)
+                else:
+                    self.job_tree.item(iid, tags=())
+        self._changes = []
+        self._notify()
+    
+    def staged_values(self, iid):
+        """(name, cost, quantity) of a row's unsaved create or update, or None"""
+        change = self._find(str(iid), kind='create') or self._find(str(iid), kind='update')
+        return tuple(change[2][1:]) if change else None
+    
+    def _find(self, iid, kind=None):
+        for change in self._changes:
+            if change[1] == iid and (kind is None or change[0] == kind):
+                return change
+        return None
+    
+    @staticmethod
+    def _row_values(name, cost, quantity):
+        return (name, f"${cost:.2f}", quantity if quantity is not None else "-", "(pendiente)")
+    
+    def _notify(self):
+        if self.on_change:
+            self.on_change(self)
+
+
 class JobViews:
     def __init__(self, parent_frame, app):
         self.parent_frame = parent_frame
@@ -12,8 +104,8 @@ class JobViews:
     
     # Update the add_job method in job_views.py to make dialog modal:
 
-    def add_job(self, component_id, parent_window, sign_id):
-        """Add a new job to a component"""
+    def add_job(self, component_id, parent_window, sign_id, batch=None):
+        """Add a new job to a component, or stage it when the tab is batching edits"""
         # Create dialog window
         dialog = tk.Toplevel(parent_window)
         dialog.title("Add New Job")
@@ -51,49 +143,78 @@ class JobViews:
             try:
                 cost = float(cost_str)
                 quantity = float(quantity_str) if quantity_str else None
-                
-                job_id = queries.create_job(component_id, name, cost, quantity)
-                
+            except ValueError:
+                messagebox.showwarning("Validation Error", "Cost and quantity must be valid numbers.")
+                return
+            
+            if batch is not None and batch.enabled:
+                batch.stage_create(name, cost, quantity)
+                dialog.destroy()
+                return
+            
+            def on_created(job_id):
                 if job_id is not None:
                     messagebox.showinfo("Success", "Job added successfully!")
                     dialog.destroy()  # This should close the dialog
-    
-                # Get the detail view function from parent to refresh
-                self._refresh_detail_view(sign_id, parent_window)
-                
-            except ValueError:
-                messagebox.showwarning("Validation Error", "Cost and quantity must be valid numbers.")
+                    
+                    # Get the detail view function from parent to refresh
+                    self._refresh_detail_view(sign_id, parent_window, component_id)
+                else:
+                    save_button.state(["!disabled"])
+            
+            save_button.state(["disabled"])
+            self.app.dispatcher.run(queries.create_job, component_id, name, cost, quantity,
+                                    on_success=on_created, owner=dialog)
         
-        ttk.Button(dialog, text="Save Job", command=save_job).grid(row=3, column=0, pady=20)
+        save_button = ttk.Button(dialog, text="Save Job", command=save_job)
+        save_button.grid(row=3, column=0, pady=20)
         ttk.Button(dialog, text="Cancel", command=dialog.destroy).grid(row=3, column=1, pady=20)
         
         # This ensures dialog is properly handled
         parent_window.wait_window(dialog)
     
-    def edit_job(self, tree, parent_window, sign_id):
+    @staticmethod
+    def _selected_job_id(tree):
+        """JobID of the selected row (an item id for staged new jobs), or None for placeholder rows"""
+        iid = tree.selection()[0]
+        if JobChangeBatch.is_new(iid):
+            return iid
+        return int(iid) if iid.isdigit() else None
+    
+    def edit_job(self, tree, component_id, parent_window, sign_id, batch=None):
         """Edit the selected job"""
         selected_item = tree.selection()
         if not selected_item:
             messagebox.showwarning("Selection Required", "Please select a job to edit.")
             return
         
-        job_name = tree.item(selected_item[0], "values")[0]
-        unit_cost = tree.item(selected_item[0], "values")[1].replace("$", "")
-        quantity = tree.item(selected_item[0], "values")[2]
+        job_id = self._selected_job_id(tree)
+        if job_id is None:
+            return  # "Cargando..." placeholder, not a job
         
-        # Get job ID from database - using get_job_by_id directly from primary key would be safer
-        try:
-            job = queries.get_job_by_details(job_name, float(unit_cost))
-            
+        def show_dialog(job_name, unit_cost, quantity):
+            self._show_edit_job_dialog(job_id, component_id, job_name, str(unit_cost),
+                                       "" if quantity is None else str(quantity), parent_window, sign_id, batch)
+        
+        # A staged edit is not in the database yet: start from what was staged
+        staged = batch.staged_values(job_id) if batch is not None else None
+        if staged:
+            show_dialog(*staged)
+            return
+        
+        def on_loaded(job):
             if not job:
                 messagebox.showerror("Error", "Job not found in database.")
+                self._refresh_detail_view(sign_id, parent_window, component_id)
                 return
-                
-            job_id = job['JobID']
-        except Exception as e:
-            messagebox.showerror("Error", f"Error retrieving job: {e}")
-            return
+            show_dialog(job['JobName'], job['UnitCost'], job['Quantity'])
         
+        # Prefill from the stored row, not the formatted text shown in the tree
+        self.app.dispatcher.run(queries.get_job_by_id, job_id, on_success=on_loaded, owner=parent_window)
+    
+    def _show_edit_job_dialog(self, job_id, component_id, job_name, unit_cost, quantity, parent_window, sign_id,
+                              batch=None):
+        """Show the edit dialog prefilled with the job's current values"""
         # Create dialog window
         dialog = tk.Toplevel(parent_window)
         dialog.title("Edit Job")
@@ -110,7 +231,7 @@ class JobViews:
         ttk.Entry(dialog, textvariable=cost_var, width=30).grid(row=1, column=1, sticky=tk.W, pady=5)
         
         ttk.Label(dialog, text="Quantity:").grid(row=2, column=0, sticky=tk.W, pady=5)
-        quantity_var = tk.StringVar(value="" if quantity == "-" else quantity)
+        quantity_var = tk.StringVar(value=quantity)
         ttk.Entry(dialog, textvariable=quantity_var, width=30).grid(row=2, column=1, sticky=tk.W, pady=5)
         ttk.Label(dialog, text="(Leave empty if not applicable)").grid(row=2, column=2, sticky=tk.W, pady=5)
         
@@ -127,20 +248,31 @@ class JobViews:
             try:
                 cost = float(cost_str)
                 quantity = float(quantity_str) if quantity_str else None
-                
-                success = queries.update_job(job_id, name, cost, quantity)
-                
+            except ValueError:
+                messagebox.showwarning("Validation Error", "Cost and quantity must be valid numbers.")
+                return
+            
+            if batch is not None and (batch.enabled or batch.is_new(job_id)):
+                batch.stage_update(job_id, name, cost, quantity)
+                dialog.destroy()
+                return
+            
+            def on_saved(success):
                 if success is not None:
                     messagebox.showinfo("Success", "Job updated successfully!")
                     dialog.destroy()
                     
                     # Refresh the detail view
-                    self._refresh_detail_view(sign_id, parent_window)
-                
-            except ValueError:
-                messagebox.showwarning("Validation Error", "Cost and quantity must be valid numbers.")
+                    self._refresh_detail_view(sign_id, parent_window, component_id)
+                else:
+                    save_button.state(["!disabled"])
+            
+            save_button.state(["disabled"])
+            self.app.dispatcher.run(queries.update_job, job_id, name, cost, quantity,
+                                    on_success=on_saved, owner=dialog)
         
-        ttk.Button(dialog, text="Save Changes", command=save_changes).grid(row=3, column=0, pady=20)
+        save_button = ttk.Button(dialog, text="Save Changes", command=save_changes)
+        save_button.grid(row=3, column=0, pady=20)
         ttk.Button(dialog, text="Cancel", command=dialog.destroy).grid(row=3, column=1, pady=20)
         
         # Make dialog modal
@@ -148,15 +280,21 @@ class JobViews:
         dialog.grab_set()
         parent_window.wait_window(dialog)
     
-    def delete_job(self, tree, parent_window, sign_id):
+    def delete_job(self, tree, component_id, parent_window, sign_id, batch=None):
         """Delete the selected job"""
         selected_item = tree.selection()
         if not selected_item:
             messagebox.showwarning("Selection Required", "Please select a job to delete.")
             return
         
+        job_id = self._selected_job_id(tree)
+        if job_id is None:
+            return  # "Cargando..." placeholder, not a job
         job_name = tree.item(selected_item[0], "values")[0]
-        unit_cost = tree.item(selected_item[0], "values")[1].replace("$", "")
+        
+        if batch is not None and (batch.enabled or batch.is_new(job_id)):
+            batch.stage_delete(job_id)
+            return
         
         # Confirm deletion
         confirm = messagebox.askyesno("Confirm Deletion", 
@@ -164,36 +302,45 @@ class JobViews:
         if not confirm:
             return
         
-        # Get job ID from database
-        try:
-            # Wrap this in a try-except to catch any database errors
-            job = queries.get_job_by_details(job_name, float(unit_cost))
-            
-            if not job:
+        def on_deleted(deleted):
+            if deleted is None:
+                return  # Database error already reported
+            if deleted == 0:
                 messagebox.showerror("Error", "Job not found in database.")
-                return
-                
-            job_id = job['JobID']
-            
-            success = queries.delete_job(job_id)
-            
-            if success is not None:
+            else:
                 messagebox.showinfo("Success", "Job deleted successfully!")
-                
-                # Refresh the detail view
-                self._refresh_detail_view(sign_id, parent_window)
-        except Exception as e:
+            
+            # Refresh the detail view
+            self._refresh_detail_view(sign_id, parent_window, component_id)
+        
+        def on_error(e):
             messagebox.showerror("Error", f"Error deleting job: {e}")
+        
+        self.app.dispatcher.run(queries.delete_job, job_id, on_success=on_deleted, on_error=on_error,
+                                owner=parent_window)
+    
+    def save_batch(self, batch, parent_window, sign_id):
+        """Apply a tab's staged job edits in one transaction"""
+        if not len(batch):
+            return
+        
+        def on_saved(count):
+            batch.clear()
+            messagebox.showinfo("Success", f"{count} job changes saved!")
+            self._refresh_detail_view(sign_id, parent_window, batch.component_id)
+        
+        def on_error(e):
+            messagebox.showerror("Error", f"No changes were saved: {e}")
+        
+        self.app.dispatcher.run(queries.apply_job_changes, batch.pending(),
+                                on_success=on_saved, on_error=on_error, owner=parent_window)
+    
+    def discard_batch(self, batch, parent_window, sign_id):
+        """Drop a tab's staged job edits and reload its rows"""
+        batch.clear()
+        self._refresh_detail_view(sign_id, parent_window, batch.component_id)
     
-    def _refresh_detail_view(self, sign_id, parent_window):
-        """Refresh the detail view after changes"""
-        # Instead of destroying and recreating the window, we can refresh just the components part
-        # Store a reference to the current window and refresh it
-        from ui.sign_views import SignViews
-        sign_views = SignViews(self.parent_frame, self.app)
-        
-        # This is a better approach than destroying and recreating the window
-        # But we need to update the sign_views.py file to support this
-        # For now, we'll use the existing method
-        parent_window.destroy()
-        sign_views._show_sign_detail_window(sign_id)
\ No newline at end of file
+    def _refresh_detail_view(self, sign_id, parent_window, component_id):
+        """Refresh the detail view after changes to one component's jobs"""
+        # Patch the open window in place: only this component's rows and the totals change
+        self.app.sign_views._update_sign_details(sign_id, parent_window, component_id)
@@ -0,0 +1,144 @@
+"""
+Treeview that loads its rows a page at a time as the user scrolls.
+"""
+import tkinter as tk
+from db.metrics import caller_action
+
+
+class PagedTreeLoader:
+    """Fills a Treeview page by page from a keyset-paginated query.
+
+    fetch_page(after, limit) runs on the query executor and returns a list of
+    rows; row_key(row) gives the key passed as `after` for the next page, and
+    row_values(row) gives the Treeview values. Only the first page is fetched
+    up front; more are requested when the view scrolls near the bottom.
+    on_page(rows), if given, is called after each page has been added.
+    """
+    LOAD_THRESHOLD = 0.9  # Fraction of the list scrolled before the next page is requested
+
+    def __init__(self, tree, scrollbar, dispatcher, fetch_page, row_key, row_values,
+                 row_id=None, page_size=100, on_page=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.dispatcher = dispatcher
+        self.fetch_page = fetch_page
+        self.row_key = row_key
+        self.row_values = row_values
+        self.row_id = row_id
+        self.page_size = page_size
+        self.on_page = on_page
+        self.action = caller_action()  # Pages are counted under the view that built the list
+
+        self._after = None
+        self._loading = False
+        self._exhausted = False
+        self._generation = 0
+        self._keys = {}  # iid -> row_key of the loaded rows, for placing rows that change later
+
+        self.tree.configure(yscrollcommand=self._on_scroll)
+
+    def reset(self, fetch_page=None):
+        """Clear the tree and start again from the first page"""
+        if fetch_page is not None:
+            self.fetch_page = fetch_page
+        self._generation += 1
+        self._after = None
+        self._loading = False
+        self._exhausted = False
+        self._keys = {}
+        self.tree.delete(*self.tree.get_children())
+        self.load_next()
+
+    def load_next(self):
+        """Request the next page unless one is already loading or the end was reached"""
+        if self._loading or self._exhausted:
+            return
+        self._loading = True
+        self._show_loading_row()
+
+        generation = self._generation
+        self.dispatcher.run(self.fetch_page, self._after, self.page_size,
+                            on_success=lambda rows: self._on_page(rows, generation),
+                            on_error=lambda e: self._on_error(e, generation),
+                            owner=self.tree, action=self.action)
+
+    def _show_loading_row(self):
+        if not self.tree.exists("loading"):
+            columns = self.tree["columns"]
+            values = ["Cargando..." if i == 1 else "" for i in range(len(columns))]
+            self.tree.insert("", tk.END, iid="loading", values=values)
+
+    def _hide_loading_row(self):
+        if self.tree.exists("loading"):
+            self.tree.delete("loading")
+
+    def _on_page(self, rows, generation):
+        if generation != self._generation:
+            return  # Result of a query made before the last reset
+        self._loading = False
+        self._hide_loading_row()
+
+        rows = rows or []
+        for row in rows:
+            iid = str(self.row_id(row)) if self.row_id else ""
+            if iid and self.tree.exists(iid):
+                self.tree.item(iid, values=self.row_values(row))
+            else:
+                self.tree.insert("", tk.END, iid=iid or None, values=self.row_values(row))
+            if iid:
+                self._keys[iid] = self.row_key(row)
+
+        if rows:
+            self._after = self.row_key(rows[-1])
+        if len(rows) < self.page_size:
+            self._exhausted = True
+        if self.on_page:
+            self.on_page(rows)
+
+    def apply_changes(self, rows, deleted_ids=()):
+        """Patch the loaded rows in place: drop deleted IDs, update or insert changed rows in order.
+
+        Needs row_id. A changed row that sorts after the last loaded page is
+        left for that page to bring in.
+        """
+        for row_id in deleted_ids:
+            iid = str(row_id)
+            if self.tree.exists(iid):
+                self.tree.delete(iid)
+            self._keys.pop(iid, None)
+
+        for row in rows:
+            iid = str(self.row_id(row))
+            key = self.row_key(row)
+            if self.tree.exists(iid):
+                if self._keys.get(iid) == key:
+                    self.tree.item(iid, values=self.row_values(row))
+                    continue
+                self.tree.delete(iid)  # Its sort key changed: move it
+                del self._keys[iid]
+            if not self._exhausted and self._after is not None and key < self._after:
+                continue
+            self.tree.insert("", self._position(key), iid=iid, values=self.row_values(row))
+            self._keys[iid] = key
+
+    def _position(self, key):
+        """Index at which a row with key belongs; rows are in descending key order"""
+        for index, iid in enumerate(self.tree.get_children()):
+            if iid == "loading" or self._keys.get(iid, key) < key:
+                return index
+        return tk.END
+
+    def _on_error(self, e, generation):
+        if generation != self._generation:
+            return
+        # Stop paging; reopening the list (reset) tries again
+        self._loading = False
+        self._exhausted = True
+        self._hide_loading_row()
+        print(f"Error loading page: {e}")
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        # Also fires after rows are inserted, so a page that does not fill the view pulls the next one
+        if float(last) >= self.LOAD_THRESHOLD:
+            self.load_next()
@@ -0,0 +1,173 @@
+"""
+Bulk repricing view for the Sign Business application.
+"""
+import tkinter as tk
+from tkinter import ttk, messagebox
+from decimal import Decimal, InvalidOperation
+from datetime import datetime
+import db.repricing as repricing
+
+
+class RepricingViews:
+    KINDS = {"Porcentaje (%)": repricing.PERCENT, "Monto fijo ($)": repricing.ABSOLUTE}
+
+    def __init__(self, parent_frame, app):
+        self.parent_frame = parent_frame
+        self.app = app
+        self.rules = []
+        self.changes = []
+
+    def show_repricing_form(self):
+        """Display the rule editor, the preview of price changes and the apply button"""
+        self.rules = []
+        self.changes = []
+
+        ttk.Label(self.parent_frame, text="Ajuste de precios", font=("Arial", 14, "bold")).pack(pady=10)
+
+        # Rule editor
+        rule_frame = ttk.LabelFrame(self.parent_frame, text="Nueva regla", padding=10)
+        rule_frame.pack(fill=tk.X, pady=5)
+
+        ttk.Label(rule_frame, text="Tipo:").grid(row=0, column=0, sticky=tk.W, padx=5)
+        kind_var = tk.StringVar(value=next(iter(self.KINDS)))
+        ttk.Combobox(rule_frame, textvariable=kind_var, width=15, state="readonly",
+                     values=list(self.KINDS)).grid(row=0, column=1, sticky=tk.W, padx=5)
+
+        ttk.Label(rule_frame, text="Valor:").grid(row=0, column=2, sticky=tk.W, padx=5)
+        value_var = tk.StringVar()
+        ttk.Entry(rule_frame, textvariable=value_var, width=10).grid(row=0, column=3, sticky=tk.W, padx=5)
+
+        ttk.Label(rule_frame, text="Trabajo (ej. vinil*):").grid(row=0, column=4, sticky=tk.W, padx=5)
+        pattern_var = tk.StringVar()
+        ttk.Entry(rule_frame, textvariable=pattern_var, width=20).grid(row=0, column=5, sticky=tk.W, padx=5)
+
+        ttk.Label(rule_frame, text="Estado:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
+        status_var = tk.StringVar()
+        ttk.Combobox(rule_frame, textvariable=status_var, width=15, state="readonly",
+                     values=["", "Pending", "In Progress", "Completed"]).grid(row=1, column=1, sticky=tk.W, padx=5)
+
+        ttk.Label(rule_frame, text="Desde (AAAA-MM-DD):").grid(row=1, column=2, sticky=tk.W, padx=5)
+        date_from_var = tk.StringVar()
+        ttk.Entry(rule_frame, textvariable=date_from_var, width=12).grid(row=1, column=3, sticky=tk.W, padx=5)
+
+        ttk.Label(rule_frame, text="Hasta:").grid(row=1, column=4, sticky=tk.W, padx=5)
+        date_to_var = tk.StringVar()
+        ttk.Entry(rule_frame, textvariable=date_to_var, width=12).grid(row=1, column=5, sticky=tk.W, padx=5)
+
+        # Rules to apply, in order
+        rules_list = tk.Listbox(self.parent_frame, height=4)
+        rules_list.pack(fill=tk.X, pady=5)
+
+        def add_rule():
+            try:
+                value = Decimal(value_var.get().strip())
+            except InvalidOperation:
+                messagebox.showwarning("Validation Error", "El valor debe ser un numero.")
+                return
+            dates = []
+            for var in (date_from_var, date_to_var):
+                text = var.get().strip()
+                try:
+                    dates.append(datetime.strptime(text, "%Y-%m-%d").date() if text else None)
+                except ValueError:
+                    messagebox.showwarning("Validation Error", "Las fechas deben tener el formato AAAA-MM-DD.")
+                    return
+            rule = repricing.RepriceRule(self.KINDS[kind_var.get()], value, pattern_var.get(),
+                                         status_var.get(), *dates)
+            self.rules.append(rule)
+            rules_list.insert(tk.END, rule.describe())
+            clear_preview()
+
+        def remove_rule():
+            selected = rules_list.curselection()
+            if not selected:
+                return
+            del self.rules[selected[0]]
+            rules_list.delete(selected[0])
+            clear_preview()
+
+        rule_buttons = ttk.Frame(self.parent_frame)
+        rule_buttons.pack(fill=tk.X)
+        ttk.Button(rule_buttons, text="Agregar regla", command=add_rule).pack(side=tk.LEFT, padx=5)
+        ttk.Button(rule_buttons, text="Quitar regla", command=remove_rule).pack(side=tk.LEFT, padx=5)
+
+        # Preview of the changes
+        columns = ("Cartel", "Componente", "Trabajo", "Costo actual", "Costo nuevo", "Cantidad",
+                   "Importe actual", "Importe nuevo")
+        tree_frame = ttk.Frame(self.parent_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=14)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=180 if col in ("Cartel", "Componente", "Trabajo") else 100)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscroll=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        summary_var = tk.StringVar()
+        ttk.Label(self.parent_frame, textvariable=summary_var).pack(anchor=tk.W, pady=5)
+
+        def clear_preview():
+            self.changes = []
+            tree.delete(*tree.get_children())
+            summary_var.set("")
+            apply_button.state(["disabled"])
+
+        def show_preview(result):
+            preview_button.state(["!disabled"])
+            if result is None:
+                return  # Database error already reported
+            self.changes = result['changes']
+            tree.delete(*tree.get_children())
+            for change in self.changes:
+                tree.insert("", tk.END, iid=change['JobID'], values=(
+                    change['SignName'],
+                    change['ComponentName'],
+                    change['JobName'],
+                    f"${change['OldUnitCost']:.2f}",
+                    f"${change['NewUnitCost']:.2f}",
+                    change['Quantity'] if change['Quantity'] is not None else "-",
+                    f"${change['OldAmount']:.2f}" if change['OldAmount'] is not None else "-",
+                    f"${change['NewAmount']:.2f}" if change['NewAmount'] is not None else "-",
+                ))
+            summary_var.set(f"{result['matched']} trabajos encontrados, {len(self.changes)} cambian de precio; "
+                            f"diferencia total: ${result['amount_delta']:+.2f}")
+            if self.changes:
+                apply_button.state(["!disabled"])
+
+        def run_preview():
+            if not self.rules:
+                messagebox.showwarning("Validation Error", "Agregue al menos una regla.")
+                return
+            preview_button.state(["disabled"])
+            self.app.dispatcher.run(repricing.preview, list(self.rules), on_success=show_preview,
+                                    owner=tree)
+
+        def apply_changes():
+            if not messagebox.askyesno("Confirmar", f"Actualizar el precio de {len(self.changes)} trabajos?"):
+                return
+
+            def on_applied(count):
+                messagebox.showinfo("Success", f"{count} trabajos actualizados.")
+                clear_preview()
+
+            def on_error(e):
+                apply_button.state(["!disabled"])
+                if isinstance(e, repricing.StaleRepricingError):
+                    messagebox.showwarning("Cambios no aplicados",
+                                           f"{e}. Genere la vista previa de nuevo.")
+                else:
+                    messagebox.showerror("Error", f"No se aplicaron cambios: {e}")
+
+            apply_button.state(["disabled"])
+            self.app.dispatcher.run(repricing.apply_repricing, self.changes, on_success=on_applied,
+                                    on_error=on_error, owner=tree)
+
+        button_frame = ttk.Frame(self.parent_frame)
+        button_frame.pack(fill=tk.X, pady=5)
+        preview_button = ttk.Button(button_frame, text="Vista previa", command=run_preview)
+        preview_button.pack(side=tk.LEFT, padx=5)
+        apply_button = ttk.Button(button_frame, text="Aplicar cambios", command=apply_changes)
+        apply_button.pack(side=tk.LEFT, padx=5)
+        apply_button.state(["disabled"])
@@ -3,22 +3,54 @@ Sign-related views and operations for the Sign Business application.
 """
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
+from datetime import datetime
 import db.queries as queries
+from db.replica import LocalReplica
 from .components_views import ComponentViews
-from utils.print_invoice import PrintInvoice
+from .paged_tree import PagedTreeLoader
+from utils.invoice_renderer import InvoiceRenderer
+import utils.startup as startup
 
 class SignViews:
+    SEARCH_DEBOUNCE_MS = 300
+    REPLICA_SYNC_MS = 30000  # How often an open signs list pulls changes into the local mirror
+    
     def __init__(self, parent_frame, app):
         self.parent_frame = parent_frame
         self.app = app
         self.component_views = ComponentViews(parent_frame, app)
         self.current_windows = {}  # Track open windows by sign_id
+        self.detail_states = {}    # Widget references of built detail windows by sign_id
+        self.signs_loader = None
+        self.signs_filtered = False  # The open list shows search results rather than every sign
+        self.signs_watermark = None  # Change-feed position of the open list
     
     def show_signs_list(self):
         """Display list of all signs"""
         # Header
         ttk.Label(self.parent_frame, text="Lista de carteles", font=("Arial", 14, "bold")).pack(pady=10)
         
+        # Search bar
+        search_frame = ttk.Frame(self.parent_frame)
+        search_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(search_frame, text="Buscar:").pack(side=tk.LEFT, padx=(0, 5))
+        text_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=text_var, width=30).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(search_frame, text="Estado:").pack(side=tk.LEFT, padx=5)
+        status_var = tk.StringVar()
+        ttk.Combobox(search_frame, textvariable=status_var, width=12, state="readonly",
+                     values=["", "Pending", "In Progress", "Completed"]).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(search_frame, text="Desde (AAAA-MM-DD):").pack(side=tk.LEFT, padx=5)
+        date_from_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=date_from_var, width=12).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(search_frame, text="Hasta:").pack(side=tk.LEFT, padx=5)
+        date_to_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=date_to_var, width=12).pack(side=tk.LEFT, padx=5)
+        
         # Create treeview
         columns = ("ID", "Cartel", "Cliente", "Creado", "Estado", "Costo Total")
         tree = ttk.Treeview(self.parent_frame, columns=columns, show="headings", height=20)
@@ -37,25 +69,83 @@ class SignViews:
         
         # Add scrollbar
         scrollbar = ttk.Scrollbar(self.parent_frame, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Populate data
-        signs = queries.get_all_signs()
-        if signs:
-            for sign in signs:
-                # Format date and cost for display
-                date_formatted = sign['CreationDate'].strftime("%Y-%m-%d %H:%M")
-                cost_formatted = f"${sign['TotalCost']:.2f}"
-                
-                tree.insert("", tk.END, values=(
-                    sign['SignID'], 
-                    sign['SignName'], 
-                    sign['CustomerInfo'], 
-                    date_formatted, 
-                    sign['Status'], 
-                    cost_formatted
-                ))
+        # Read the unfiltered list from the local mirror once it has been filled
+        replica = LocalReplica.get_instance() if LocalReplica.enabled() else None
+        list_page = replica.get_signs_page if replica and replica.is_ready() else queries.get_signs_page
+        self.signs_filtered = False
+        self.signs_watermark = None
+        
+        # Populate data a page at a time as the user scrolls
+        self.signs_loader = PagedTreeLoader(
+            tree, scrollbar, self.app.dispatcher,
+            fetch_page=list_page,
+            row_key=queries.sign_page_key,
+            row_values=self._sign_row_values,
+            row_id=lambda sign: sign['SignID'],
+            page_size=queries.SIGNS_PAGE_SIZE,
+            on_page=lambda rows: startup.mark("first_signs_page")
+        )
+        loader = self.signs_loader
+        loader.load_next()
+        
+        # Starting point for refresh_signs_list to fetch only what changed
+        def on_watermark(changes):
+            if changes and self.signs_loader is loader:
+                self.signs_watermark = changes['watermark']
+        self.app.dispatcher.run(queries.get_signs_changed_since, None, on_success=on_watermark, owner=tree)
+        
+        # Pull changes into the mirror in the background and patch the visible rows
+        def sync_replica():
+            if not tree.winfo_exists():
+                return
+            
+            first_sync = not replica.is_ready()
+            
+            def on_synced(changes):
+                if first_sync:
+                    # The mirror was just filled: the rows on screen are current, later pages come from it
+                    if not self.signs_filtered:
+                        loader.fetch_page = replica.get_signs_page
+                elif changes and not self.signs_filtered:
+                    loader.apply_changes(changes['signs'], changes['deleted_signs'])
+                tree.after(self.REPLICA_SYNC_MS, sync_replica)
+            
+            def on_sync_error(e):
+                print(f"Error syncing local replica: {e}")
+                tree.after(self.REPLICA_SYNC_MS, sync_replica)
+            
+            self.app.dispatcher.run(replica.sync, on_success=on_synced, on_error=on_sync_error, owner=tree)
+        
+        if replica:
+            sync_replica()
+        
+        # Re-run the search a moment after the user stops typing
+        pending_search = [None]
+        
+        def run_search():
+            pending_search[0] = None
+            filters = {
+                "text": text_var.get().strip() or None,
+                "status": status_var.get() or None,
+                "date_from": self._parse_date(date_from_var.get()),
+                "date_to": self._parse_date(date_to_var.get()),
+            }
+            self.signs_filtered = any(filters.values())
+            if self.signs_filtered:
+                fetch_page = lambda after, limit: queries.search_signs(after=after, limit=limit, **filters)
+            else:
+                fetch_page = replica.get_signs_page if replica and replica.is_ready() else queries.get_signs_page
+            self.signs_loader.reset(fetch_page)
+        
+        def schedule_search(*args):
+            if pending_search[0] is not None:
+                tree.after_cancel(pending_search[0])
+            pending_search[0] = tree.after(self.SEARCH_DEBOUNCE_MS, run_search)
+        
+        for var in (text_var, status_var, date_from_var, date_to_var):
+            var.trace_add("write", schedule_search)
         
         # Button frame
         button_frame = ttk.Frame(self.parent_frame)
@@ -68,6 +158,49 @@ class SignViews:
         ttk.Button(button_frame, text="Eliminar cartel", 
                   command=lambda: self._delete_sign(tree)).pack(side=tk.LEFT, padx=5)
     
+    def refresh_signs_list(self):
+        """Bring the open signs list up to date in place, or build it if it is not showing"""
+        loader = self.signs_loader
+        if loader is None or not loader.tree.winfo_exists():
+            self.app.clear_content_frame()
+            self.show_signs_list()
+            return
+        if self.signs_filtered or self.signs_watermark is None:
+            loader.reset()  # Search results: changed rows may no longer match, so re-run it
+            return
+        
+        def on_changes(changes):
+            if changes is None or self.signs_loader is not loader:
+                return
+            self.signs_watermark = changes['watermark']
+            loader.apply_changes(changes['signs'], changes['deleted'])
+        
+        self.app.dispatcher.run(queries.get_signs_changed_since, self.signs_watermark,
+                                on_success=on_changes, owner=loader.tree)
+    
+    @staticmethod
+    def _parse_date(value):
+        """Parse a YYYY-MM-DD filter, ignoring empty or incomplete input"""
+        try:
+            return datetime.strptime(value.strip(), "%Y-%m-%d").date()
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _sign_row_values(sign):
+        """Format a sign row for the signs list"""
+        # Format date and cost for display
+        date_formatted = sign['CreationDate'].strftime("%Y-%m-%d %H:%M")
+        cost_formatted = f"${sign['TotalCost']:.2f}"
+        return (
+            sign['SignID'], 
+            sign['SignName'], 
+            sign['CustomerInfo'], 
+            date_formatted, 
+            sign['Status'], 
+            cost_formatted
+        )
+    
     def show_add_sign_form(self):
         """Show form to add a new sign"""
         # Header
@@ -128,32 +261,33 @@ class SignViews:
                 messagebox.showwarning("Validation Error", "Sign name is required.")
                 return
             
-            # Create sign
-            sign_id = queries.create_sign(
-                name, 
-                description_var.get(), 
-                customer_var.get(), 
-                status_var.get()
-            )
+            # Read the form on the Tk thread; the inserts run in the background
+            description = description_var.get()
+            customer = customer_var.get()
+            status = status_var.get()
+            component_names = [var.get().strip() for var in component_entries if var.get().strip()]
             
-            if sign_id:
-                # Insert components
-                for component_var in component_entries:
-                    component_name = component_var.get().strip()
-                    if component_name:
-                        queries.create_component(sign_id, component_name)
-                
-                messagebox.showinfo("Success", "Sign created successfully!")
-                self.app.show_signs()  # Refresh sign list
-            else:
-                messagebox.showerror("Error", "Failed to create sign.")
-        
-        ttk.Button(buttons_frame, text="Save Sign", command=save_sign).pack(side=tk.LEFT, padx=5)
+            def on_created(created):
+                if created:
+                    messagebox.showinfo("Success", "Sign created successfully!")
+                    self.app.show_signs()  # Refresh sign list
+                else:
+                    save_button.state(["!disabled"])
+                    messagebox.showerror("Error", "Failed to create sign.")
+            
+            save_button.state(["disabled"])
+            # Sign and components are inserted together: all or nothing
+            self.app.dispatcher.run(queries.create_sign_with_components,
+                                    name, description, customer, status, component_names,
+                                    on_success=on_created, owner=buttons_frame)
+        
+        save_button = ttk.Button(buttons_frame, text="Save Sign", command=save_sign)
+        save_button.pack(side=tk.LEFT, padx=5)
         ttk.Button(buttons_frame, text="Cancel", command=self.app.show_signs).pack(side=tk.LEFT, padx=5)
     
     def _view_sign_details(self, tree):
         """View details of the selected sign"""
-        selected_item = tree.selection()
+        selected_item = [item for item in tree.selection() if item != "loading"]
         if not selected_item:
             messagebox.showwarning("Selection Required", "Please select a sign to view.")
             return
@@ -173,14 +307,18 @@ class SignViews:
     
     def _edit_sign(self, tree):
         """Edit the selected sign"""
-        selected_item = tree.selection()
+        selected_item = [item for item in tree.selection() if item != "loading"]
         if not selected_item:
             messagebox.showwarning("Selection Required", "Please select a sign to edit.")
             return
         
         sign_id = tree.item(selected_item[0], "values")[0]
-        sign = queries.get_sign_by_id(sign_id)
-        
+        self.app.dispatcher.run(queries.get_sign_by_id, sign_id,
+                                on_success=lambda sign: self._show_edit_sign_dialog(sign_id, sign),
+                                owner=tree)
+    
+    def _show_edit_sign_dialog(self, sign_id, sign):
+        """Show the edit dialog once the sign has been loaded"""
         if not sign:
             messagebox.showerror("Error", "Sign not found.")
             return
@@ -220,24 +358,32 @@ class SignViews:
                 messagebox.showwarning("Validation Error", "Sign name is required.")
                 return
             
-            success = queries.update_sign(
+            def on_saved(success):
+                if success is not None:  # None indicates error
+                    messagebox.showinfo("Success", "Sign updated successfully!")
+                    dialog.destroy()
+                    self.app.show_signs()  # Refresh sign list
+                    
+                    # Update detail window if open
+                    if sign_id in self.current_windows and self.current_windows[sign_id].winfo_exists():
+                        self._refresh_detail_view(sign_id, self.current_windows[sign_id])
+                else:
+                    save_button.state(["!disabled"])
+            
+            save_button.state(["disabled"])
+            self.app.dispatcher.run(
+                queries.update_sign,
                 sign_id, 
                 name, 
                 description_var.get(), 
                 customer_var.get(), 
-                status_var.get()
+                status_var.get(),
+                on_success=on_saved,
+                owner=dialog
             )
-            
-            if success is not None:  # None indicates error
-                messagebox.showinfo("Success", "Sign updated successfully!")
-                dialog.destroy()
-                self.app.show_signs()  # Refresh sign list
-                
-                # Update detail window if open
-                if sign_id in self.current_windows and self.current_windows[sign_id].winfo_exists():
-                    self._refresh_detail_view(sign_id, self.current_windows[sign_id])
         
-        ttk.Button(dialog, text="Save Changes", command=save_changes).grid(row=4, column=0, pady=20)
+        save_button = ttk.Button(dialog, text="Save Changes", command=save_changes)
+        save_button.grid(row=4, column=0, pady=20)
         ttk.Button(dialog, text="Cancel", command=dialog.destroy).grid(row=4, column=1, pady=20)
         
         # Wait for dialog to close
@@ -245,7 +391,7 @@ class SignViews:
     
     def _delete_sign(self, tree):
         """Delete the selected sign"""
-        selected_item = tree.selection()
+        selected_item = [item for item in tree.selection() if item != "loading"]
         if not selected_item:
             messagebox.showwarning("Selection Required", "Please select a sign to delete.")
             return
@@ -259,34 +405,152 @@ class SignViews:
         if not confirm:
             return
         
-        success = queries.delete_sign(sign_id)
-        if success is not None:  # None indicates error
-            messagebox.showinfo("Success", "Sign deleted successfully!")
-            
-            # Close detail window if open
-            if sign_id in self.current_windows and self.current_windows[sign_id].winfo_exists():
-                self.current_windows[sign_id].destroy()
+        def on_deleted(success):
+            if success is not None:  # None indicates error
+                messagebox.showinfo("Success", "Sign deleted successfully!")
                 
-            self.app.show_signs()  # Refresh sign list
+                # Close detail window if open
+                if sign_id in self.current_windows and self.current_windows[sign_id].winfo_exists():
+                    self.current_windows[sign_id].destroy()
+                    
+                self.app.show_signs()  # Refresh sign list
+        
+        self.app.dispatcher.run(queries.delete_sign, sign_id, on_success=on_deleted)
     
     def _refresh_detail_view(self, sign_id, detail_window):
         """Refresh the detail view after changes"""
-        # For a complete refresh, destroy and recreate window
+        state = self.detail_states.get(sign_id)
+        if state and state['window'] is detail_window and detail_window.winfo_exists():
+            # Patch the existing widgets in place
+            self._update_sign_details(sign_id, detail_window)
+            return
+        
+        # Window was never built (or is gone): recreate it
         if detail_window and detail_window.winfo_exists():
             detail_window.destroy()
         self._show_sign_detail_window(sign_id)
+    
+    def _update_sign_details(self, sign_id, detail_window, component_id=None):
+        """Update only parts of the detail window that need updating.
+        
+        With a component_id only that component and the sign row are re-fetched;
+        otherwise the whole sign tree is reloaded and diffed against the window.
+        """
+        state = self.detail_states.get(sign_id)
+        if not state or state['window'] is not detail_window or not detail_window.winfo_exists():
+            self._refresh_detail_view(sign_id, detail_window)
+            return
         
-        # For a partial refresh (alternative approach):
-        # self._update_sign_details(sign_id, detail_window)
+        if component_id is not None and component_id in state['tabs']:
+            def load():
+                return queries.get_sign_by_id(sign_id), queries.get_component_tree(component_id)
+            
+            def on_loaded(result):
+                sign, component = result
+                if not sign:
+                    detail_window.destroy()
+                    return
+                self._patch_sign_info(state, sign)
+                if component:
+                    self._patch_component_tab(state, component)
+                else:
+                    self._remove_component_tab(state, component_id)
+            
+            self.app.dispatcher.run(load, on_success=on_loaded, owner=detail_window)
+        else:
+            def on_loaded(sign):
+                if not sign:
+                    detail_window.destroy()
+                    return
+                self._patch_sign_info(state, sign)
+                self._patch_components(state, sign_id, detail_window, sign['Components'])
+            
+            self.app.dispatcher.run(queries.get_sign_tree, sign_id, on_success=on_loaded, owner=detail_window)
     
-    def _update_sign_details(self, sign_id, detail_window):
-        """Update only parts of the detail window that need updating"""
-        # This is a placeholder for a more sophisticated update mechanism
-        # Instead of destroying and recreating the entire window
-        # Implementation would require storing references to UI elements
-        pass
-
-    # Modify the _show_sign_detail_window method in sign_views.py to add a refresh button:
+    # Labels in the sign information section: (field, text for a sign row)
+    DETAIL_FIELDS = (
+        ('SignName', lambda sign: f"Name: {sign['SignName']}"),
+        ('CustomerInfo', lambda sign: f"Customer: {sign['CustomerInfo']}"),
+        ('Status', lambda sign: f"Status: {sign['Status']}"),
+        ('CreationDate', lambda sign: f"Creation Date: {sign['CreationDate']}"),
+        ('Description', lambda sign: f"Description: {sign['Description'] or 'N/A'}"),
+        ('TotalCost', lambda sign: f"Total Cost: ${sign['TotalCost']:.2f}"),
+    )
+    
+    def _patch_sign_info(self, state, sign):
+        """Update sign information labels whose text changed"""
+        for field, text in self.DETAIL_FIELDS:
+            label = state['labels'][field]
+            new_text = text(sign)
+            if label.cget("text") != new_text:
+                label.configure(text=new_text)
+        
+        # Keep the cached tree current for Print Invoice
+        components = state['sign'].get('Components', [])
+        state['sign'] = dict(sign, Components=sign.get('Components', components))
+    
+    def _patch_component_tab(self, state, component):
+        """Update one component tab's title and job rows"""
+        tab = state['tabs'][component['ComponentID']]
+        tab['component'] = component
+        title = self.component_views.tab_title(component)
+        if state['notebook'].tab(tab['frame'], "text") != title:
+            state['notebook'].tab(tab['frame'], text=title)
+        if tab['job_tree'] is not None:
+            # A tab not shown yet builds from tab['component'] when it is
+            self.component_views.update_job_rows(tab['job_tree'], component['Jobs'])
+        
+        components = state['sign']['Components']
+        for index, existing in enumerate(components):
+            if existing['ComponentID'] == component['ComponentID']:
+                components[index] = component
+    
+    def _remove_component_tab(self, state, component_id):
+        """Drop the tab of a component that no longer exists"""
+        tab = state['tabs'].pop(component_id)
+        state['notebook'].forget(tab['frame'])
+        tab['frame'].destroy()
+        state['sign']['Components'] = [c for c in state['sign']['Components']
+                                       if c['ComponentID'] != component_id]
+        self._toggle_empty_components(state)
+    
+    def _patch_components(self, state, sign_id, detail_window, components):
+        """Add, remove and update component tabs to match a freshly loaded tree"""
+        current_ids = {component['ComponentID'] for component in components}
+        for component_id in list(state['tabs']):
+            if component_id not in current_ids:
+                self._remove_component_tab(state, component_id)
+        
+        for component in components:
+            if component['ComponentID'] in state['tabs']:
+                self._patch_component_tab(state, component)
+            else:
+                state['tabs'][component['ComponentID']] = self.component_views.add_component_tab(
+                    state['notebook'], component, sign_id, detail_window)
+        
+        state['sign']['Components'] = components
+        self._toggle_empty_components(state)
+        self._build_selected_tab(state, sign_id, detail_window)
+    
+    def _build_selected_tab(self, state, sign_id, detail_window):
+        """Build the visible component tab if it is still a placeholder"""
+        selected = state['notebook'].select()
+        if not selected:
+            return
+        for tab in state['tabs'].values():
+            if str(tab['frame']) == selected:
+                self.component_views.build_component_tab(tab, sign_id, detail_window)
+                return
+    
+    def _toggle_empty_components(self, state):
+        """Show the notebook when there are components, the empty label otherwise"""
+        if state['tabs']:
+            state['empty_label'].pack_forget()
+            if not state['notebook'].winfo_ismapped():
+                state['notebook'].pack(fill=tk.BOTH, expand=True, pady=10, before=state['add_button'])
+        else:
+            state['notebook'].pack_forget()
+            state['empty_label'].pack(pady=20, before=state['add_button'])
 
     def _show_sign_detail_window(self, sign_id):
         """Show the detail window for a sign"""
@@ -295,63 +559,114 @@ class SignViews:
         detail_window.title("Sign Details")
         detail_window.geometry("900x700")
         detail_window.configure(padx=20, pady=20)
+        self.current_windows[sign_id] = detail_window
+        
+        # Loading state until the sign tree arrives
+        loading_label = ttk.Label(detail_window, text="Cargando cartel...", font=("Arial", 12))
+        loading_label.pack(pady=40)
         
-        # Get sign details
-        sign = queries.get_sign_by_id(sign_id)
+        def on_loaded(sign):
+            loading_label.destroy()
+            self._build_sign_detail(detail_window, sign_id, sign)
         
+        self.app.dispatcher.run(queries.get_sign_tree, sign_id, on_success=on_loaded, owner=detail_window)
+        
+        return detail_window
+    
+    def _build_sign_detail(self, detail_window, sign_id, sign):
+        """Fill the detail window with a sign tree from queries.get_sign_tree"""
         if not sign:
             messagebox.showerror("Error", "Sign not found.")
             detail_window.destroy()
             return
         
+        # Widget references kept so later refreshes can patch them in place
+        state = {'window': detail_window, 'sign': sign, 'labels': {}, 'tabs': {}}
+        self.detail_states[sign_id] = state
+        detail_window.bind("<Destroy>", lambda event: self._forget_detail_state(event, sign_id, detail_window), add="+")
+        
         # Sign information section
         info_frame = ttk.LabelFrame(detail_window, text="Sign Information")
         info_frame.pack(fill=tk.X, pady=10)
         
-        ttk.Label(info_frame, text=f"Name: {sign['SignName']}", font=("Arial", 12)).pack(anchor=tk.W, pady=5)
-        ttk.Label(info_frame, text=f"Customer: {sign['CustomerInfo']}", font=("Arial", 12)).pack(anchor=tk.W, pady=5)
-        ttk.Label(info_frame, text=f"Status: {sign['Status']}", font=("Arial", 12)).pack(anchor=tk.W, pady=5)
-        ttk.Label(info_frame, text=f"Creation Date: {sign['CreationDate']}", font=("Arial", 12)).pack(anchor=tk.W, pady=5)
-        ttk.Label(info_frame, text=f"Description: {sign['Description'] or 'N/A'}", font=("Arial", 12)).pack(anchor=tk.W, pady=5)
-        ttk.Label(info_frame, text=f"Total Cost: ${sign['TotalCost']:.2f}", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=5)
+        for field, text in self.DETAIL_FIELDS:
+            font = ("Arial", 12, "bold") if field == 'TotalCost' else ("Arial", 12)
+            label = ttk.Label(info_frame, text=text(sign), font=font)
+            label.pack(anchor=tk.W, pady=5)
+            state['labels'][field] = label
         
         # Action buttons for sign
         action_frame = ttk.Frame(info_frame)
         action_frame.pack(anchor=tk.W, pady=10)
         
-        # Print invoice button
+        # Print invoice button - renders the tree already loaded for this window in a worker process
         def print_invoice():
-            printer = PrintInvoice(sign_id)
-            printer.print_invoice()
+            self._render_invoice(detail_window, state['sign'])
         
         # Refresh button - Add this new button
         def refresh_view():
+            # Explicit refresh: skip the row cache and reload from the database
+            queries.invalidate_sign(sign_id)
             self._refresh_detail_view(sign_id, detail_window)
             
         ttk.Button(action_frame, text="Print Invoice", command=print_invoice).pack(side=tk.LEFT, padx=5)
         ttk.Button(action_frame, text="Refresh View", command=refresh_view).pack(side=tk.LEFT, padx=5)
         
         # Components section
-        components = queries.get_components_by_sign_id(sign_id)
-        
         components_frame = ttk.LabelFrame(detail_window, text="Components")
         components_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
-        if components:
-            # Create a notebook (tabbed interface) for components
-            notebook = ttk.Notebook(components_frame)
-            notebook.pack(fill=tk.BOTH, expand=True, pady=10)
-            
-            for component in components:
-                self.component_views.add_component_tab(notebook, component, sign_id, detail_window)
-        else:
-            ttk.Label(components_frame, text="No components found.").pack(pady=20)
+        # Create a notebook (tabbed interface) for components
+        state['notebook'] = ttk.Notebook(components_frame)
+        state['empty_label'] = ttk.Label(components_frame, text="No components found.")
         
         # Add component button
-        ttk.Button(components_frame, text="Add New Component", 
-                command=lambda: self.component_views.add_component(sign_id, detail_window, self._refresh_detail_view)).pack(pady=10)
+        state['add_button'] = ttk.Button(components_frame, text="Add New Component", 
+                command=lambda: self.component_views.add_component(sign_id, detail_window, self._refresh_detail_view))
+        state['add_button'].pack(pady=10)
+        
+        # Tabs start as empty placeholders; each builds its job list when first shown
+        for component in sign['Components']:
+            state['tabs'][component['ComponentID']] = self.component_views.add_component_tab(
+                state['notebook'], component, sign_id, detail_window)
+        state['notebook'].bind("<<NotebookTabChanged>>",
+                               lambda event: self._build_selected_tab(state, sign_id, detail_window))
+        self._toggle_empty_components(state)
+        self._build_selected_tab(state, sign_id, detail_window)
         
         # Close button
         ttk.Button(detail_window, text="Close", command=detail_window.destroy).pack(pady=10)
-        
-        return detail_window
\ No newline at end of file
+    
+    def _render_invoice(self, parent_window, sign):
+        """Render a sign's invoice in the background, showing progress until the PDF opens"""
+        progress = tk.Toplevel(parent_window)
+        progress.title("Print Invoice")
+        progress.configure(padx=20, pady=20)
+        progress.transient(parent_window)
+        ttk.Label(progress, text=f"Generando factura de {sign['SignName']}...").pack(pady=(0, 10))
+        bar = ttk.Progressbar(progress, mode="indeterminate", length=250)
+        bar.pack()
+        bar.start(15)
+        
+        def close_progress():
+            if progress.winfo_exists():
+                progress.destroy()
+        
+        def on_rendered(filepath):
+            from utils.print_invoice import PrintInvoice
+            close_progress()
+            messagebox.showinfo("Success", f"Invoice generated successfully!\nSaved to: {filepath}")
+            PrintInvoice.open_invoice(filepath)
+        
+        def on_error(e):
+            close_progress()
+            messagebox.showerror("Error", f"Error generating invoice: {e}")
+        
+        # Owned by the detail window: closing only the progress dialog still delivers the file
+        future = InvoiceRenderer.get_instance().submit(sign)
+        self.app.dispatcher.watch(future, on_success=on_rendered, on_error=on_error, owner=parent_window)
+    
+    def _forget_detail_state(self, event, sign_id, detail_window):
+        """Drop widget references once a detail window is destroyed"""
+        if event.widget is detail_window and self.detail_states.get(sign_id, {}).get('window') is detail_window:
+            del self.detail_states[sign_id]
@@ -0,0 +1,101 @@
+"""
+On-disk cache of rendered invoice PDFs.
+"""
+import hashlib
+import json
+import os
+import threading
+
+DEFAULT_CACHE_MB = 100
+
+
+class InvoiceCache:
+    """Content-addressed store for invoice PDFs with size-based eviction.
+
+    A PDF is stored under a hash of the invoice data and the template
+    version, so reprinting an unchanged sign returns the existing file and
+    any change to the sign or the layout produces a new one. When the PDFs
+    in the directory exceed max_bytes the least recently used are deleted.
+    """
+
+    def __init__(self, directory, version, max_bytes=None):
+        self.directory = directory
+        self.version = version
+        self.max_bytes = max_bytes or int(os.getenv("INVOICE_CACHE_MB", DEFAULT_CACHE_MB)) * 1024 * 1024
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, snapshot):
+        """Hash identifying the PDF an invoice snapshot renders to"""
+        data = json.dumps(snapshot, sort_keys=True, default=str)
+        return hashlib.sha256(f"{self.version}\n{data}".encode("utf-8")).hexdigest()
+
+    def path_for(self, snapshot):
+        """Where the PDF for a snapshot lives; the name stays readable for people browsing the folder"""
+        sanitized_name = ''.join(c if c.isalnum() else '_' for c in snapshot['SignName'])
+        filename = f"Invoice_{sanitized_name}_{snapshot['SignID']}_{self.key(snapshot)[:16]}.pdf"
+        return os.path.join(self.directory, filename)
+
+    def get(self, snapshot):
+        """Return the cached PDF path for a snapshot, or None"""
+        filepath = self.path_for(snapshot)
+        if not os.path.exists(filepath):
+            self.misses += 1
+            return None
+        os.utime(filepath)  # Mark as recently used for eviction
+        self.hits += 1
+        return filepath
+
+    def put(self, snapshot, render):
+        """Render a snapshot with render(filepath) into the cache and return its path"""
+        os.makedirs(self.directory, exist_ok=True)
+        filepath = self.path_for(snapshot)
+        # Render beside the target and rename, so a concurrent reader never sees a partial PDF
+        partial = f"{filepath}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            render(partial)
+            os.replace(partial, filepath)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        self.evict(keep=filepath)
+        return filepath
+
+    def evict(self, keep=None):
+        """Delete the least recently used PDFs until the directory fits in max_bytes"""
+        with self._lock:
+            files = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith(".pdf"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue  # Open in a viewer or removed by another worker
+                total -= size
+                self.evictions += 1
+
+    def stats(self):
+        """Return file count, size and hit/miss/eviction counters"""
+        sizes = []
+        if os.path.isdir(self.directory):
+            sizes = [entry.stat().st_size for entry in os.scandir(self.directory)
+                     if entry.is_file() and entry.name.endswith(".pdf")]
+        return {
+            "files": len(sizes),
+            "bytes": sum(sizes),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
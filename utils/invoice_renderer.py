@@ -0,0 +1,57 @@
+"""
+Background invoice rendering for the Sign Business application.
+"""
+from concurrent.futures import Future, ProcessPoolExecutor
+import os
+import threading
+
+DEFAULT_INVOICE_WORKERS = 4
+
+
+# Singleton pattern for the invoice worker processes
+class InvoiceRenderer:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = InvoiceRenderer()
+        return cls._instance
+
+    def __init__(self, max_workers=None):
+        if InvoiceRenderer._instance is not None:
+            raise Exception("This class is a singleton. Use get_instance() instead.")
+
+        # ReportLab layout is pure CPU work, so each invoice gets its own process
+        self.max_workers = max_workers or int(os.getenv(
+            "INVOICE_WORKERS", min(DEFAULT_INVOICE_WORKERS, os.cpu_count() or 1)))
+        self._executor = None  # Started on first use so the app opens without spawning processes
+        self._lock = threading.Lock()
+
+    def submit(self, sign_tree):
+        """Render an invoice for a get_sign_tree result in a worker process; the Future yields the file path"""
+        # Imported on the first invoice so ReportLab does not slow down startup
+        from .print_invoice import invoice_snapshot, cached_invoice, render_invoice
+        snapshot = invoice_snapshot(sign_tree)
+        filepath = cached_invoice(snapshot)
+        if filepath:
+            # Unchanged since the last print: no need to start a worker
+            future = Future()
+            future.set_result(filepath)
+            return future
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            # Only plain data crosses the process boundary
+            return self._executor.submit(render_invoice, snapshot)
+
+    def shutdown(self, wait=False):
+        """Stop the workers, dropping any invoices that have not started yet"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+        InvoiceRenderer._instance = None
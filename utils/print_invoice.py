@@ -7,109 +7,142 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 import os
 import tkinter.messagebox as messagebox
-from datetime import datetime
-import db.queries as queries
+from datetime import date
 from decimal import Decimal
+from .invoice_cache import InvoiceCache
 
-class PrintInvoice:
-    def __init__(self, sign_id):
-        self.sign_id = sign_id
-        self.sign_data = queries.get_sign_by_id(sign_id)
-        self.components = queries.get_components_by_sign_id(sign_id)
-        
-    def generate_invoice(self):
-        """Generate an invoice PDF file for the sign"""
-        if not self.sign_data:
-            messagebox.showerror("Error", "Sign data not found.")
-            return False
-            
-        # Create filename based on sign name and date
-        sanitized_name = ''.join(c if c.isalnum() else '_' for c in self.sign_data['SignName'])
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"Invoice_{sanitized_name}_{timestamp}.pdf"
-        
-        # Create directory for invoices if it doesn't exist
-        invoices_dir = "invoices"
-        if not os.path.exists(invoices_dir):
-            os.makedirs(invoices_dir)
-            
-        filepath = os.path.join(invoices_dir, filename)
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(filepath, pagesize=letter)
+INVOICES_DIR = "invoices"
+
+SIGN_FIELDS = ('SignID', 'SignName', 'Description', 'CustomerInfo', 'Status', 'CreationDate')
+JOB_FIELDS = ('JobName', 'UnitCost', 'Quantity', 'Amount')
+
+
+def invoice_snapshot(sign_tree):
+    """Copy the fields an invoice needs out of a get_sign_tree result into plain, picklable data"""
+    snapshot = {field: sign_tree.get(field) for field in SIGN_FIELDS}
+    # The quote date is printed on the invoice, so it is part of what gets cached
+    snapshot['QuoteDate'] = date.today()
+    snapshot['Components'] = [
+        {'ComponentName': component['ComponentName'],
+         'Jobs': [{field: job.get(field) for field in JOB_FIELDS} for job in component['Jobs']]}
+        for component in sign_tree.get('Components', [])
+    ]
+    return snapshot
+
+
+COLUMN_WIDTHS = [2.5*inch, 1.25*inch, 1.25*inch, 1.25*inch]
+
+
+class InvoiceTemplate:
+    """Styles, table styles and fixed text shared by every invoice, built once and reused.
+
+    Flowables keep wrap and split state on themselves, so build_story creates
+    fresh ones for every invoice; only their styles and text are shared.
+    """
+    # Bump whenever the layout changes so cached PDFs are not reused
+    VERSION = 1
+    
+    def __init__(self):
         styles = getSampleStyleSheet()
+        self.normal_style = styles['Normal']
         
-        # Create content
-        elements = []
-        
-        # Add title
-        title_style = ParagraphStyle(
+        self.title_style = ParagraphStyle(
             'Title',
             parent=styles['Heading1'],
             fontSize=16,
             alignment=1,  # Center alignment
             spaceAfter=20
         )
-        elements.append(Paragraph("Cotizacion de carteles ICAM81", title_style))
-         
-        # Add company info
-        company_style = ParagraphStyle(
+        self.company_style = ParagraphStyle(
             'Company',
             parent=styles['Normal'],
             fontSize=12,
             spaceAfter=20
         )
-        elements.append(Paragraph("Impresiones ICAM81<br/>20 de Noviembre 1960<br/>La Paz, BCS.<br/>Cel: 612 157 1483", company_style))
-        elements.append(Spacer(1, 0.2*inch))
         
-        # Add invoice details
-        invoice_data = [
-            ["Fecha de cotizacion:", datetime.now().strftime("%Y-%m-%d")],
-            ["Cartel:", self.sign_data['SignName']],
-            ["Cliente:", self.sign_data['CustomerInfo']],
-            ["Estado:", self.sign_data['Status']],
-            ["Creado:", self.sign_data['CreationDate'].strftime("%Y-%m-%d") if self.sign_data['CreationDate'] else "N/A"]
-        ]
+        # Title and company info open every invoice
+        self.title = "Cotizacion de carteles ICAM81"
+        self.company = "Impresiones ICAM81<br/>20 de Noviembre 1960<br/>La Paz, BCS.<br/>Cel: 612 157 1483"
         
-        invoice_table = Table(invoice_data, colWidths=[2*inch, 4*inch])
-        invoice_table.setStyle(TableStyle([
+        self.invoice_table_style = TableStyle([
             ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
             ('FONTSIZE', (0, 0), (-1, -1), 10),
             ('TOPPADDING', (0, 0), (-1, -1), 6),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
             ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        ])
+        # The last row holds the component total in bold, left-aligned like body text
+        self.jobs_table_style = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('ALIGN', (1, 1), (3, -1), 'RIGHT'),
+            ('FONTNAME', (2, -1), (3, -1), 'Helvetica-Bold'),
+            ('ALIGN', (2, -1), (3, -1), 'LEFT'),
+            ('LINEBELOW', (0, 0), (-1, 0), 1, colors.black),
+            ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
+            ('GRID', (0, 1), (-1, -2), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ])
+        self.total_table_style = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BACKGROUND', (2, 0), (-1, 0), colors.lightgrey),
+            ('LINEBELOW', (2, 0), (-1, 0), 1, colors.black),
+            ('LINEABOVE', (2, 0), (-1, 0), 1, colors.black),
+        ])
+        self.jobs_header = ["Componente", "Precio unitario", "Cantidad", "Monto"]
+    
+    def build_story(self, snapshot):
+        """Return new flowables for one invoice_snapshot"""
+        elements = [
+            Paragraph(self.title, self.title_style),
+            Paragraph(self.company, self.company_style),
+            Spacer(1, 0.2*inch),
+        ]
+        
+        # Add invoice details
+        invoice_data = [
+            ["Fecha de cotizacion:", snapshot['QuoteDate'].strftime("%Y-%m-%d")],
+            ["Cartel:", snapshot['SignName']],
+            ["Cliente:", snapshot['CustomerInfo']],
+            ["Estado:", snapshot['Status']],
+            ["Creado:", snapshot['CreationDate'].strftime("%Y-%m-%d") if snapshot['CreationDate'] else "N/A"]
+        ]
+        invoice_table = Table(invoice_data, colWidths=[2*inch, 4*inch])
+        invoice_table.setStyle(self.invoice_table_style)
         elements.append(invoice_table)
         elements.append(Spacer(1, 0.3*inch))
         
         # Add description if available
-        if self.sign_data['Description']:
-            elements.append(Paragraph("<b>Detalles:</b>", styles['Normal']))
-            elements.append(Paragraph(self.sign_data['Description'], styles['Normal']))
+        if snapshot['Description']:
+            elements.append(Paragraph("<b>Detalles:</b>", self.normal_style))
+            elements.append(Paragraph(snapshot['Description'], self.normal_style))
             elements.append(Spacer(1, 0.2*inch))
         
         # Add components and jobs
-        elements.append(Paragraph("<b>Detalles del trabajo:</b>", styles['Normal']))
+        elements.append(Paragraph("<b>Detalles del trabajo:</b>", self.normal_style))
         elements.append(Spacer(1, 0.1*inch))
         
         total_amount = Decimal('0.0')  # Use Decimal instead of float
         
-        for component in self.components:
+        for component in snapshot['Components']:
             # Component header
-            elements.append(Paragraph(f"<b>{component['ComponentName']}</b>", styles['Normal']))
+            elements.append(Paragraph(f"<b>{component['ComponentName']}</b>", self.normal_style))
             
-            # Get jobs for this component
-            jobs = queries.get_jobs_by_component_id(component['ComponentID'])
+            jobs = component['Jobs']
             
             if jobs:
                 # Create jobs table
-                jobs_data = [["Componente", "Precio unitario", "Cantidad", "Monto"]]
-                component_total = Decimal('0.0')  # Use Decimal instead of float
+                jobs_data = [self.jobs_header]
+                component_total = Decimal('0.0')
                 
                 for job in jobs:
                     quantity = job['Quantity'] if job['Quantity'] is not None else "-"
-                    # Convert Amount to Decimal or 0 if None
                     amount = Decimal(str(job['Amount'])) if job['Amount'] is not None else Decimal('0.0')
                     
                     jobs_data.append([
@@ -121,65 +154,88 @@ class PrintInvoice:
                     
                     component_total += amount
                 
-                # Add component total - use Paragraph for HTML formatting
-                jobs_data.append([
-                    "",
-                    "",
-                    Paragraph("<b>Total:</b>", styles['Normal']), 
-                    Paragraph(f"<b>${float(component_total):.2f}</b>", styles['Normal'])
-                ])
+                jobs_data.append(["", "", "Total:", f"${float(component_total):.2f}"])
                 
-                jobs_table = Table(jobs_data, colWidths=[2.5*inch, 1.25*inch, 1.25*inch, 1.25*inch])
-                jobs_table.setStyle(TableStyle([
-                    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('ALIGN', (1, 1), (3, -1), 'RIGHT'),
-                    ('LINEBELOW', (0, 0), (-1, 0), 1, colors.black),
-                    ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
-                    ('GRID', (0, 1), (-1, -2), 0.5, colors.grey),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ]))
+                jobs_table = Table(jobs_data, colWidths=COLUMN_WIDTHS)
+                jobs_table.setStyle(self.jobs_table_style)
                 elements.append(jobs_table)
                 elements.append(Spacer(1, 0.2*inch))
                 
                 total_amount += component_total
             else:
-                elements.append(Paragraph("No jobs for this component.", styles['Normal']))
+                elements.append(Paragraph("No jobs for this component.", self.normal_style))
                 elements.append(Spacer(1, 0.1*inch))
         
-        # Add grand total - use Paragraph for HTML formatting
+        # Add grand total
         elements.append(Spacer(1, 0.2*inch))
-        total_table = Table([
-            [
-                "",
-                "",
-                Paragraph("<b>GRAND TOTAL:</b>", styles['Normal']),
-                Paragraph(f"<b>${float(total_amount):.2f}</b>", styles['Normal'])
-            ]
-        ], colWidths=[2.5*inch, 1.25*inch, 1.25*inch, 1.25*inch])
-        
-        total_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('ALIGN', (2, 0), (-1, 0), 'RIGHT'),
-            ('BACKGROUND', (2, 0), (-1, 0), colors.lightgrey),
-            ('LINEBELOW', (2, 0), (-1, 0), 1, colors.black),
-            ('LINEABOVE', (2, 0), (-1, 0), 1, colors.black),
-        ]))
+        total_table = Table([["", "", "GRAND TOTAL:", f"${float(total_amount):.2f}"]], colWidths=COLUMN_WIDTHS)
+        total_table.setStyle(self.total_table_style)
         elements.append(total_table)
         
         # Add footer
         elements.append(Spacer(1, 1*inch))
-        elements.append(Paragraph("Thank you for your business!", styles['Normal']))
-        
-        # Build PDF
-        doc.build(elements)
+        elements.append(Paragraph("Thank you for your business!", self.normal_style))
+        return elements
+    
+    def render(self, snapshot, filepath):
+        """Render an invoice PDF for an invoice_snapshot to filepath"""
+        doc = SimpleDocTemplate(filepath, pagesize=letter)
+        doc.build(self.build_story(snapshot))
+
+
+_template = None
+_caches = {}
+
+def get_template():
+    """The InvoiceTemplate of this process, built on first use"""
+    global _template
+    if _template is None:
+        _template = InvoiceTemplate()
+    return _template
+
+
+def get_cache(invoices_dir=INVOICES_DIR):
+    """The InvoiceCache for a directory, keyed to the current template version"""
+    if invoices_dir not in _caches:
+        _caches[invoices_dir] = InvoiceCache(invoices_dir, InvoiceTemplate.VERSION)
+    return _caches[invoices_dir]
+
+
+def cached_invoice(snapshot, invoices_dir=INVOICES_DIR):
+    """Path of an already rendered PDF for this exact snapshot, or None"""
+    return get_cache(invoices_dir).get(snapshot)
+
+
+def render_invoice(snapshot, invoices_dir=INVOICES_DIR):
+    """Return the PDF path for an invoice_snapshot, rendering it only if it is not cached.
+
+    Needs no database or Tk, so it can run in a worker process.
+    """
+    cache = get_cache(invoices_dir)
+    return cache.get(snapshot) or cache.put(snapshot, lambda filepath: get_template().render(snapshot, filepath))
+
+
+class PrintInvoice:
+    def __init__(self, sign_id, sign_tree=None):
+        self.sign_id = sign_id
+        if sign_tree is None:
+            import db.queries as queries  # Only here: render workers must not open a database connection
+            sign_tree = queries.get_sign_tree(sign_id)
+        # A tree from queries.get_sign_tree: the sign with nested components and jobs
+        self.sign_data = sign_tree
+        self.components = self.sign_data['Components'] if self.sign_data else []
         
-        return filepath
+    def generate_invoice(self):
+        """Generate an invoice PDF file for the sign"""
+        if not self.sign_data:
+            messagebox.showerror("Error", "Sign data not found.")
+            return False
+        return render_invoice(invoice_snapshot(self.sign_data))
+    
+    @staticmethod
+    def open_invoice(filepath):
+        """Open a generated invoice with the default PDF viewer"""
+        os.startfile(filepath)
     
     def print_invoice(self):
         """Generate the invoice and open it"""
@@ -190,7 +246,7 @@ class PrintInvoice:
                 messagebox.showinfo("Success", f"Invoice generated successfully!\nSaved to: {filepath}")
                 
                 # Open the PDF file with the default PDF viewer
-                os.startfile(filepath)
+                self.open_invoice(filepath)
                 return True
         except Exception as e:
             messagebox.showerror("Error", f"Error generating invoice: {e}")
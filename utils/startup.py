@@ -0,0 +1,79 @@
+"""
+Startup timing report for the Sign Business application.
+
+main.py imports this module first and marks each startup milestone. Once
+the first page of signs is on screen the timings are printed, compared
+with the previous run and appended to STARTUP_TIMINGS_FILE (default
+startup_timings.jsonl; set it to an empty string to disable the log).
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+_origin = time.perf_counter()
+_marks = {}
+_reported = False
+
+# The milestone that completes startup
+FINAL_MARK = "first_signs_page"
+
+# Modules that should not be loaded until the user asks for them
+DEFERRED_MODULES = ("reportlab",)
+
+
+def mark(name):
+    """Record the first time a milestone is reached, in milliseconds since startup began"""
+    if name not in _marks:
+        _marks[name] = (time.perf_counter() - _origin) * 1000
+        if name == "first_paint":
+            # Anything heavy already imported by now slowed the window down
+            _marks["loaded_early"] = [m for m in DEFERRED_MODULES if m in sys.modules]
+    if name == FINAL_MARK:
+        report()
+
+
+def timings():
+    """Milestones recorded so far"""
+    return dict(_marks)
+
+
+def report():
+    """Print the startup timings once, with the change since the previous run"""
+    global _reported
+    if _reported:
+        return
+    _reported = True
+
+    path = os.getenv("STARTUP_TIMINGS_FILE", "startup_timings.jsonl")
+    previous = _last_run(path) if path else None
+
+    parts = []
+    for name, ms in _marks.items():
+        if name == "loaded_early":
+            continue
+        part = f"{name} {ms:.0f} ms"
+        if previous and isinstance(previous.get(name), (int, float)):
+            part += f" ({ms - previous[name]:+.0f})"
+        parts.append(part)
+    print("Startup: " + ", ".join(parts))
+    if _marks.get("loaded_early"):
+        print(f"Startup: loaded before the first paint: {', '.join(_marks['loaded_early'])}")
+
+    if path:
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(dict(_marks, at=datetime.now().isoformat(timespec="seconds"))) + "\n")
+        except OSError as e:
+            print(f"Could not write startup timings: {e}")
+
+
+def _last_run(path):
+    """The most recent run recorded in the timings file, or None"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        return json.loads(lines[-1]) if lines else None
+    except (OSError, ValueError):
+        return None